@@ -6,6 +6,7 @@ const state = {
     events: [],
     loading: false,
     currentDate: new Date(),
+    syncToken: null,
 }
 
 const mutations = {
@@ -36,6 +37,24 @@ const mutations = {
     DELETE_EVENT(state, eventId) {
         state.events = state.events.filter(e => e.id !== eventId)
     },
+
+    SET_SYNC_TOKEN(state, token) {
+        state.syncToken = token
+    },
+
+    /**
+     * 合并增量同步结果：先删除，再按 id 覆盖或追加
+     */
+    APPLY_EVENT_CHANGES(state, { events, deleted }) {
+        const deletedIds = new Set(deleted || [])
+        const byId = new Map()
+        state.events.forEach(e => {
+            if (!deletedIds.has(e.id)) byId.set(e.id, e)
+        })
+        ;(events || []).forEach(e => byId.set(e.id, e))
+        state.events = Array.from(byId.values())
+            .sort((a, b) => new Date(a.start_time) - new Date(b.start_time))
+    },
 }
 
 const actions = {
@@ -70,6 +89,7 @@ const actions = {
             const data = await response.json()
             const events = Array.isArray(data) ? data : (data.results || [])
             commit('SET_EVENTS', events)
+            commit('SET_SYNC_TOKEN', null)
         } catch (error) {
             console.error('获取事件失败:', error)
             commit('SET_EVENTS', [])
@@ -78,6 +98,38 @@ const actions = {
         }
     },
 
+    /**
+     * 增量同步事件（只拉取上次同步以来的变更）
+     */
+    async syncEvents({ commit, dispatch, state, rootState }) {
+        if (!rootState.user.accessToken) {
+            return dispatch('fetchEvents')
+        }
+
+        try {
+            const headers = { 'Authorization': `Bearer ${rootState.user.accessToken}` }
+            const query = state.syncToken ? `?sync_token=${encodeURIComponent(state.syncToken)}` : ''
+            const response = await fetch(`https://app7626.acapp.acwing.com.cn/api/events/sync/${query}`, {
+                headers
+            })
+
+            if (!response.ok) {
+                console.warn('同步事件失败:', response.status)
+                return dispatch('fetchEvents')
+            }
+
+            const data = await response.json()
+            if (data.full_sync) {
+                commit('SET_EVENTS', data.events)
+            } else {
+                commit('APPLY_EVENT_CHANGES', data)
+            }
+            commit('SET_SYNC_TOKEN', data.sync_token)
+        } catch (error) {
+            console.error('同步事件失败:', error)
+        }
+    },
+
     /**
      * 创建事件
      */
@@ -94,7 +146,7 @@ const actions = {
                 body: JSON.stringify(eventData),
             })
             if (response.ok) {
-                await dispatch('fetchEvents') // 重新获取列表
+                await dispatch('syncEvents') // 增量同步变更
                 return true
             }
             return false
@@ -120,7 +172,7 @@ const actions = {
                 body: JSON.stringify(eventData),
             })
             if (response.ok) {
-                await dispatch('fetchEvents')
+                await dispatch('syncEvents')
                 return true
             }
             return false
@@ -145,7 +197,7 @@ const actions = {
                 headers,
             })
             if (response.ok) {
-                await dispatch('fetchEvents')
+                await dispatch('syncEvents')
                 return true
             }
             return false
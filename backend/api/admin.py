@@ -6,7 +6,9 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django.utils.html import format_html
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
 from .models import (
     Event, 
     QQUser, 
@@ -16,6 +18,10 @@ from .models import (
     UserFortune, 
     DataSyncLog
 )
+from .utils.calendar_cache import bump_calendars_for_events
+from .utils.event_cache import bump_events_version
+from .utils.event_search import search_filter
+from .utils.reminders import schedule_reminder
 
 
 # ============================================================
@@ -243,18 +249,27 @@ class EventAdmin(admin.ModelAdmin):
         ('start_time', admin.DateFieldListFilter),
     ]
     
-    search_fields = ['title', 'description', 'location', 'user__username']
+    # 标题 / 描述 / 地点走全文索引（见 get_search_results），这里只用于显示搜索框
+    search_fields = ['user__username']
     
     ordering = ['-start_time']
     
     date_hierarchy = 'start_time'
     
-    readonly_fields = ['created_at', 'related_trip_slug', 'source_app', 'source_id']
+    readonly_fields = [
+        'created_at', 'related_trip_slug', 'source_app', 'source_id',
+        'has_location', 'map_url', 'recurrence_end',
+    ]
     
     fieldsets = (
         ('基本信息', {
             'fields': ('user', 'title', 'description', 'start_time', 'end_time')
         }),
+        ('重复设置', {
+            # 重复规则由 Event.clean() 校验，无法解析时显示为字段错误
+            'fields': ('recurrence_rule', 'recurrence_end'),
+            'classes': ('collapse',)
+        }),
         ('位置信息', {
             'fields': ('has_location', 'location', 'latitude', 'longitude', 'map_url'),
             'classes': ('collapse',)
@@ -274,6 +289,17 @@ class EventAdmin(admin.ModelAdmin):
     
     actions = ['enable_email_reminder', 'disable_email_reminder', 'reset_notification']
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        用全文索引代替 search_fields 生成的 LIKE '%...%' 全表扫描
+        
+        标题 / 描述 / 地点命中全文索引，或用户名完全匹配，均算命中。
+        """
+        condition = search_filter(search_term)
+        if condition is None:
+            return queryset, False
+        return queryset.filter(condition | Q(user__username=search_term.strip())), False
+    
     def user_link(self, obj):
         """用户链接"""
         return format_html(
@@ -318,21 +344,41 @@ class EventAdmin(admin.ModelAdmin):
     notification_sent_icon.short_description = '通知状态'
     notification_sent_icon.admin_order_field = 'notification_sent'
     
+    def _update_events(self, queryset, **fields):
+        """
+        批量更新日程（update() 不触发信号）
+
+        同时刷新 updated_at、用户集合版本和公开日历订阅缓存，
+        并在事务提交后按新状态投递 / 取消提醒任务（eta / wheel 模式）。
+        """
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        event_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(updated_at=timezone.now(), **fields)
+        bump_events_version(user_ids)
+        bump_calendars_for_events(event_ids)
+        transaction.on_commit(lambda: self._schedule_reminders(event_ids))
+        return updated
+    
+    @staticmethod
+    def _schedule_reminders(event_ids):
+        for event in Event.objects.filter(pk__in=event_ids):
+            schedule_reminder(event)
+    
     def enable_email_reminder(self, request, queryset):
         """批量启用邮件提醒"""
-        updated = queryset.update(email_reminder=True)
+        updated = self._update_events(queryset, email_reminder=True)
         self.message_user(request, f'成功为 {updated} 个事件启用邮件提醒')
     enable_email_reminder.short_description = '启用邮件提醒'
     
     def disable_email_reminder(self, request, queryset):
         """批量禁用邮件提醒"""
-        updated = queryset.update(email_reminder=False)
+        updated = self._update_events(queryset, email_reminder=False)
         self.message_user(request, f'成功为 {updated} 个事件禁用邮件提醒')
     disable_email_reminder.short_description = '禁用邮件提醒'
     
     def reset_notification(self, request, queryset):
         """重置通知状态"""
-        updated = queryset.update(notification_sent=False)
+        updated = self._update_events(queryset, notification_sent=False)
         self.message_user(request, f'成功重置 {updated} 个事件的通知状态')
     reset_notification.short_description = '重置通知状态'
 
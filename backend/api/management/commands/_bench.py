@@ -0,0 +1,27 @@
+"""
+基准测试 / 压测命令的公共工具
+
+测试数据都在 rolled_back() 的事务中生成，结束后整体回滚，不会留在数据库中。
+（文件名以下划线开头，不会被当作管理命令。）
+"""
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back():
+    """在事务中执行，退出时（包括正常退出）回滚全部写入"""
+    with transaction.atomic():
+        try:
+            yield
+        finally:
+            transaction.set_rollback(True)
+
+
+@contextmanager
+def benchmark_user(username, **fields):
+    """在 rolled_back() 中创建测试用户，测试数据都挂在该用户下"""
+    with rolled_back():
+        yield User.objects.create(username=username, **fields)
@@ -0,0 +1,99 @@
+"""
+提醒邮件模板渲染性能测试
+
+使用方法:
+    python manage.py benchmark_email_templates
+    python manage.py benchmark_email_templates --messages 5000
+
+对比两种渲染方式（每封邮件的纯文本 + HTML）：
+- 不缓存的模板加载器：每封都重新读取、编译模板
+- render_email：render_to_string + 默认 cached loader，模板只编译一次
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from django.utils import timezone
+
+from api.models import Event
+from api.utils.email_templates import SITE_URL, event_email_context, render_email
+
+
+class Command(BaseCommand):
+    help = '提醒邮件模板渲染性能测试'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=2000, help='渲染的邮件数（默认 2000）')
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        events = self.build_events(count)
+        contexts = [
+            {'username': event.user.username, 'event': event_email_context(event)}
+            for event in events
+        ]
+
+        uncached_engine = Engine(
+            dirs=[str(path) for path in settings.TEMPLATES[0]['DIRS']],
+            loaders=['django.template.loaders.filesystem.Loader'],
+        )
+
+        def run_uncached():
+            for context in contexts:
+                context = Context({'site_url': SITE_URL, **context})
+                uncached_engine.get_template('emails/event_reminder.txt').render(context)
+                uncached_engine.get_template('emails/event_reminder.html').render(context)
+
+        def run_fast_path():
+            for context in contexts:
+                render_email('event_reminder', context)
+
+        expected = uncached_engine.get_template('emails/event_reminder.html').render(
+            Context({'site_url': SITE_URL, **contexts[0]})
+        )
+        if render_email('event_reminder', contexts[0])[1] != expected:
+            self.stdout.write(self.style.ERROR('❌ 渲染结果不一致'))
+            return
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"⏱️  提醒邮件模板渲染（{count} 封，纯文本 + HTML）")
+        self.stdout.write(f"{'='*60}\n")
+
+        timings = [
+            ('不缓存的模板加载器', self.timed(run_uncached)),
+            ('render_email', self.timed(run_fast_path)),
+        ]
+        baseline = timings[0][1]
+        for label, elapsed in timings:
+            self.stdout.write(
+                f"   - {label:<20} {elapsed * 1000:8.1f} ms  "
+                f"{elapsed / count * 1e6:7.1f} µs/封  ({baseline / elapsed:.1f}x)"
+            )
+        self.stdout.write('\n')
+
+    def build_events(self, count):
+        """内存中的日程对象（不写数据库）"""
+        user = User(username='benchmark_templates', email='benchmark@example.com')
+        start = timezone.now()
+        return [
+            Event(
+                user=user,
+                title=f'基准测试提醒 {i}',
+                description='带 <特殊字符> & 的备注' if i % 3 else '',
+                start_time=start + timedelta(minutes=i),
+                location='昆明长水国际机场' if i % 2 else '',
+                latitude=25.1019 if i % 2 else None,
+                longitude=102.9292 if i % 2 else None,
+                source_app='roamio' if i % 5 == 0 else 'ralendar',
+            )
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def timed(func):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
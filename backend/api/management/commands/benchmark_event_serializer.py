@@ -0,0 +1,113 @@
+"""
+日程列表序列化性能对比
+对比 EventSerializer(many=True) 与 EventFastListSerializer
+
+使用方法:
+    python manage.py benchmark_event_serializer
+    python manage.py benchmark_event_serializer --rows 1000 10000 --repeat 5
+
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Event
+from api.serializers import EventSerializer, EventFastListSerializer
+from api.utils.event_queries import event_list_queryset
+
+from ._bench import benchmark_user
+
+
+class Command(BaseCommand):
+    help = '对比 EventSerializer 与快速列表序列化的性能（1k / 10k 行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='测试的行数（默认 1000 10000）'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='每组重复次数，取最好成绩（默认 3）'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("⏱️  日程列表序列化性能对比")
+        self.stdout.write(f"{'='*60}\n")
+
+        for rows in options['rows']:
+            with benchmark_user(f'benchmark_serializer_{rows}') as user:
+                self.seed_events(user, rows)
+                self.run_case(user, rows, options['repeat'])
+
+        self.stdout.write('\n')
+
+    def seed_events(self, user, rows):
+        """生成测试数据（约一半带坐标，三种地图服务商轮换）"""
+        start = timezone.now()
+        providers = ['baidu', 'amap', 'tencent']
+
+        Event.objects.bulk_create([
+            Event(
+                user=user,
+                title=f'基准测试日程 {i}',
+                description='benchmark',
+                start_time=start + timedelta(minutes=i),
+                end_time=start + timedelta(minutes=i + 30),
+                location='昆明长水国际机场' if i % 2 else '',
+                latitude=25.1019 if i % 2 else None,
+                longitude=102.9292 if i % 2 else None,
+                map_provider=providers[i % 3],
+                source_app='roamio' if i % 5 == 0 else 'ralendar',
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+    def run_case(self, user, rows, repeat):
+        queryset = event_list_queryset(user).order_by('start_time', 'id')
+
+        def run_model_serializer():
+            return EventSerializer(queryset.all(), many=True).data
+
+        fast_serializer = EventFastListSerializer()
+
+        def run_fast_serializer():
+            return fast_serializer.serialize(queryset.values(*fast_serializer.value_fields))
+
+        sparse_serializer = EventFastListSerializer(fields=['id', 'title', 'start_time', 'end_time'])
+
+        def run_sparse_serializer():
+            return sparse_serializer.serialize(queryset.values(*sparse_serializer.value_fields))
+
+        # 正确性检查：快速路径输出必须与 EventSerializer 完全一致
+        expected = [dict(item) for item in run_model_serializer()]
+        if run_fast_serializer() != expected:
+            self.stdout.write(self.style.ERROR(f'   ❌ {rows} 行：快速序列化输出与 EventSerializer 不一致'))
+            return
+
+        baseline = self.best_of(run_model_serializer, repeat)
+        fast = self.best_of(run_fast_serializer, repeat)
+        sparse = self.best_of(run_sparse_serializer, repeat)
+
+        self.stdout.write(f"\n📊 {rows} 行（输出一致 ✓）")
+        self.stdout.write(f"   - EventSerializer(many=True): {baseline * 1000:8.1f} ms")
+        self.stdout.write(f"   - EventFastListSerializer:    {fast * 1000:8.1f} ms  ({baseline / fast:.1f}x)")
+        self.stdout.write(f"   - 稀疏字段 (4 个字段):         {sparse * 1000:8.1f} ms  ({baseline / sparse:.1f}x)")
+
+    @staticmethod
+    def best_of(func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
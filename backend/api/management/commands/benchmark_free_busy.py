@@ -0,0 +1,140 @@
+"""
+空闲/忙碌与冲突检测性能测试
+对比扫描线（find_overlaps / merge_busy）与两两比较
+
+使用方法:
+    python manage.py benchmark_free_busy
+    python manage.py benchmark_free_busy --events 10000 --days 365 --repeat 5
+
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Event
+from api.utils.event_occurrences import get_time_intervals
+from api.utils.free_busy import find_overlaps, get_free_busy, merge_busy
+
+from ._bench import benchmark_user
+
+# 两两比较太慢，超过这个数量只估算
+PAIRWISE_LIMIT = 5000
+
+
+class Command(BaseCommand):
+    help = '空闲/忙碌与冲突检测性能测试（默认每用户 10k 日程）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=10000,
+            help='每个用户的日程数（默认 10000）'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='日程分布的天数，也是查询窗口（默认 365）'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='重复次数，取最好成绩（默认 3）'
+        )
+
+    def handle(self, *args, **options):
+        events = options['events']
+        days = options['days']
+        repeat = options['repeat']
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("⏱️  空闲/忙碌与冲突检测性能测试")
+        self.stdout.write(f"{'='*60}\n")
+
+        with benchmark_user(f'benchmark_free_busy_{events}') as user:
+            start = self.seed_events(user, events, days)
+            end = start + timedelta(days=days)
+
+            intervals = get_time_intervals(user, start, end)
+            load = self.best_of(lambda: get_time_intervals(user, start, end), repeat)
+            sweep = self.best_of(lambda: find_overlaps(intervals), repeat)
+            merge = self.best_of(lambda: merge_busy(intervals, start, end), repeat)
+            total = self.best_of(lambda: get_free_busy(user, start, end), repeat)
+
+            overlaps = find_overlaps(intervals)
+            busy = merge_busy(intervals, start, end)
+
+            self.stdout.write(f"\n📊 {events} 个日程 / {days} 天")
+            self.stdout.write(f"   - 加载时间段（1 次查询）:  {load * 1000:8.1f} ms")
+            self.stdout.write(f"   - 扫描线找冲突:            {sweep * 1000:8.1f} ms  ({len(overlaps)} 对冲突)")
+            self.stdout.write(f"   - 合并忙碌时段:            {merge * 1000:8.1f} ms  ({len(busy)} 段)")
+            self.stdout.write(f"   - get_free_busy 全流程:    {total * 1000:8.1f} ms")
+
+            self.compare_pairwise(intervals, overlaps, sweep)
+
+        self.stdout.write('\n')
+
+    def seed_events(self, user, events, days):
+        """随机分布的 15~120 分钟日程，密度足以产生一定数量的冲突；返回起始时间"""
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        rng = random.Random(42)
+
+        rows = []
+        for i in range(events):
+            event_start = start + timedelta(minutes=rng.randrange(days * 24 * 60))
+            rows.append(Event(
+                user=user,
+                title=f'基准测试日程 {i}',
+                start_time=event_start,
+                end_time=event_start + timedelta(minutes=rng.choice([15, 30, 60, 90, 120])),
+            ))
+        Event.objects.bulk_create(rows, batch_size=1000)
+        return start
+
+    def compare_pairwise(self, intervals, overlaps, sweep):
+        """两两比较作为基准，并校验结果一致"""
+        sample = intervals[:PAIRWISE_LIMIT]
+
+        def pairwise():
+            found = 0
+            for i, a in enumerate(sample):
+                for b in sample[i + 1:]:
+                    if a[0] < b[1] and b[0] < a[1]:
+                        found += 1
+            return found
+
+        started = time.perf_counter()
+        pairwise_count = pairwise()
+        elapsed = time.perf_counter() - started
+
+        if len(sample) == len(intervals):
+            if pairwise_count != len(overlaps):
+                self.stdout.write(self.style.ERROR(
+                    f'   ❌ 冲突数不一致：扫描线 {len(overlaps)}，两两比较 {pairwise_count}'
+                ))
+                return
+            self.stdout.write(
+                f"   - 两两比较 O(n²):          {elapsed * 1000:8.1f} ms  (结果一致 ✓，{elapsed / sweep:.0f}x)"
+            )
+        else:
+            # 按 n² 比例估算全量耗时
+            estimated = elapsed * (len(intervals) / len(sample)) ** 2
+            self.stdout.write(
+                f"   - 两两比较 O(n²):          ≈{estimated * 1000:7.0f} ms  "
+                f"(由 {len(sample)} 条估算，{estimated / sweep:.0f}x)"
+            )
+
+    @staticmethod
+    def best_of(func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,132 @@
+"""
+iCalendar 导入性能测试
+生成一个大 .ics 文件，测量流式解析和导入的吞吐与内存峰值
+
+使用方法:
+    python manage.py benchmark_ics_import
+    python manage.py benchmark_ics_import --events 50000 --chunk-size 1000
+
+生成的文件包含定时日程、全天日程、重复日程、VALARM、折行的长描述和重复 UID。
+分三步测量：只解析、首次导入、再次导入（全部按 UID 去重）；
+每步先在 tracemalloc 下取内存峰值，再不跟踪地计时。
+生成的临时 .ics 文件结束后删除。
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.utils.ics import CRLF, escape_text, fold_line, format_utc
+from api.utils.ics_import import IMPORT_CHUNK_SIZE, import_ics, iter_lines, iter_vevents, vevent_to_event
+
+from ._bench import benchmark_user
+
+# 每隔多少个 VEVENT 插入一个重复 UID
+DUPLICATE_EVERY = 100
+
+
+def write_sample_calendar(path, count):
+    """生成 count 个 VEVENT 的 .ics 文件，返回文件大小（字节）"""
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        out.write(CRLF.join(['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Ralendar//benchmark//CN']) + CRLF)
+        for i in range(count):
+            uid = f'bench-{i - 1 if i % DUPLICATE_EVERY == 1 else i}@example.com'
+            lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{format_utc(start)}']
+            if i % 10 == 0:
+                day = (start + timedelta(days=i // 10)).strftime('%Y%m%d')
+                lines.append(f'DTSTART;VALUE=DATE:{day}')
+            else:
+                begin = start + timedelta(hours=i)
+                lines.append(f'DTSTART;TZID=Asia/Shanghai:{begin.strftime("%Y%m%dT%H%M%S")}')
+                lines.append('DURATION:PT1H30M' if i % 2 else f'DTEND:{format_utc(begin + timedelta(hours=1))}')
+            if i % 25 == 0:
+                lines.append('RRULE:FREQ=WEEKLY;COUNT=10')
+            lines.append(f'SUMMARY:{escape_text(f"导入测试日程 {i}, 第 {i % 7} 组")}')
+            lines.append(f'DESCRIPTION:{escape_text("会议纪要；" * (i % 20) + chr(10) + "第二行")}')
+            if i % 3 == 0:
+                lines.append(f'LOCATION:{escape_text("昆明市五华区翠湖公园")}')
+            if i % 4 == 0:
+                lines += ['BEGIN:VALARM', 'ACTION:DISPLAY', 'TRIGGER:-PT30M', 'END:VALARM']
+            lines.append('END:VEVENT')
+            out.write(''.join(fold_line(line) for line in lines))
+        out.write('END:VCALENDAR' + CRLF)
+    return os.path.getsize(path)
+
+
+class Command(BaseCommand):
+    help = 'iCalendar 导入性能测试（默认 50k 个 VEVENT）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=50000, help='VEVENT 数（默认 50000）')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f'每个事务写入的日程数（默认 {IMPORT_CHUNK_SIZE}）'
+        )
+
+    def handle(self, *args, **options):
+        count = options['events']
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("⏱️  iCalendar 导入性能测试")
+        self.stdout.write(f"{'='*60}\n")
+
+        fd, path = tempfile.mkstemp(suffix='.ics')
+        os.close(fd)
+        try:
+            size = write_sample_calendar(path, count)
+            self.stdout.write(f"📄 生成 {count} 个 VEVENT，文件 {size / 1024 / 1024:.1f} MB")
+
+            with benchmark_user('benchmark_ics_import') as user:
+                def parse_only():
+                    with open(path, 'rb') as stream:
+                        for vevent in iter_vevents(iter_lines(stream)):
+                            try:
+                                vevent_to_event(user, vevent)
+                            except ValueError:
+                                pass
+                    return None
+
+                def import_file():
+                    with open(path, 'rb') as stream:
+                        return import_ics(user, stream, chunk_size=options['chunk_size'])
+
+                self.stdout.write('\n📊 结果')
+                for label, run in (('只解析', parse_only), ('首次导入', import_file), ('再次导入', import_file)):
+                    elapsed, peak, result = self.measure(run)
+                    detail = ''
+                    if result is not None:
+                        detail = f"  新建 {result['created']}  重复 {result['duplicates']}  无效 {result['invalid']}"
+                    self.stdout.write(
+                        f"   - {label}:  {elapsed:6.2f} s  {count / elapsed:8.0f} 个/秒  "
+                        f"峰值 {peak / 1024 / 1024:5.1f} MB{detail}"
+                    )
+        finally:
+            os.remove(path)
+        self.stdout.write('\n')
+
+    def measure(self, run):
+        """
+        先在 tracemalloc 下跑一遍取内存峰值（写入回滚到保存点），再不跟踪地跑一遍计时
+
+        tracemalloc 会让 Python 代码慢好几倍，两者分开测。
+        """
+        savepoint = transaction.savepoint()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            transaction.savepoint_rollback(savepoint)
+
+        started = time.perf_counter()
+        result = run()
+        return time.perf_counter() - started, peak, result
@@ -0,0 +1,164 @@
+"""
+提醒邮件发送吞吐对比
+对比逐封发送（每封新建 SMTP 连接）与 send_reminder_batch（每批复用一个连接）
+
+使用方法:
+    python manage.py benchmark_reminder_delivery
+    python manage.py benchmark_reminder_delivery --messages 500 --batch-size 50 --handshake-ms 80
+
+安装了 aiosmtpd（pip install aiosmtpd）时在本机启动一个 SMTP 服务作为替身，
+--handshake-ms 模拟每次建连的 TLS 握手 + 登录耗时；未安装时退化为 locmem 后端，
+只能比较构建邮件等 Python 端开销。
+"""
+import socket
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from api.models import Event
+from api.utils.reminder_mail import build_reminder_message, send_reminder_batch
+
+from ._bench import benchmark_user
+
+
+class SinkHandler:
+    """aiosmtpd 处理器：收下邮件即丢弃，EHLO 时模拟握手耗时"""
+
+    def __init__(self, handshake_seconds):
+        self.handshake_seconds = handshake_seconds
+        self.received = 0
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        import asyncio
+
+        self.connections += 1
+        await asyncio.sleep(self.handshake_seconds)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+LOCMEM_SETTINGS = {
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'DEFAULT_FROM_EMAIL': 'Ralendar <noreply@example.com>',
+}
+
+
+def start_smtp_stand_in(handshake_seconds):
+    """
+    在本机启动 aiosmtpd 作为 SMTP 替身
+
+    Returns:
+        (controller, handler, email_settings)；未安装 aiosmtpd 时返回 (None, None, None)
+    """
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        return None, None, None
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    handler = SinkHandler(handshake_seconds)
+    controller = Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    return controller, handler, {
+        'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+        'EMAIL_HOST': '127.0.0.1',
+        'EMAIL_PORT': port,
+        'EMAIL_USE_TLS': False,
+        'EMAIL_USE_SSL': False,
+        'EMAIL_HOST_USER': '',
+        'EMAIL_HOST_PASSWORD': '',
+        'DEFAULT_FROM_EMAIL': 'Ralendar <noreply@example.com>',
+    }
+
+
+class Command(BaseCommand):
+    help = '对比逐封发送与批量复用连接发送提醒邮件的吞吐'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200, help='邮件数（默认 200）')
+        parser.add_argument('--batch-size', type=int, default=50, help='每批复用一个连接的邮件数（默认 50）')
+        parser.add_argument(
+            '--handshake-ms',
+            type=int,
+            default=50,
+            help='模拟每次建连的握手耗时，毫秒（默认 50，仅 aiosmtpd 模式）'
+        )
+
+    def handle(self, *args, **options):
+        messages = options['messages']
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("⏱️  提醒邮件发送吞吐对比")
+        self.stdout.write(f"{'='*60}\n")
+
+        handshake_seconds = options['handshake_ms'] / 1000
+        controller, handler, email_settings = start_smtp_stand_in(handshake_seconds)
+        if controller:
+            self.stdout.write(
+                f"📮 aiosmtpd 已在 127.0.0.1:{email_settings['EMAIL_PORT']} 启动"
+                f"（模拟握手 {handshake_seconds * 1000:.0f} ms）"
+            )
+        else:
+            self.stdout.write(self.style.WARNING('⚠️  未安装 aiosmtpd，使用 locmem 邮件后端（不含网络开销）'))
+            email_settings = LOCMEM_SETTINGS
+
+        try:
+            with override_settings(**email_settings):
+                with benchmark_user('benchmark_reminder', email='benchmark@example.com') as user:
+                    events = self.seed_events(user, messages)
+
+                    started = time.perf_counter()
+                    for event in events:
+                        build_reminder_message(event).send(fail_silently=False)
+                    single = time.perf_counter() - started
+                    single_connections = handler.connections if handler else None
+
+                    started = time.perf_counter()
+                    result = send_reminder_batch(events, batch_size=options['batch_size'], backoff=0)
+                    batched = time.perf_counter() - started
+                    batched_connections = handler.connections - single_connections if handler else None
+        finally:
+            if controller:
+                controller.stop()
+
+        self.stdout.write(f"\n📊 {messages} 封邮件（{email_settings['EMAIL_BACKEND'].rsplit('.', 2)[-2]}）")
+        self.stdout.write(
+            f"   - 逐封发送:  {single:7.2f} s  {messages / single:8.1f} 封/秒"
+            + (f"  {single_connections} 次建连" if handler else '')
+        )
+        self.stdout.write(
+            f"   - 批量发送:  {batched:7.2f} s  {messages / batched:8.1f} 封/秒"
+            + (f"  {batched_connections} 次建连" if handler else '')
+            + f"  ({single / batched:.1f}x)"
+        )
+        if result['failed']:
+            self.stdout.write(self.style.ERROR(f"   ❌ 批量发送失败 {len(result['failed'])} 封"))
+        self.stdout.write('\n')
+
+    def seed_events(self, user, count):
+        start = timezone.now() + timedelta(hours=1)
+        Event.objects.bulk_create([
+            Event(
+                user=user,
+                title=f'基准测试提醒 {i}',
+                description='benchmark',
+                start_time=start + timedelta(minutes=i),
+                location='昆明长水国际机场' if i % 2 else '',
+                latitude=25.1019 if i % 2 else None,
+                longitude=102.9292 if i % 2 else None,
+                email_reminder=True,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        return list(Event.objects.filter(user=user).select_related('user'))
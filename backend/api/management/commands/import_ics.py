@@ -0,0 +1,68 @@
+"""
+导入 iCalendar（.ics）文件到用户日程
+
+使用方法:
+    python manage.py import_ics export.ics --user alice
+    python manage.py import_ics export.ics --user alice --chunk-size 2000 --trace-memory
+
+与 POST /api/events/import/ 使用同一套逻辑（api.utils.ics_import）：
+流式解析、分块 bulk_create、按 UID 去重。结束后输出吞吐；
+--trace-memory 时用 tracemalloc 统计内存峰值（会明显拖慢导入）。
+"""
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.ics_import import IMPORT_CHUNK_SIZE, import_ics
+
+
+class Command(BaseCommand):
+    help = '导入 .ics 文件到用户日程（流式解析，按 UID 去重）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.ics 文件路径')
+        parser.add_argument('--user', required=True, help='导入到哪个用户（用户名）')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f'每个事务写入的日程数（默认 {IMPORT_CHUNK_SIZE}）'
+        )
+        parser.add_argument('--trace-memory', action='store_true', help='统计内存峰值（tracemalloc）')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"用户不存在: {options['user']}")
+
+        trace_memory = options['trace_memory']
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as stream:
+                result = import_ics(user, stream, chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f'无法读取文件: {e}')
+        finally:
+            elapsed = time.perf_counter() - started
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        total = result['created'] + result['duplicates'] + result['skipped'] + result['invalid']
+        self.stdout.write(self.style.SUCCESS(f"\n✅ 导入完成：{options['path']} → {user.username}"))
+        self.stdout.write(f"   - 新建: {result['created']}")
+        self.stdout.write(f"   - 已存在（UID 重复）: {result['duplicates']}")
+        self.stdout.write(f"   - 跳过（单次修改 / 已取消）: {result['skipped']}")
+        self.stdout.write(f"   - 无法解析: {result['invalid']}")
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"     ⚠️  {error['uid'] or '(无 UID)'}: {error['error']}"))
+        self.stdout.write(
+            f"\n📊 {total} 个 VEVENT，耗时 {elapsed:.2f} s，{total / elapsed if elapsed else 0:.0f} 个/秒"
+            + (f"，内存峰值 {peak / 1024 / 1024:.1f} MB" if trace_memory else '')
+            + '\n'
+        )
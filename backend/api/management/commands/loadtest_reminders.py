@@ -0,0 +1,175 @@
+"""
+提醒链路压测
+
+使用方法:
+    python manage.py loadtest_reminders
+    python manage.py loadtest_reminders --users 1000 --events 100000 --minutes 0,1
+    python manage.py loadtest_reminders --mode both --smtp --handshake-ms 50
+
+用 seed_reminders 生成集中在指定分钟的提醒，然后逐分钟模拟 Beat：
+- batch：运行 check_and_send_reminders 扫描，再同步执行它投递的 send_reminder_batch_task
+- single：按 ETA 模式为每个到期提醒执行一次 send_event_reminder_email
+报告每分钟的扫描耗时、查询数、投递任务数、发送耗时和每秒邮件数。
+
+默认使用 locmem 邮件后端；--smtp 时在本机启动 aiosmtpd 作为 SMTP 替身（需安装 aiosmtpd）。
+时间通过替换 timezone.now 模拟，任务在当前进程同步执行，不需要 Celery worker 和 Redis。
+"""
+import contextlib
+import io
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from api import tasks
+from api.utils.reminders import DUE_WINDOW, due_reminders, format_remind_at
+
+from ._bench import rolled_back
+from .benchmark_reminder_delivery import LOCMEM_SETTINGS, start_smtp_stand_in
+from .seed_reminders import parse_minutes, seed_reminders
+
+# 每个分钟内提醒时间的分布范围（秒），模拟的扫描时刻在其之后
+SPREAD_SECONDS = 30
+
+
+class Command(BaseCommand):
+    help = '提醒链路压测：逐分钟模拟扫描与发送，报告扫描耗时、任务数和每秒邮件数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='用户数（默认 100）')
+        parser.add_argument('--events', type=int, default=10000, help='提醒数（默认 10000）')
+        parser.add_argument(
+            '--minutes',
+            default='0',
+            help='提醒集中的分钟，逗号分隔（默认 0）'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['batch', 'single', 'both'],
+            default='batch',
+            help='batch = 轮询批量发送，single = ETA 逐条发送，both = 依次测试两种（默认 batch）'
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='覆盖 REMINDER_BATCH_SIZE')
+        parser.add_argument('--smtp', action='store_true', help='使用本机 aiosmtpd 替身（默认 locmem）')
+        parser.add_argument(
+            '--handshake-ms',
+            type=int,
+            default=50,
+            help='模拟每次建连的握手耗时，毫秒（默认 50，仅 --smtp）'
+        )
+
+    def handle(self, *args, **options):
+        minutes = parse_minutes(options['minutes'])
+        modes = ['batch', 'single'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("⏱️  提醒链路压测")
+        self.stdout.write(f"{'='*60}\n")
+
+        controller, handler, email_settings = None, None, LOCMEM_SETTINGS
+        if options['smtp']:
+            controller, handler, email_settings = start_smtp_stand_in(options['handshake_ms'] / 1000)
+            if not controller:
+                raise CommandError('未安装 aiosmtpd（pip install aiosmtpd），或去掉 --smtp 使用 locmem')
+
+        overrides = dict(email_settings, REMINDER_RETRY_BACKOFF_SECONDS=0)
+        if options['batch_size']:
+            overrides['REMINDER_BATCH_SIZE'] = options['batch_size']
+
+        try:
+            with override_settings(**overrides), rolled_back():
+                anchor = timezone.now().replace(second=0, microsecond=0) + timedelta(minutes=5)
+                started = time.perf_counter()
+                seed_reminders(options['users'], options['events'], minutes, anchor,
+                               prefix='loadtest_harness_', spread_seconds=SPREAD_SECONDS)
+                self.stdout.write(
+                    f"🌱 已生成 {options['users']} 个用户、{options['events']} 个提醒"
+                    f"（{time.perf_counter() - started:.1f} 秒）"
+                )
+
+                counter = (lambda: handler.received) if handler else (lambda: len(getattr(mail, 'outbox', [])))
+                for mode in modes:
+                    savepoint = transaction.savepoint()
+                    self.run_mode(mode, anchor, minutes, counter)
+                    transaction.savepoint_rollback(savepoint)
+                    if hasattr(mail, 'outbox'):
+                        mail.outbox.clear()
+        finally:
+            if controller:
+                controller.stop()
+
+        self.stdout.write('\n')
+
+    def run_mode(self, mode, anchor, minutes, counter):
+        title = 'batch（check_and_send_reminders + 批量发送）' if mode == 'batch' \
+            else 'single（ETA，send_event_reminder_email 逐条发送）'
+        self.stdout.write(f"\n📊 {title}")
+        self.stdout.write("     时刻      扫描  查询   任务    邮件      发送     封/秒")
+
+        total_emails = 0
+        total_send = 0.0
+        for minute in minutes:
+            now = anchor + timedelta(minutes=minute, seconds=SPREAD_SECONDS + 1)
+            with mock.patch('django.utils.timezone.now', return_value=now), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                scan, queries, calls = self.scan(mode, now)
+                before = counter()
+                started = time.perf_counter()
+                for task, args, kwargs in calls:
+                    task(*args, **kwargs)
+                send = time.perf_counter() - started
+                emails = counter() - before
+
+            total_emails += emails
+            total_send += send
+            if hasattr(mail, 'outbox'):
+                mail.outbox.clear()
+            self.stdout.write(
+                f"   {timezone.localtime(now).strftime('%H:%M'):>6} {scan * 1000:7.1f}ms {queries:5d} "
+                f"{len(calls):6d} {emails:7d} {send:8.2f}s {emails / send if send else 0:9.1f}"
+            )
+
+        if total_send:
+            self.stdout.write(f"   合计 {total_emails} 封，{total_emails / total_send:.1f} 封/秒")
+
+    def scan(self, mode, now):
+        """
+        执行一次扫描，返回 (耗时, 查询数, 待执行的任务 [(task, args, kwargs)])
+
+        任务的 delay / apply_async 被截获，由调用方在当前进程同步执行。
+        """
+        calls = []
+
+        def capture(task):
+            def delay(*args, **kwargs):
+                calls.append((task, args, kwargs))
+
+            def apply_async(args=(), kwargs=None, **options):
+                calls.append((task, tuple(args), kwargs or {}))
+
+            return [
+                mock.patch.object(task, 'delay', side_effect=delay),
+                mock.patch.object(task, 'apply_async', side_effect=apply_async),
+            ]
+
+        with contextlib.ExitStack() as stack:
+            for patcher in capture(tasks.send_reminder_batch_task):
+                stack.enter_context(patcher)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                if mode == 'batch':
+                    tasks.check_and_send_reminders()
+                else:
+                    # ETA 模式下任务早已按提醒时间投递，这里只查出到期的提醒逐条执行
+                    due = due_reminders(now - DUE_WINDOW, now).values_list('id', 'remind_at')
+                    calls.extend(
+                        (tasks.send_event_reminder_email, (event_id, format_remind_at(remind_at)), {})
+                        for event_id, remind_at in due
+                    )
+                elapsed = time.perf_counter() - started
+        return elapsed, len(captured), calls
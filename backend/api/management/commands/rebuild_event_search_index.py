@@ -0,0 +1,27 @@
+"""
+重建日程全文索引
+
+使用方法:
+    python manage.py rebuild_event_search_index
+
+SQLite 下重建 FTS5 表（用于索引与数据不一致时修复）；
+MySQL FULLTEXT 索引由 InnoDB 自动维护，无需重建。
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.event_search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = '重建日程全文索引（SQLite FTS5）'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_index()
+        if count is None:
+            self.stdout.write(self.style.WARNING('⚠️  当前数据库的全文索引由数据库自动维护，无需重建'))
+            return
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ 已重建全文索引：{count} 条日程，用时 {elapsed:.2f} 秒'))
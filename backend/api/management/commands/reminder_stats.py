@@ -0,0 +1,89 @@
+"""
+提醒投递指标汇总
+
+使用方法:
+    python manage.py reminder_stats
+    python manage.py reminder_stats --hours 72
+    python manage.py reminder_stats --hours 6 --json
+
+统计最近 N 小时内的提醒延迟（直方图 + 分位数）、排队时间、SMTP 耗时、
+批次大小和峰值发送速率，用于评估 Celery worker 数量是否足够。
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.utils.reminder_metrics import summarize
+
+
+class Command(BaseCommand):
+    help = '汇总最近 N 小时的提醒投递指标'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='统计最近多少小时（默认 24）'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='以 JSON 输出（便于脚本处理）'
+        )
+
+    def handle(self, *args, **options):
+        hours = options['hours']
+        stats = summarize(hours)
+
+        if options['json']:
+            stats['since'] = stats['since'].isoformat()
+            stats['delay_histogram'] = [
+                {'le': bound, 'count': count} for bound, count in stats['delay_histogram']
+            ]
+            self.stdout.write(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"📊 最近 {hours} 小时提醒投递指标")
+        self.stdout.write(f"{'='*60}\n")
+
+        if not stats['total']:
+            self.stdout.write(self.style.WARNING('⚠️  这段时间内没有投递记录'))
+            return
+
+        self.stdout.write(
+            f"📨 发送 {stats['sent']} 封，失败 {stats['failed']} 封，重试过 {stats['retried']} 封"
+        )
+        self.stdout.write(
+            f"⚡ 平均 {stats['per_minute_avg']:.2f} 封/分钟，峰值 {stats['per_minute_peak']} 封/分钟\n"
+        )
+
+        self.stdout.write("⏰ 提醒延迟（实际发送 - 应提醒时间）:")
+        self.write_distribution(stats['delay'], unit='s')
+        self.write_histogram(stats['delay_histogram'], stats['delay']['count'])
+
+        self.stdout.write("\n⏳ 排队时间:")
+        self.write_distribution(stats['queue_wait'], unit='s')
+        self.stdout.write("\n📮 SMTP 耗时（含重试）:")
+        self.write_distribution(stats['smtp'], unit='ms', scale=1000)
+        self.stdout.write("\n📦 批次大小:")
+        self.write_distribution(stats['batch_size'], unit='')
+        self.stdout.write('\n')
+
+    def write_distribution(self, dist, unit, scale=1):
+        if not dist['count']:
+            self.stdout.write('   （无数据）')
+            return
+        parts = '  '.join(
+            f"{name} {dist[name] * scale:.1f}{unit}" for name in ('avg', 'p50', 'p95', 'p99', 'max')
+        )
+        self.stdout.write(f"   {parts}  (n={dist['count']})")
+
+    def write_histogram(self, histogram, total, width=40):
+        lower = None
+        for bound, count in histogram:
+            label = f"≤ {bound}s" if bound is not None else f"> {lower}s"
+            bar = '█' * round(width * count / total) if total else ''
+            self.stdout.write(f"   {label:>8} {count:6d}  {bar}")
+            lower = bound
@@ -0,0 +1,74 @@
+"""
+时间轮提醒调度进程（REMINDER_SCHEDULING_MODE=wheel）
+
+使用方法:
+    python manage.py run_reminder_scheduler
+    python manage.py run_reminder_scheduler --horizon-minutes 120 --reload-minutes 5
+
+常驻运行：装载未来几小时内的提醒到时间轮，订阅日程变更，按秒投递到期提醒。
+只需运行一个实例（多实例时由发送前的原子认领去重）；进程停止后心跳过期，
+每分钟扫描自动接管。收到 SIGINT / SIGTERM 时退出。
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.utils.reminder_wheel import ReminderWheelScheduler, wheel_mode_enabled
+
+# 每隔多少秒输出一次状态
+STATUS_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = '时间轮提醒调度进程（按秒触发提醒）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-minutes',
+            type=int,
+            default=None,
+            help=f'装载多久以内的提醒（默认 REMINDER_WHEEL_HORIZON_MINUTES={settings.REMINDER_WHEEL_HORIZON_MINUTES}）'
+        )
+        parser.add_argument(
+            '--reload-minutes',
+            type=int,
+            default=None,
+            help=f'多久从数据库重新装载一次（默认 REMINDER_WHEEL_RELOAD_MINUTES={settings.REMINDER_WHEEL_RELOAD_MINUTES}）'
+        )
+
+    def handle(self, *args, **options):
+        if not wheel_mode_enabled():
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  当前 REMINDER_SCHEDULING_MODE={settings.REMINDER_SCHEDULING_MODE}，"
+                f"日程变更不会发布到变更通道，只能靠定期重新装载同步"
+            ))
+
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        scheduler = ReminderWheelScheduler(
+            horizon_minutes=options['horizon_minutes'],
+            reload_minutes=options['reload_minutes'],
+        )
+        loaded = scheduler.load()
+        self.stdout.write(self.style.SUCCESS(
+            f"⏱️  时间轮调度已启动：装载 {loaded} 个提醒"
+            f"（{settings.REMINDER_WHEEL_CHANGE_FEED} 变更通道）"
+        ))
+
+        next_status = time.time() + STATUS_INTERVAL
+        while not stopping:
+            scheduler.run_once()
+            if time.time() >= next_status:
+                self.stdout.write(f"📊 时间轮中 {len(scheduler.wheel)} 个提醒，累计投递 {scheduler.fired} 个")
+                next_status = time.time() + STATUS_INTERVAL
+
+        scheduler.stop()
+        self.stdout.write(f"👋 调度进程退出，累计投递 {scheduler.fired} 个提醒")
@@ -0,0 +1,136 @@
+"""
+生成提醒压测数据
+
+使用方法:
+    python manage.py seed_reminders --users 100 --events 10000
+    python manage.py seed_reminders --users 1000 --events 100000 --minutes 0,1,5 --clear
+
+生成 N 个用户（带邮箱）和 M 个开启邮件提醒的日程，提醒时间集中在
+当前整分钟之后的指定几分钟（--minutes），模拟整点集中提醒的高峰。
+用户名以 --prefix 开头，--clear 先删除同前缀的旧数据。
+
+数据用 bulk_create 写入，不投递 ETA 任务（压测由 loadtest_reminders 直接驱动扫描）。
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Event
+from api.utils.event_cache import bump_events_version
+from api.utils.event_search import index_events
+
+REMINDER_MINUTES = 15
+
+
+def parse_minutes(value):
+    try:
+        minutes = sorted({int(part) for part in value.split(',') if part.strip()})
+    except ValueError:
+        raise CommandError('--minutes 必须是逗号分隔的整数，如 0,1,5')
+    if not minutes:
+        raise CommandError('--minutes 不能为空')
+    return minutes
+
+
+def seed_reminders(users, events, minutes, anchor, prefix='loadtest_', spread_seconds=30, seed=42):
+    """
+    生成压测用户和日程
+
+    Args:
+        minutes: 提醒集中的分钟（相对 anchor）
+        anchor: 基准时间（整分钟）
+        spread_seconds: 每个分钟内提醒时间的随机分布范围
+
+    Returns:
+        list: 生成的用户
+    """
+    rng = random.Random(seed)
+    created_users = User.objects.bulk_create([
+        User(username=f'{prefix}{index}', email=f'{prefix}{index}@example.com')
+        for index in range(users)
+    ], batch_size=1000)
+    if not created_users[0].pk:
+        # 数据库不支持返回主键时重新查询
+        created_users = list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+    rows = []
+    for index in range(events):
+        remind_at = anchor + timedelta(
+            minutes=minutes[index % len(minutes)],
+            seconds=rng.uniform(0, spread_seconds),
+        )
+        event = Event(
+            user=created_users[index % users],
+            title=f'压测提醒 {index}',
+            description='loadtest',
+            start_time=remind_at + timedelta(minutes=REMINDER_MINUTES),
+            reminder_minutes=REMINDER_MINUTES,
+            location='昆明长水国际机场' if index % 3 == 0 else '',
+            email_reminder=True,
+        )
+        # bulk_create 不调用 save()，手动计算派生字段
+        event.refresh_derived_fields()
+        rows.append(event)
+        if len(rows) >= 5000:
+            _flush(rows)
+            rows = []
+    _flush(rows)
+
+    bump_events_version([user.pk for user in created_users])
+    return created_users
+
+
+def _flush(rows):
+    if rows:
+        Event.objects.bulk_create(rows, batch_size=1000)
+        # 不触发信号，手动同步全文索引（拿不到主键的数据库上 index_events 会跳过）
+        index_events(rows)
+
+
+def clear_seeded(prefix='loadtest_'):
+    """删除指定前缀的压测用户（日程级联删除）"""
+    deleted, _ = User.objects.filter(username__startswith=prefix).delete()
+    return deleted
+
+
+class Command(BaseCommand):
+    help = '生成提醒压测数据（N 个用户、M 个集中在指定分钟的提醒）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='用户数（默认 100）')
+        parser.add_argument('--events', type=int, default=10000, help='日程数（默认 10000）')
+        parser.add_argument(
+            '--minutes',
+            default='0',
+            help='提醒集中在当前整分钟之后的哪几分钟，逗号分隔（默认 0）'
+        )
+        parser.add_argument('--prefix', default='loadtest_', help='压测用户名前缀（默认 loadtest_）')
+        parser.add_argument('--clear', action='store_true', help='先删除同前缀的旧压测数据')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        minutes = parse_minutes(options['minutes'])
+        if options['users'] < 1 or options['events'] < 1:
+            raise CommandError('--users 和 --events 必须大于 0')
+
+        if options['clear']:
+            deleted = clear_seeded(prefix)
+            self.stdout.write(f"🧹 已删除 {deleted} 条旧压测数据")
+        elif User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'已存在 {prefix}* 用户，使用 --clear 先清理')
+
+        anchor = timezone.now().replace(second=0, microsecond=0)
+        started = time.perf_counter()
+        with transaction.atomic():
+            seed_reminders(options['users'], options['events'], minutes, anchor, prefix)
+        elapsed = time.perf_counter() - started
+
+        at = ', '.join(timezone.localtime(anchor + timedelta(minutes=m)).strftime('%H:%M') for m in minutes)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 已生成 {options['users']} 个用户、{options['events']} 个提醒（集中在 {at}），用时 {elapsed:.1f} 秒"
+        ))
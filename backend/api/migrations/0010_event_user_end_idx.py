@@ -0,0 +1,18 @@
+# Generated manually for windowed event queries
+# Date: 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_oauth_models'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'end_time'], name='event_user_end_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated manually for event delta sync
+# Date: 2026-10-18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0010_event_user_end_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'updated_at'], name='event_user_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='EventDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(verbose_name='日程ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='删除时间')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '日程删除记录',
+                'verbose_name_plural': '日程删除记录',
+                'indexes': [
+                    models.Index(fields=['user', 'deleted_at'], name='event_deletion_user_idx'),
+                    models.Index(fields=['deleted_at'], name='event_deletion_time_idx'),
+                ],
+            },
+        ),
+    ]
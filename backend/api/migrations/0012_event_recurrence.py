@@ -0,0 +1,49 @@
+# Generated manually for recurring events
+# Date: 2026-10-18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_event_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_rule',
+            field=models.CharField(blank=True, help_text='RFC 5545 RRULE，如 FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10，留空表示不重复', max_length=200, verbose_name='重复规则'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_end',
+            field=models.DateTimeField(blank=True, help_text='最后一次重复的结束时间（自动计算），为空表示无限重复', null=True, verbose_name='重复结束时间'),
+        ),
+        migrations.CreateModel(
+            name='EventRecurrenceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='原开始时间')),
+                ('is_cancelled', models.BooleanField(default=False, verbose_name='已取消')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='覆盖标题')),
+                ('description', models.TextField(blank=True, verbose_name='覆盖描述')),
+                ('location', models.CharField(blank=True, max_length=200, verbose_name='覆盖地点')),
+                ('start_time', models.DateTimeField(blank=True, null=True, verbose_name='覆盖开始时间')),
+                ('end_time', models.DateTimeField(blank=True, null=True, verbose_name='覆盖结束时间')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_exceptions', to='api.event', verbose_name='重复日程')),
+            ],
+            options={
+                'verbose_name': '重复日程例外',
+                'verbose_name_plural': '重复日程例外',
+                'ordering': ['original_start'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('event', 'original_start'), name='event_exception_unique_occurrence'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated manually for event full-text search
+# Date: 2026-10-18
+
+from django.db import migrations
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS api_event_fts "
+    "USING fts5(title, description, location, tokenize='trigram')"
+)
+SQLITE_FILL = (
+    "INSERT INTO api_event_fts (rowid, title, description, location) "
+    "SELECT id, title, description, location FROM api_event"
+)
+MYSQL_CREATE = (
+    "ALTER TABLE api_event ADD FULLTEXT INDEX event_fulltext_idx "
+    "(title, description, location) WITH PARSER ngram"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """SQLite 建 FTS5 表并回填；MySQL 建 ngram FULLTEXT 索引；其他数据库不处理"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_FILL)
+    elif vendor == 'mysql':
+        schema_editor.execute(MYSQL_CREATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS api_event_fts")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE api_event DROP INDEX event_fulltext_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated manually for indexed reminder scanning
+# Date: 2026-10-18
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_remind_at(apps, schema_editor):
+    """回填 remind_at = start_time - reminder_minutes"""
+    Event = apps.get_model('api', 'Event')
+    batch = []
+    for event in Event.objects.only('id', 'start_time', 'reminder_minutes').iterator(chunk_size=2000):
+        event.remind_at = event.start_time - timedelta(minutes=event.reminder_minutes or 0)
+        batch.append(event)
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ['remind_at'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['remind_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='remind_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='start_time - reminder_minutes（自动计算，供提醒扫描按索引查询）', null=True, verbose_name='提醒时间'),
+        ),
+        migrations.RunPython(fill_remind_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['notification_sent', 'email_reminder', 'remind_at'], name='event_reminder_due_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated manually for atomic reminder claiming
+# Date: 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_event_remind_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='reminder_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='worker 认领发送任务的时间，超过租期未发送视为放弃', null=True, verbose_name='提醒认领时间'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='reminder_claim_token',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, verbose_name='提醒认领令牌'),
+        ),
+    ]
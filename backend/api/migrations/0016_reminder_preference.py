@@ -0,0 +1,33 @@
+# Generated manually for daily reminder digest
+# Date: 2026-10-18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0015_event_reminder_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest_enabled', models.BooleanField(default=False, help_text='每天晚上把第二天的日程合并成一封邮件，汇总过的日程不再单独提醒', verbose_name='每日汇总')),
+                ('last_digest_date', models.DateField(blank=True, editable=False, help_text='最近一次发送汇总所对应的日程日期，防止同一天重复发送', null=True, verbose_name='最近汇总日期')),
+                ('digest_claim_token', models.CharField(blank=True, db_index=True, editable=False, max_length=32, verbose_name='汇总认领令牌')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_preference', to=settings.AUTH_USER_MODEL, verbose_name='关联用户')),
+            ],
+            options={
+                'verbose_name': '提醒偏好',
+                'verbose_name_plural': '提醒偏好列表',
+            },
+        ),
+    ]
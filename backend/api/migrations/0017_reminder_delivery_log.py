@@ -0,0 +1,36 @@
+# Generated manually for reminder delivery metrics
+# Date: 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_reminder_preference'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderDeliveryLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(verbose_name='日程ID')),
+                ('mode', models.CharField(choices=[('poll', '轮询批量'), ('eta', 'ETA 定时')], default='poll', max_length=20, verbose_name='投递方式')),
+                ('success', models.BooleanField(default=True, verbose_name='是否成功')),
+                ('remind_at', models.DateTimeField(blank=True, null=True, verbose_name='应提醒时间')),
+                ('sent_at', models.DateTimeField(verbose_name='实际发送时间')),
+                ('delay_seconds', models.FloatField(blank=True, help_text='实际发送时间 - 应提醒时间', null=True, verbose_name='提醒延迟（秒）')),
+                ('queue_wait_seconds', models.FloatField(blank=True, help_text='任务从投递到开始执行的等待时间', null=True, verbose_name='排队时间（秒）')),
+                ('smtp_seconds', models.FloatField(default=0, verbose_name='SMTP 耗时（秒）')),
+                ('attempts', models.PositiveSmallIntegerField(default=1, verbose_name='尝试次数')),
+                ('batch_size', models.PositiveIntegerField(default=1, verbose_name='批次大小')),
+            ],
+            options={
+                'verbose_name': '提醒投递日志',
+                'verbose_name_plural': '提醒投递日志列表',
+                'ordering': ['-sent_at'],
+                'indexes': [models.Index(fields=['sent_at'], name='reminder_log_sent_idx')],
+            },
+        ),
+    ]
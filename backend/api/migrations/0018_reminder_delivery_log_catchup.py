@@ -0,0 +1,19 @@
+# Generated manually for missed reminder catch-up
+# Date: 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_reminder_delivery_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reminderdeliverylog',
+            name='mode',
+            field=models.CharField(choices=[('poll', '轮询批量'), ('eta', 'ETA 定时'), ('catchup', '停机补发')], default='poll', max_length=20, verbose_name='投递方式'),
+        ),
+    ]
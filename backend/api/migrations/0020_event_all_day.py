@@ -0,0 +1,40 @@
+# Generated manually for persisted all-day flag
+# Date: 2026-10-18
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_all_day(apps, schema_editor):
+    """回填 all_day：从本地时间零点开始且持续至少 24 小时"""
+    Event = apps.get_model('api', 'Event')
+    batch = []
+    events = Event.objects.filter(end_time__gte=models.F('start_time') + timedelta(days=1))
+    for event in events.only('id', 'start_time', 'end_time').iterator(chunk_size=2000):
+        start = timezone.localtime(event.start_time)
+        if start.hour == 0 and start.minute == 0:
+            event.all_day = True
+            batch.append(event)
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ['all_day'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['all_day'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_reminder_delivery_log_wheel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='all_day',
+            field=models.BooleanField(db_index=True, default=False, editable=False, help_text='从零点开始且持续至少 24 小时（自动计算）', verbose_name='全天日程'),
+        ),
+        migrations.RunPython(fill_all_day, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated manually for iCalendar import
+# Date: 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_event_all_day'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='source_app',
+            field=models.CharField(choices=[('ralendar', 'Ralendar'), ('roamio', 'Roamio'), ('ics', 'iCalendar 导入')], default='ralendar', max_length=50, verbose_name='来源应用'),
+        ),
+    ]
@@ -2,8 +2,9 @@
 Models - 数据模型模块
 """
 from .user import AcWingUser, QQUser, UserMapping
-from .event import Event
+from .event import Event, EventRecurrenceException, EventDeletion
 from .calendar import PublicCalendar
+from .reminder import ReminderPreference, ReminderDeliveryLog
 from .calendar_data import Holiday, LunarCalendar, DailyFortune, UserFortune, DataSyncLog
 from .oauth import OAuthClient, AuthorizationCode, OAuthAccessToken, OAUTH_SCOPES, get_scope_description
 
@@ -12,7 +13,11 @@ __all__ = [
     'QQUser',
     'UserMapping',
     'Event',
+    'EventRecurrenceException',
+    'EventDeletion',
     'PublicCalendar',
+    'ReminderPreference',
+    'ReminderDeliveryLog',
     'Holiday',
     'LunarCalendar',
     'DailyFortune',
@@ -1,10 +1,71 @@
 """
 事件相关模型
 """
+from datetime import timedelta
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from urllib.parse import quote
 
+from ..utils.recurrence import compute_recurrence_end, parse_rrule, validate_rrule
+
+
+def build_map_url(map_provider, latitude, longitude, title, location):
+    """
+    根据地图服务商和坐标生成地图链接
+    
+    供 Event.map_url 和快速列表序列化共用。
+    
+    Returns:
+        str: 地图 URL，如果没有坐标则返回 None
+    """
+    if not (latitude and longitude):
+        return None
+    
+    title_encoded = quote(title)
+    
+    if map_provider == 'baidu':
+        # 百度地图导航链接
+        return (
+            f"https://api.map.baidu.com/marker"
+            f"?location={latitude},{longitude}"
+            f"&title={title_encoded}"
+            f"&content={quote(location or '')}"
+            f"&output=html"
+            f"&src=Ralendar"
+        )
+    elif map_provider == 'amap':
+        # 高德地图导航链接（注意：高德使用 经度,纬度 顺序）
+        return (
+            f"https://uri.amap.com/marker"
+            f"?position={longitude},{latitude}"
+            f"&name={title_encoded}"
+            f"&src=Ralendar"
+        )
+    elif map_provider == 'tencent':
+        # 腾讯地图导航链接
+        return (
+            f"https://apis.map.qq.com/uri/v1/marker"
+            f"?marker=coord:{latitude},{longitude};title:{title_encoded}"
+            f"&referer=Ralendar"
+        )
+    
+    return None
+
+
+def compute_all_day(start_time, end_time):
+    """
+    是否为全天日程：从本地时间零点开始，且持续至少 24 小时
+
+    迁移 0020 回填时内联了同样的规则，修改时需一并考虑。
+    """
+    if start_time is None or end_time is None or end_time - start_time < timedelta(days=1):
+        return False
+    if timezone.is_aware(start_time):
+        start_time = timezone.localtime(start_time)
+    return start_time.hour == 0 and start_time.minute == 0
+
 
 class Event(models.Model):
     """日程事件（融合版）"""
@@ -31,6 +92,7 @@ class Event(models.Model):
         choices=[
             ('ralendar', 'Ralendar'),
             ('roamio', 'Roamio'),
+            ('ics', 'iCalendar 导入'),
         ],
         default='ralendar',
         verbose_name='来源应用'
@@ -82,6 +144,56 @@ class Event(models.Model):
         verbose_name='提醒已发送',
         help_text='标记提醒是否已发送'
     )
+    remind_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='提醒时间',
+        help_text='start_time - reminder_minutes（自动计算，供提醒扫描按索引查询）'
+    )
+    reminder_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='提醒认领时间',
+        help_text='worker 认领发送任务的时间，超过租期未发送视为放弃'
+    )
+    reminder_claim_token = models.CharField(
+        max_length=32,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name='提醒认领令牌'
+    )
+    
+    # === 重复规则字段 ===
+    recurrence_rule = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='重复规则',
+        help_text='RFC 5545 RRULE，如 FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10，留空表示不重复'
+    )
+    recurrence_end = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='重复结束时间',
+        help_text='最后一次重复的结束时间（自动计算），为空表示无限重复'
+    )
+    
+    all_day = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        verbose_name='全天日程',
+        help_text='从零点开始且持续至少 24 小时（自动计算）'
+    )
+    
+    # 保存时自动计算的字段，及其依赖的字段
+    DERIVED_FIELDS = {
+        'recurrence_end': {'start_time', 'end_time', 'recurrence_rule'},
+        'remind_at': {'start_time', 'reminder_minutes'},
+        'all_day': {'start_time', 'end_time'},
+    }
     
     class Meta:
         ordering = ['start_time']
@@ -89,13 +201,72 @@ class Event(models.Model):
         verbose_name_plural = '日程列表'
         indexes = [
             models.Index(fields=['user', 'start_time'], name='event_user_start_idx'),
+            models.Index(fields=['user', 'end_time'], name='event_user_end_idx'),
+            models.Index(fields=['user', 'updated_at'], name='event_user_updated_idx'),
             models.Index(fields=['source_app', 'source_id'], name='event_source_idx'),
             models.Index(fields=['related_trip_slug'], name='event_trip_idx'),
+            # 提醒扫描：WHERE notification_sent=0 AND email_reminder=1 AND remind_at <= now
+            models.Index(
+                fields=['notification_sent', 'email_reminder', 'remind_at'],
+                name='event_reminder_due_idx'
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.start_time.strftime('%Y-%m-%d %H:%M')}"
     
+    def clean(self):
+        """后台表单等走 full_clean() 的入口：重复规则无法解析时报字段错误，而不是在 save() 中抛出"""
+        super().clean()
+        try:
+            validate_rrule(self.recurrence_rule)
+        except ValidationError as e:
+            raise ValidationError({'recurrence_rule': e.messages})
+    
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        
+        # 只更新部分字段时，连带更新受影响的派生字段
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for derived, sources in self.DERIVED_FIELDS.items():
+                if update_fields & sources:
+                    update_fields.add(derived)
+            kwargs['update_fields'] = update_fields
+        
+        super().save(*args, **kwargs)
+    
+    def refresh_derived_fields(self):
+        """
+        重新计算派生字段
+        
+        save() 会自动调用；bulk_create / bulk_update 不经过 save()，需要手动调用。
+        """
+        self.remind_at = None
+        if self.start_time is not None:
+            self.remind_at = self.start_time - timedelta(minutes=self.reminder_minutes or 0)
+        
+        self.recurrence_end = None
+        if self.recurrence_rule:
+            self.recurrence_end = compute_recurrence_end(
+                self.start_time, self.duration, parse_rrule(self.recurrence_rule)
+            )
+        
+        self.all_day = compute_all_day(self.start_time, self.end_time)
+    
+    @property
+    def duration(self):
+        """时长（没有结束时间时为 0）"""
+        if self.end_time is None:
+            return timedelta(0)
+        return self.end_time - self.start_time
+    
+    @property
+    def is_recurring(self):
+        """是否是重复日程"""
+        return bool(self.recurrence_rule)
+    
     @property
     def map_url(self):
         """
@@ -104,38 +275,9 @@ class Event(models.Model):
         Returns:
             str: 地图 URL，如果没有坐标则返回 None
         """
-        if not (self.latitude and self.longitude):
-            return None
-        
-        title_encoded = quote(self.title)
-        
-        if self.map_provider == 'baidu':
-            # 百度地图导航链接
-            return (
-                f"https://api.map.baidu.com/marker"
-                f"?location={self.latitude},{self.longitude}"
-                f"&title={title_encoded}"
-                f"&content={quote(self.location or '')}"
-                f"&output=html"
-                f"&src=Ralendar"
-            )
-        elif self.map_provider == 'amap':
-            # 高德地图导航链接（注意：高德使用 经度,纬度 顺序）
-            return (
-                f"https://uri.amap.com/marker"
-                f"?position={self.longitude},{self.latitude}"
-                f"&name={title_encoded}"
-                f"&src=Ralendar"
-            )
-        elif self.map_provider == 'tencent':
-            # 腾讯地图导航链接
-            return (
-                f"https://apis.map.qq.com/uri/v1/marker"
-                f"?marker=coord:{self.latitude},{self.longitude};title:{title_encoded}"
-                f"&referer=Ralendar"
-            )
-        
-        return None
+        return build_map_url(
+            self.map_provider, self.latitude, self.longitude, self.title, self.location
+        )
     
     @property
     def has_location(self):
@@ -147,3 +289,69 @@ class Event(models.Model):
         """是否来自 Roamio"""
         return self.source_app == 'roamio'
 
+
+class EventRecurrenceException(models.Model):
+    """
+    重复日程的单次例外
+    
+    通过 original_start（该次实例原本的开始时间）定位实例，
+    可以取消这一次，或覆盖这一次的时间、标题等。
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='recurrence_exceptions',
+        verbose_name='重复日程'
+    )
+    original_start = models.DateTimeField(verbose_name='原开始时间')
+    is_cancelled = models.BooleanField(default=False, verbose_name='已取消')
+    title = models.CharField(max_length=200, blank=True, verbose_name='覆盖标题')
+    description = models.TextField(blank=True, verbose_name='覆盖描述')
+    location = models.CharField(max_length=200, blank=True, verbose_name='覆盖地点')
+    start_time = models.DateTimeField(null=True, blank=True, verbose_name='覆盖开始时间')
+    end_time = models.DateTimeField(null=True, blank=True, verbose_name='覆盖结束时间')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    
+    class Meta:
+        ordering = ['original_start']
+        verbose_name = '重复日程例外'
+        verbose_name_plural = '重复日程例外'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'original_start'],
+                name='event_exception_unique_occurrence'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.event.title} @ {self.original_start}"
+
+
+class EventDeletion(models.Model):
+    """
+    日程删除记录（墓碑）
+    
+    增量同步时用于告诉客户端哪些日程已被删除。
+    删除用户时其日程会级联删除，墓碑不应阻塞该过程，因此不建外键约束。
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='用户'
+    )
+    event_id = models.BigIntegerField(verbose_name='日程ID')
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name='删除时间')
+    
+    class Meta:
+        verbose_name = '日程删除记录'
+        verbose_name_plural = '日程删除记录'
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='event_deletion_user_idx'),
+            models.Index(fields=['deleted_at'], name='event_deletion_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Event #{self.event_id} deleted at {self.deleted_at}"
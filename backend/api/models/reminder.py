@@ -0,0 +1,90 @@
+"""
+提醒相关模型
+"""
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class ReminderPreference(models.Model):
+    """用户的提醒偏好"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reminder_preference',
+        verbose_name='关联用户'
+    )
+    digest_enabled = models.BooleanField(
+        default=False,
+        verbose_name='每日汇总',
+        help_text='每天晚上把第二天的日程合并成一封邮件，汇总过的日程不再单独提醒'
+    )
+    last_digest_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='最近汇总日期',
+        help_text='最近一次发送汇总所对应的日程日期，防止同一天重复发送'
+    )
+    digest_claim_token = models.CharField(
+        max_length=32,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name='汇总认领令牌'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    
+    class Meta:
+        verbose_name = '提醒偏好'
+        verbose_name_plural = '提醒偏好列表'
+    
+    def __str__(self):
+        return f"{self.user.username} - {'每日汇总' if self.digest_enabled else '逐条提醒'}"
+
+
+class ReminderDeliveryLog(models.Model):
+    """
+    提醒投递日志（每封提醒一条）
+
+    用于统计提醒延迟和发送耗时，按 REMINDER_METRICS_RETENTION_DAYS 定期清理。
+    不关联日程外键：日程删除后日志仍保留。
+    """
+    MODES = [
+        ('poll', '轮询批量'),
+        ('eta', 'ETA 定时'),
+        ('catchup', '停机补发'),
+        ('wheel', '时间轮'),
+    ]
+    
+    event_id = models.BigIntegerField(verbose_name='日程ID')
+    mode = models.CharField(max_length=20, choices=MODES, default='poll', verbose_name='投递方式')
+    success = models.BooleanField(default=True, verbose_name='是否成功')
+    remind_at = models.DateTimeField(null=True, blank=True, verbose_name='应提醒时间')
+    sent_at = models.DateTimeField(verbose_name='实际发送时间')
+    delay_seconds = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='提醒延迟（秒）',
+        help_text='实际发送时间 - 应提醒时间'
+    )
+    queue_wait_seconds = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='排队时间（秒）',
+        help_text='任务从投递到开始执行的等待时间'
+    )
+    smtp_seconds = models.FloatField(default=0, verbose_name='SMTP 耗时（秒）')
+    attempts = models.PositiveSmallIntegerField(default=1, verbose_name='尝试次数')
+    batch_size = models.PositiveIntegerField(default=1, verbose_name='批次大小')
+    
+    class Meta:
+        ordering = ['-sent_at']
+        verbose_name = '提醒投递日志'
+        verbose_name_plural = '提醒投递日志列表'
+        indexes = [
+            models.Index(fields=['sent_at'], name='reminder_log_sent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_id} - {self.sent_at:%Y-%m-%d %H:%M:%S} ({self.delay_seconds}s)"
@@ -0,0 +1,191 @@
+"""
+分页器
+基于 (start_time, id) 的游标分页（keyset pagination）
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class EventCursorPagination(BasePagination):
+    """
+    日程游标分页
+
+    按 (start_time, id) 做 keyset 分页，翻页条件是
+    `start_time > t OR (start_time = t AND id > i)`，不使用 OFFSET，
+    无论翻到第几页，查询代价都与第一页相同。
+
+    游标是 base64 编码的位置信息，对客户端不透明；
+    同一位置的游标不随数据增删而失效。
+
+    查询参数：
+    - `cursor`: 上一次响应中 next / previous 链接携带的游标
+    - `page_size`: 每页数量（默认 PAGE_SIZE，最大 max_page_size）
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = 500
+    ordering = ('start_time', 'id')
+    invalid_cursor_message = '无效的分页游标'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    # ---------- 游标编解码 ----------
+
+    def encode_cursor(self, position, reverse=False):
+        """把 (start_time, id) 编码为不透明的游标"""
+        start_time, pk = position
+        payload = {'t': start_time.isoformat(), 'i': pk}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        encoded = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """解析请求中的游标，返回 (position, reverse) 或 None"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            start_time = parse_datetime(payload['t'])
+            pk = int(payload['i'])
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if start_time is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return (start_time, pk), reverse
+
+    # ---------- 分页 ----------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        position, reverse = cursor if cursor else (None, False)
+
+        descending = self.ordering[0].startswith('-')
+        # 向前翻页时反转排序，取完再倒回来
+        if reverse:
+            descending = not descending
+            queryset = queryset.order_by(*[self._flip(f) for f in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            start_time, pk = position
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'start_time__{lookup}': start_time}) |
+                Q(start_time=start_time, **{f'id__{lookup}': pk})
+            )
+
+        self.is_first_page = cursor is None
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.page_length = len(results)
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        # 空页时以请求游标本身作为边界，保证还能翻回去
+        self.next_position = self._position(results[-1]) if results else position
+        self.previous_position = self._position(results[0]) if results else position
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.previous_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_page_links(self):
+        """返回 next / previous 链接（用于函数视图自行组装响应）"""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+
+    def get_total_count(self, queryset):
+        """
+        总数（用于函数视图的 count 字段）：只在第一页（请求不带游标）计算，翻页时返回 None
+
+        翻页的代价不随页数增长，不能每页都 COUNT 全部数据；
+        第一页已经是全部数据时直接用本页行数，不再额外查询。
+        """
+        if not self.is_first_page:
+            return None
+        if not self.has_next:
+            return self.page_length
+        return queryset.count()
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ---------- 工具方法 ----------
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _position(item):
+        """取出一行数据的 (start_time, id)，兼容模型实例和 .values() 字典"""
+        if isinstance(item, dict):
+            return item['start_time'], item['id']
+        return item.start_time, item.id
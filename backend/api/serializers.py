@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Event, PublicCalendar
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from .models import Event, EventRecurrenceException, PublicCalendar, ReminderPreference
+from .models.event import build_map_url
+from .utils.recurrence import validate_rrule
 
 
 # ==================== 用户相关 ====================
@@ -74,16 +78,42 @@ class EventSerializer(serializers.ModelSerializer):
             'latitude', 'longitude', 'map_provider', 'map_url', 'has_location',
             # 提醒配置字段
             'email_reminder', 'notification_sent',
+            # 重复规则字段
+            'recurrence_rule', 'recurrence_end',
             # 派生字段
             'is_from_roamio', 'is_public_calendar'
         ]
-        read_only_fields = ['id', 'username', 'created_at', 'updated_at', 
+        read_only_fields = ['id', 'username', 'created_at', 'updated_at', 'recurrence_end',
                             'map_url', 'has_location', 'is_from_roamio', 'is_public_calendar']
     
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        Args:
+            fields: 可选，只输出指定字段（稀疏字段集），见 parse_event_fields
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+    
     def get_is_public_calendar(self, obj):
         """判断是否是公开日历事件（节日）"""
+        # 列表查询已通过 event_list_queryset 注解，无需逐行查询
+        if hasattr(obj, 'is_public_calendar'):
+            return obj.is_public_calendar
         return obj.calendars.exists()
     
+    def validate_recurrence_rule(self, value):
+        """验证重复规则，统一去掉 RRULE: 前缀并转为大写"""
+        if not value:
+            return ''
+        try:
+            validate_rrule(value)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        value = value.strip().upper()
+        return value[6:] if value.startswith('RRULE:') else value
+    
     def validate(self, data):
         """验证数据"""
         # 如果有经纬度，两者必须同时存在
@@ -103,8 +133,129 @@ class EventSerializer(serializers.ModelSerializer):
         return data
 
 
+def parse_event_fields(value):
+    """
+    解析 `fields` 查询参数（逗号分隔）
+    
+    Returns:
+        list: 按 EventSerializer 字段顺序排列的字段名；未提供时返回 None
+    """
+    if not value:
+        return None
+    
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(EventSerializer.Meta.fields)
+    if unknown:
+        raise serializers.ValidationError({'fields': f"未知字段: {', '.join(sorted(unknown))}"})
+    
+    return [name for name in EventSerializer.Meta.fields if name in requested]
+
+
+def format_event_datetime(value, tz=None):
+    """与 DRF DateTimeField 输出一致：转换到当前时区，UTC 偏移写作 Z"""
+    if value is None:
+        return None
+    value = value.astimezone(tz or timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class EventFastListSerializer:
+    """
+    只读的快速日程列表序列化
+    
+    直接把 `.values()` 查询出的字典转换为响应数据，跳过 ModelSerializer 的逐字段开销；
+    map_url / has_location 等派生字段只在被请求时计算。
+    输出与 EventSerializer(many=True).data 完全一致。
+    
+    用法：
+        fast = EventFastListSerializer(fields=['id', 'title', 'start_time'])
+        rows = queryset.values(*fast.value_fields)
+        data = fast.serialize(rows)
+    
+    queryset 需来自 event_list_queryset()（提供 is_public_calendar 注解）。
+    """
+    # 派生字段 -> 计算所需的数据库字段
+    DERIVED_DEPENDENCIES = {
+        'username': ['user__username'],
+        'map_url': ['map_provider', 'latitude', 'longitude', 'title', 'location'],
+        'has_location': ['latitude', 'longitude'],
+        'is_from_roamio': ['source_app'],
+        'is_public_calendar': ['is_public_calendar'],
+    }
+    DATETIME_FIELDS = {'start_time', 'end_time', 'created_at', 'updated_at', 'recurrence_end'}
+    # 游标分页需要的位置字段
+    POSITION_FIELDS = ['id', 'start_time']
+    
+    def __init__(self, fields=None):
+        self.fields = list(fields) if fields is not None else list(EventSerializer.Meta.fields)
+        
+        value_fields = list(self.POSITION_FIELDS)
+        for name in self.fields:
+            for dependency in self.DERIVED_DEPENDENCIES.get(name, [name]):
+                if dependency not in value_fields:
+                    value_fields.append(dependency)
+        self.value_fields = value_fields
+    
+    def serialize(self, rows):
+        """把 .values() 行转换为响应字典列表"""
+        tz = timezone.get_current_timezone()
+        builders = [(name, self._get_builder(name, tz)) for name in self.fields]
+        return [{name: build(row) for name, build in builders} for row in rows]
+    
+    def _get_builder(self, name, tz):
+        """返回从一行数据生成单个字段值的函数"""
+        if name in self.DATETIME_FIELDS:
+            return lambda row: format_event_datetime(row[name], tz)
+        
+        if name == 'username':
+            return lambda row: row['user__username']
+        if name == 'map_url':
+            return lambda row: build_map_url(
+                row['map_provider'], row['latitude'], row['longitude'], row['title'], row['location']
+            )
+        if name == 'has_location':
+            return lambda row: bool(row['latitude'] and row['longitude'])
+        if name == 'is_from_roamio':
+            return lambda row: row['source_app'] == 'roamio'
+        if name in ('latitude', 'longitude'):
+            return lambda row: None if row[name] is None else float(row[name])
+        
+        return lambda row: row[name]
+
+
+class EventRecurrenceExceptionSerializer(serializers.ModelSerializer):
+    """重复日程例外序列化器"""
+    
+    class Meta:
+        model = EventRecurrenceException
+        fields = ['id', 'original_start', 'is_cancelled', 'title', 'description',
+                  'location', 'start_time', 'end_time', 'updated_at']
+        read_only_fields = ['id', 'updated_at']
+        # original_start 由视图按 (event, original_start) 做 upsert，这里不做唯一性校验
+        validators = []
+    
+    def validate(self, data):
+        start_time = data.get('start_time')
+        end_time = data.get('end_time')
+        if start_time and end_time and end_time < start_time:
+            raise serializers.ValidationError("结束时间不能早于开始时间")
+        return data
+
+
+class ReminderPreferenceSerializer(serializers.ModelSerializer):
+    """提醒偏好序列化器"""
+    
+    class Meta:
+        model = ReminderPreference
+        fields = ['digest_enabled', 'last_digest_date', 'updated_at']
+        read_only_fields = ['last_digest_date', 'updated_at']
+
+
 class PublicCalendarSerializer(serializers.ModelSerializer):
-    events_count = serializers.IntegerField(source='events.count', read_only=True)
+    # 由视图 annotate(events_count=Count('events')) 提供，避免每个日历一次 COUNT
+    events_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = PublicCalendar
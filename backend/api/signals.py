@@ -0,0 +1,156 @@
+"""
+模型信号处理
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Event, EventDeletion, EventRecurrenceException, PublicCalendar
+from .utils.calendar_cache import bump_calendar_versions, bump_calendars_for_events
+from .utils.event_cache import bump_events_version
+from .utils.event_search import index_events, remove_events
+from .utils.reminders import cancel_reminder, schedule_reminder
+
+
+@receiver(post_delete, sender=Event, dispatch_uid='event_record_deletion')
+def record_event_deletion(sender, instance, **kwargs):
+    """删除日程时写入墓碑，供增量同步返回"""
+    EventDeletion.objects.create(user_id=instance.user_id, event_id=instance.pk)
+
+
+@receiver(post_save, sender=Event, dispatch_uid='event_search_index_on_save')
+def update_search_index(sender, instance, **kwargs):
+    """同步全文索引（SQLite FTS 表；MySQL FULLTEXT 自动维护）"""
+    index_events([instance])
+
+
+@receiver(post_delete, sender=Event, dispatch_uid='event_search_index_on_delete')
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_events([instance.pk])
+
+
+@receiver(post_save, sender=Event, dispatch_uid='event_schedule_reminder')
+def schedule_reminder_on_save(sender, instance, **kwargs):
+    """ETA 模式：事务提交后投递 / 替换 / 取消提醒任务"""
+    transaction.on_commit(lambda: schedule_reminder(instance))
+
+
+@receiver(post_delete, sender=Event, dispatch_uid='event_cancel_reminder')
+def cancel_reminder_on_delete(sender, instance, **kwargs):
+    event_id = instance.pk
+    transaction.on_commit(lambda: cancel_reminder(event_id))
+
+
+@receiver(post_save, sender=Event, dispatch_uid='event_bump_version_on_save')
+@receiver(post_delete, sender=Event, dispatch_uid='event_bump_version_on_delete')
+def bump_version_on_event_change(sender, instance, **kwargs):
+    """日程变化时更新所属用户的集合版本号（ETag）"""
+    bump_events_version([instance.user_id])
+
+
+@receiver(post_save, sender=User, dispatch_uid='user_bump_version_on_rename')
+def bump_version_on_user_save(sender, instance, created, update_fields, **kwargs):
+    """
+    列表输出中每行都带 username，改名后需要更新集合版本号（ETag）
+
+    登录时只更新 last_login（update_fields 不含 username），不需要处理。
+    """
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    bump_events_version([instance.pk])
+
+
+def _event_owner_ids(event_ids):
+    return set(
+        Event.objects.filter(pk__in=event_ids).values_list('user_id', flat=True).distinct()
+    )
+
+
+@receiver(m2m_changed, sender=PublicCalendar.events.through, dispatch_uid='calendar_events_bump_version')
+def bump_version_on_calendar_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    公开日历成员变化会改变日程的 is_public_calendar，需要更新相关用户的版本号
+
+    - reverse=False：instance 是 PublicCalendar，pk_set 是日程 ID
+    - reverse=True：instance 是 Event
+
+    成员变化的日程同时刷新 updated_at：重复实例缓存以 updated_at 为版本，
+    增量同步和 events-json 的 since 也依赖 updated_at。
+    """
+    if reverse:
+        if action == 'pre_clear':
+            instance._cleared_calendar_ids = set(instance.calendars.values_list('pk', flat=True))
+        elif action == 'post_clear':
+            _touch_events([instance.pk])
+            bump_events_version([instance.user_id])
+            bump_calendar_versions(getattr(instance, '_cleared_calendar_ids', set()))
+        elif action in ('post_add', 'post_remove'):
+            _touch_events([instance.pk])
+            bump_events_version([instance.user_id])
+            bump_calendar_versions(pk_set or ())
+        return
+
+    if action == 'pre_clear':
+        # clear 之后就查不到原来的成员了，先记下来
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+        instance._cleared_event_owner_ids = _event_owner_ids(instance._cleared_event_ids)
+    elif action == 'post_clear':
+        _touch_events(getattr(instance, '_cleared_event_ids', []))
+        bump_events_version(getattr(instance, '_cleared_event_owner_ids', set()))
+        bump_calendar_versions([instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        _touch_events(pk_set)
+        bump_events_version(_event_owner_ids(pk_set))
+        bump_calendar_versions([instance.pk])
+
+
+def _touch_events(event_ids):
+    event_ids = list(event_ids)
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=PublicCalendar, dispatch_uid='calendar_delete_bump_version')
+def bump_version_on_calendar_delete(sender, instance, **kwargs):
+    """删除公开日历时，其成员日程的 is_public_calendar 可能随之变化"""
+    event_ids = list(instance.events.values_list('pk', flat=True))
+    _touch_events(event_ids)
+    bump_events_version(_event_owner_ids(event_ids))
+
+
+@receiver(post_save, sender=EventRecurrenceException, dispatch_uid='exception_touch_series_on_save')
+@receiver(post_delete, sender=EventRecurrenceException, dispatch_uid='exception_touch_series_on_delete')
+def touch_series_on_exception_change(sender, instance, **kwargs):
+    """
+    例外变化时刷新所属系列的 updated_at
+
+    实例缓存以 updated_at 为版本，增量同步也依赖 updated_at。
+    """
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
+    owner_ids = Event.objects.filter(pk=instance.event_id).values_list('user_id', flat=True)
+    bump_events_version(owner_ids)
+    bump_calendars_for_events([instance.event_id])
+
+
+@receiver(post_save, sender=Event, dispatch_uid='event_bump_calendars_on_save')
+def bump_calendars_on_event_save(sender, instance, created, **kwargs):
+    """公开日历中的日程修改后，订阅缓存失效（新建的日程还不属于任何日历）"""
+    if not created:
+        bump_calendars_for_events([instance.pk])
+
+
+@receiver(pre_delete, sender=Event, dispatch_uid='event_bump_calendars_on_delete')
+def bump_calendars_on_event_delete(sender, instance, **kwargs):
+    """删除前查出所属日历（删除时成员关系随之级联删除，不触发 m2m_changed）"""
+    calendar_ids = list(instance.calendars.values_list('pk', flat=True))
+    if calendar_ids:
+        transaction.on_commit(lambda: bump_calendar_versions(calendar_ids))
+
+
+@receiver(post_save, sender=PublicCalendar, dispatch_uid='calendar_bump_feed_on_save')
+@receiver(post_delete, sender=PublicCalendar, dispatch_uid='calendar_bump_feed_on_delete')
+def bump_feed_on_calendar_change(sender, instance, **kwargs):
+    """日历名称、描述等变化（都在订阅内容中）"""
+    bump_calendar_versions([instance.pk])
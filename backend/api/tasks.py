@@ -3,27 +3,50 @@ Celery 异步任务
 用于发送邮件提醒和同步节假日数据
 """
 from celery import shared_task
-from django.core.mail import send_mail
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+import time
 from .models import Event
+from .utils import reminder_digest
+from .utils.reminder_mail import Delivery, build_reminder_message, send_reminder_batch
+from .utils.reminder_metrics import purge_delivery_logs, record_deliveries, seconds_between
+from .utils.reminder_wheel import scheduler_alive, wheel_mode_enabled
+from .utils.reminders import (
+    DUE_WINDOW,
+    claim_reminders,
+    due_reminders,
+    eta_mode_enabled,
+    format_remind_at,
+    overdue_reminders,
+    reconcile_schedule,
+    release_reminders,
+    shard_filter,
+    unclaimed,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+CATCH_UP_BUDGET_KEY = 'reminders:catchup:{minute}'
+
 
 @shared_task
-def send_event_reminder_email(event_id):
+def send_event_reminder_email(event_id, expected_remind_at=None):
     """
     发送单个事件的提醒邮件
     
     Args:
         event_id: 事件 ID
+        expected_remind_at: ETA 模式投递时的提醒时间；与日程当前 remind_at 不一致
+                            说明日程已改期或关闭了提醒，本任务已被新任务取代
     
     Returns:
         bool: 发送成功返回 True，否则返回 False
     """
+    token = None
+    started_at = timezone.now()
     try:
         event = Event.objects.get(id=event_id)
         
@@ -31,110 +54,43 @@ def send_event_reminder_email(event_id):
         if event.notification_sent:
             return False
         
+        # ETA 任务：日程已改期或关闭提醒，跳过
+        if expected_remind_at is not None and (
+            not event.email_reminder or format_remind_at(event.remind_at) != expected_remind_at
+        ):
+            print(f"⏭️ 提醒任务已被取代：{event.title}")
+            return False
+        
         # 检查用户是否有邮箱
         if not event.user.email:
             print(f"用户 {event.user.username} 没有设置邮箱，跳过提醒")
             return False
         
-        # 构建邮件内容
-        subject = f"📅 日程提醒：{event.title}"
-        
-        # 格式化时间
-        start_time = timezone.localtime(event.start_time).strftime('%Y年%m月%d日 %H:%M')
-        
-        # 构建位置信息
-        location_info = ""
-        if event.has_location:
-            location_info = f"\n📍 地点：{event.location or '已设置地理位置'}"
-            if event.map_url:
-                location_info += f"\n🗺️ 导航：{event.map_url}"
-        
-        # 构建消息内容（纯文本版本）
-        message = f"""
-您好 {event.user.username}，
-
-您有一个即将开始的日程：
-
-📋 标题：{event.title}
-⏰ 时间：{start_time}{location_info}
-
-{f'📝 备注：{event.description}' if event.description else ''}
-
-{'🔔 这是来自 Ralendar 旅行计划的提醒' if event.is_from_roamio else ''}
-
----
-Ralendar 日历系统
-https://app7626.acapp.acwing.com.cn
-        """
-        
-        # HTML 版本（更美观）
-        html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background: white; }}
-        .header {{ background: linear-gradient(135deg, #667eea, #764ba2); color: white; padding: 30px 20px; border-radius: 12px; text-align: center; }}
-        .header-content {{ display: flex; align-items: center; justify-content: center; gap: 15px; }}
-        .header-logo {{ width: 50px; height: 50px; border-radius: 10px; background: white; padding: 5px; box-shadow: 0 2px 8px rgba(0,0,0,0.2); }}
-        .header h2 {{ margin: 0; font-size: 26px; font-weight: 600; }}
-        .content {{ background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; }}
-        .event-card {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }}
-        .event-title {{ font-size: 20px; font-weight: bold; color: #667eea; margin-bottom: 10px; }}
-        .event-info {{ margin: 10px 0; }}
-        .event-info strong {{ color: #667eea; }}
-        .footer {{ text-align: center; color: #999; font-size: 12px; margin-top: 20px; }}
-        .button {{ display: inline-block; background: #667eea; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; margin-top: 15px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <div class="header-content">
-                <img src="https://app7626.acapp.acwing.com.cn/logo.png" alt="Ralendar" class="header-logo">
-                <h2>日程提醒</h2>
-            </div>
-        </div>
-        <div class="content">
-            <p>您好 <strong>{event.user.username}</strong>，</p>
-            <p>您有一个即将开始的日程：</p>
-            
-            <div class="event-card">
-                <div class="event-title">📋 {event.title}</div>
-                <div class="event-info"><strong>⏰ 时间：</strong>{start_time}</div>
-                {f'<div class="event-info"><strong>📍 地点：</strong>{event.location or "已设置地理位置"}</div>' if event.has_location else ''}
-                {f'<div class="event-info"><strong>📝 备注：</strong>{event.description}</div>' if event.description else ''}
-                {f'<div class="event-info" style="color: #ff6b6b;">🔔 <strong>来自 Roamio 旅行计划</strong></div>' if event.is_from_roamio else ''}
-                
-                {f'<a href="{event.map_url}" class="button">🗺️ 查看地图导航</a>' if event.map_url else ''}
-            </div>
-            
-            <p>祝您生活愉快！</p>
-        </div>
-        <div class="footer">
-            <p><strong>Ralendar 智能日历系统</strong></p>
-            <p><a href="https://app7626.acapp.acwing.com.cn" style="color: #667eea;">https://app7626.acapp.acwing.com.cn</a></p>
-        </div>
-    </div>
-</body>
-</html>
-        """
-        
-        # 发送邮件
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[event.user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        # 原子认领：其他 worker 或重试的任务已经认领时跳过，避免重复发送
+        token, claimed = claim_reminders([event.pk])
+        if not claimed.exists():
+            print(f"⏭️ 提醒已被其他任务认领：{event.title}")
+            return False
         
-        # 标记为已发送
+        # 发送邮件，并记录投递指标（ETA 任务的排队时间 = 开始执行 - 预定执行时间）
+        metrics = {
+            'queue_wait': _queue_wait(started_at, expected_remind_at),
+            'mode': 'eta' if expected_remind_at is not None else 'poll',
+        }
+        send_started = time.perf_counter()
+        try:
+            build_reminder_message(event).send(fail_silently=False)
+        except Exception:
+            _record_single(event, False, time.perf_counter() - send_started, **metrics)
+            raise
+        _record_single(event, True, time.perf_counter() - send_started, **metrics)
+        
+        # 标记为已发送，同时清除认领
         event.notification_sent = True
-        event.save(update_fields=['notification_sent'])
+        event.reminder_claimed_at = None
+        event.reminder_claim_token = ''
+        # 带上 updated_at（auto_now 只在 update_fields 包含它时写入），增量同步才能拿到变化
+        event.save(update_fields=['notification_sent', 'reminder_claimed_at', 'reminder_claim_token', 'updated_at'])
         
         print(f"✅ 成功发送提醒邮件：{event.title} -> {event.user.email}")
         return True
@@ -144,63 +100,224 @@ https://app7626.acapp.acwing.com.cn
         return False
     except Exception as e:
         print(f"❌ 发送邮件失败：{str(e)}")
+        if token:
+            release_reminders([event_id], token)
         return False
 
 
 @shared_task
-def check_and_send_reminders():
+def check_and_send_reminders(shard=None, shards=None):
     """
     定时任务：检查即将到来的事件并发送提醒
     每分钟执行一次
     
     逻辑：
-    1. 查找所有启用邮件提醒且尚未发送的事件
-    2. 计算每个事件的实际提醒时间（start_time - reminder_minutes）
-    3. 只发送那些提醒时间在当前分钟内的事件
+    直接按 remind_at（= start_time - reminder_minutes，保存时自动计算）查询
+    提醒时间落在最近 2 分钟内、启用邮件提醒且尚未发送的事件。
+    走 (notification_sent, email_reminder, remind_at) 索引，
+    扫描量只与当前到期的提醒数有关，与未来待提醒的事件总数无关。
+    到期的提醒按 REMINDER_BATCH_SIZE 分批交给 send_reminder_batch_task。
+    
+    REMINDER_SHARDS > 1 时，Beat 触发的这次调用只负责把扫描拆成按 user_id % N
+    的 N 个分片任务，由多个 worker 并行执行；发送前的原子认领保证不会重复发送。
+    
+    每次扫描还会补发宽限期内错过的提醒（见 catch_up_reminders），两种调度模式都执行。
+    
+    Args:
+        shard: 分片序号（0 ~ shards-1）
+        shards: 分片总数
     """
+    shards = shards or settings.REMINDER_SHARDS
+    if shards > 1 and shard is None:
+        for index in range(shards):
+            check_and_send_reminders.delay(shard=index, shards=shards)
+        return 0
+    
     now = timezone.now()
+    _enqueue_catch_up(now, shard, shards)
     
-    # 查找未来最多 60 分钟内的所有待提醒事件
-    # （支持用户设置的最大提前提醒时间，如提前1天=1440分钟）
-    max_advance = timedelta(minutes=1440)  # 最大支持提前1天
-    reminder_end = now + max_advance
+    if eta_mode_enabled():
+        # ETA 模式下提醒随日程保存投递，由 reconcile_reminder_schedule 兜底
+        return 0
+    if wheel_mode_enabled() and scheduler_alive():
+        # 时间轮调度进程在运行，由它按秒触发；心跳过期时这里自动接管
+        return 0
     
-    # 查找所有可能需要提醒的事件
-    candidate_events = Event.objects.filter(
+    # 容差范围：提醒时间 <= 当前时间 < 提醒时间 + 2分钟
+    # （考虑到 Celery Beat 可能有1-2分钟的延迟）
+    due_events = due_reminders(now - DUE_WINDOW, now).filter(
         start_time__gte=now,  # 事件还没开始
-        start_time__lte=reminder_end,  # 事件在时间窗口内
-        email_reminder=True,  # 启用了邮件提醒
-        notification_sent=False,  # 尚未发送
         user__email__isnull=False,  # 有邮箱
         user__email__gt='',
-    ).select_related('user')
-    
-    sent_count = 0
-    
-    for event in candidate_events:
-        # 计算实际的提醒时间
-        reminder_time = event.start_time - timedelta(minutes=event.reminder_minutes)
-        
-        # 检查是否应该在当前时刻发送提醒
-        # 容差范围：提醒时间 <= 当前时间 < 提醒时间 + 2分钟
-        # （考虑到 Celery Beat 可能有1-2分钟的延迟）
-        time_diff = (now - reminder_time).total_seconds() / 60
-        
-        if 0 <= time_diff < 2:
-            # 应该发送提醒
-            send_event_reminder_email.delay(event.id)
-            sent_count += 1
-            print(f"🔔 发送提醒：{event.title}")
-            print(f"   事件时间：{timezone.localtime(event.start_time)}")
-            print(f"   提前：{event.reminder_minutes}分钟")
-            print(f"   用户：{event.user.email}")
-    
-    if sent_count > 0:
-        print(f"✅ 本次发送了 {sent_count} 个提醒")
+    )
+    # 跳过已被认领、正在发送中的提醒
+    due_events = shard_filter(unclaimed(due_events, now), shard, shards)
+    due_ids = list(due_events.values_list('id', flat=True))
+    
+    # 每批一个任务，批内复用一个 SMTP 连接
+    batch_size = settings.REMINDER_BATCH_SIZE
+    enqueued_at = timezone.now().isoformat()
+    for index in range(0, len(due_ids), batch_size):
+        send_reminder_batch_task.delay(due_ids[index:index + batch_size], enqueued_at=enqueued_at)
+    
+    if due_ids:
+        print(f"✅ 本次投递了 {len(due_ids)} 个提醒（{-(-len(due_ids) // batch_size)} 批）")
     else:
         print(f"✓ 当前没有需要发送的提醒")
     
-    return sent_count
+    return len(due_ids)
+
+
+@shared_task
+def catch_up_reminders(shard=None, shards=None):
+    """
+    补发停机期间错过的提醒
+    Worker 启动时（worker_ready）触发一次，之后随每分钟的扫描执行
+    
+    Returns:
+        int: 本次补发投递的提醒数
+    """
+    shards = shards or settings.REMINDER_SHARDS
+    if shards > 1 and shard is None:
+        for index in range(shards):
+            catch_up_reminders.delay(shard=index, shards=shards)
+        return 0
+    return _enqueue_catch_up(timezone.now(), shard, shards)
+
+
+def _enqueue_catch_up(now, shard, shards):
+    """
+    认领宽限期内错过的提醒，分批投递并限速
+    
+    每分钟最多补发 REMINDER_CATCHUP_RATE_PER_MINUTE（按分片均分）个，
+    各批次用 countdown 均匀分布在接下来的一分钟内；剩下的留给下一分钟的扫描。
+    扫描时就认领（令牌随任务传递），还没执行的批次不会被下一次扫描重复投递。
+    """
+    rate = settings.REMINDER_CATCHUP_RATE_PER_MINUTE
+    # 同一分钟内的多次补发（Worker 启动 + 每分钟扫描、多个分片）共用一份额度
+    budget_key = CATCH_UP_BUDGET_KEY.format(minute=now.strftime('%Y%m%d%H%M'))
+    limit = min(-(-rate // shards), rate - (cache.get(budget_key) or 0))
+    if limit <= 0:
+        return 0
+    
+    overdue = shard_filter(unclaimed(overdue_reminders(now), now), shard, shards)
+    overdue_ids = list(overdue.values_list('id', flat=True)[:limit])
+    if not overdue_ids:
+        return 0
+    
+    token, claimed = claim_reminders(overdue_ids)
+    claimed_ids = list(claimed.order_by('remind_at', 'id').values_list('id', flat=True))
+    if not claimed_ids:
+        return 0
+    cache.add(budget_key, 0, timeout=120)
+    cache.incr(budget_key, len(claimed_ids))
+    
+    batch_size = settings.REMINDER_BATCH_SIZE
+    batches = [claimed_ids[index:index + batch_size] for index in range(0, len(claimed_ids), batch_size)]
+    interval = 60 / len(batches)
+    for order, batch in enumerate(batches):
+        countdown = order * interval
+        send_reminder_batch_task.apply_async(
+            args=[batch],
+            kwargs={
+                'enqueued_at': (now + timedelta(seconds=countdown)).isoformat(),
+                'token': token,
+                'mode': 'catchup',
+            },
+            countdown=countdown,
+        )
+    
+    logger.warning(f"⏪ 补发 {len(claimed_ids)} 个错过的提醒（{len(batches)} 批，分摊在 1 分钟内）")
+    return len(claimed_ids)
+
+
+def _record_single(event, ok, smtp_seconds, queue_wait, mode):
+    record_deliveries([Delivery(event, ok, smtp_seconds, 1, 1, timezone.now())], queue_wait=queue_wait, mode=mode)
+
+
+def _queue_wait(started_at, enqueued_at):
+    """任务排队秒数；enqueued_at 为任务参数里的 ISO 时间字符串"""
+    if not enqueued_at:
+        return None
+    return max(seconds_between(started_at, datetime.fromisoformat(enqueued_at)), 0.0)
+
+
+@shared_task
+def send_reminder_batch_task(event_ids, enqueued_at=None, token=None, mode='poll', remind_until=None):
+    """
+    批量发送提醒邮件（每批复用一个 SMTP 连接）
+    
+    Args:
+        event_ids: 日程 ID 列表
+        enqueued_at: 任务预定开始执行的时间（ISO 格式），用于统计排队时间
+        token: 投递前已认领时的认领令牌（补发），为空则由本任务认领
+        mode: 投递日志中的来源
+        remind_until: 只发送 remind_at 不晚于该时间（ISO 格式）的日程，
+                      投递后改期到更晚的日程不会被提前发送
+    
+    Returns:
+        dict: {'sent': 成功数, 'failed': 失败数}
+    """
+    queue_wait = _queue_wait(timezone.now(), enqueued_at)
+    
+    if remind_until:
+        event_ids = list(Event.objects.filter(
+            pk__in=event_ids, remind_at__lte=datetime.fromisoformat(remind_until)
+        ).values_list('id', flat=True))
+    
+    # 原子认领，只发送本任务认领到的日程
+    if token:
+        claimed = Event.objects.filter(
+            pk__in=event_ids, reminder_claim_token=token, notification_sent__in=[False]
+        )
+    else:
+        token, claimed = claim_reminders(event_ids)
+    events = list(claimed.exclude(user__email='').select_related('user'))
+    result = send_reminder_batch(events, queue_wait=queue_wait, mode=mode)
+    release_reminders(result['failed'], token)
+    
+    logger.info(f"📨 批量提醒：成功 {len(result['sent'])}，失败 {len(result['failed'])}")
+    return {'sent': len(result['sent']), 'failed': len(result['failed'])}
+
+
+@shared_task
+def send_daily_digests(shard=None, shards=None):
+    """
+    定时任务：每日提醒汇总
+    每天 20:00 执行
+    
+    开启每日汇总的用户，把第二天的待提醒日程合并成一封邮件。
+    每个分片一条 UPDATE 认领用户 + 一条查询取出全部日程，不按用户逐个查询；
+    分片方式与 check_and_send_reminders 相同。
+    
+    Returns:
+        int: 发送的汇总邮件数
+    """
+    shards = shards or settings.REMINDER_SHARDS
+    if shards > 1 and shard is None:
+        for index in range(shards):
+            send_daily_digests.delay(shard=index, shards=shards)
+        return 0
+    
+    result = reminder_digest.send_daily_digests(shard, shards)
+    logger.info(
+        f"📅 每日汇总：{result['users']} 封（{result['events']} 个日程），失败 {result['failed']}"
+    )
+    return result['users']
+
+
+@shared_task
+def reconcile_reminder_schedule():
+    """
+    定时任务：ETA 提醒对账（仅 eta 模式）
+    每 10 分钟执行一次
+    
+    为投递窗口内还没有投递任务的提醒补投（日程很早以前创建、worker 重启丢失任务等）。
+    """
+    checked = reconcile_schedule()
+    if checked:
+        logger.info(f"🔁 对账检查了 {checked} 个待提醒日程")
+    return checked
 
 
 @shared_task
@@ -251,3 +368,26 @@ def sync_holiday_data():
             'error': error_msg
         }
 
+
+@shared_task
+def purge_event_tombstones():
+    """
+    定时任务：清理过期的日程删除记录
+    每天凌晨执行
+    """
+    from .utils.event_sync import purge_event_tombstones as purge
+    
+    deleted_count = purge()
+    logger.info(f"🧹 清理了 {deleted_count} 条过期的日程删除记录")
+    return deleted_count
+
+
+@shared_task
+def purge_reminder_delivery_logs():
+    """
+    定时任务：清理过期的提醒投递日志
+    每天凌晨执行
+    """
+    deleted_count = purge_delivery_logs()
+    logger.info(f"🧹 清理了 {deleted_count} 条过期的提醒投递日志")
+    return deleted_count
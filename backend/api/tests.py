@@ -0,0 +1,151 @@
+"""
+日程接口测试
+
+- 列表接口的查询数不应随行数增长（select_related('user') + Exists 注解 is_public_calendar），
+  分别在 1 行和 N 行下断言查询数相同，防止 N+1 回归
+- 批量接口：非对象请求体返回 400
+- 提醒 / 汇总标记已发送后，增量同步能拿到 notification_sent 的变化
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Event, PublicCalendar, ReminderPreference
+from .tasks import send_event_reminder_email
+from .utils.event_sync import encode_sync_token
+from .utils.reminder_digest import send_daily_digests
+from .utils.reminder_mail import mark_events_notified
+
+MANY = 30
+
+
+class EventListQueryCountTests(TestCase):
+    """列表接口的查询数与行数无关"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('query_count', email='query_count@example.com')
+        self.calendar = PublicCalendar.objects.create(name='查询数', url_slug='query-count', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_events(self, count):
+        start = timezone.now() + timedelta(days=1)
+        events = [
+            Event.objects.create(
+                user=self.user,
+                title=f'日程 {i}',
+                start_time=start + timedelta(hours=i),
+                end_time=start + timedelta(hours=i + 1),
+                location='翠湖公园',
+                latitude=25.05,
+                longitude=102.70,
+                source_app='roamio',
+            )
+            for i in range(count)
+        ]
+        # 一部分日程在公开日历中，确保 is_public_calendar 两种取值都出现
+        self.calendar.events.add(*events[::2])
+        return events
+
+    def assert_query_count(self, url, queries, key=None):
+        for count in (1, MANY):
+            with self.subTest(url=url, rows=count):
+                Event.objects.filter(user=self.user).delete()
+                self.create_events(count)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                rows = data[key] if key else data.get('results', data)
+                self.assertEqual(len(rows), count)
+
+    def test_event_list(self):
+        self.assert_query_count('/api/events/', 1)
+
+    def test_event_sync(self):
+        self.assert_query_count('/api/events/sync/', 1, key='events')
+
+    def test_fusion_events_with_location(self):
+        self.assert_query_count('/api/fusion/events/with-location/', 1, key='events')
+
+    def test_fusion_events_from_roamio(self):
+        self.assert_query_count('/api/fusion/events/from-roamio/', 1, key='events')
+
+    def test_fusion_count_only_on_first_page(self):
+        self.create_events(5)
+        url = '/api/fusion/events/from-roamio/'
+        # 第一页：本页 + COUNT
+        with self.assertNumQueries(2):
+            first = self.client.get(url, {'page_size': 2}).json()
+        self.assertEqual(first['count'], 5)
+        # 翻页：只查本页，不再 COUNT
+        with self.assertNumQueries(1):
+            second = self.client.get(first['next']).json()
+        self.assertIsNone(second['count'])
+        self.assertEqual(len(second['events']), 2)
+        # 第一页即全部数据：用本页行数，不额外查询
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json()['count'], 5)
+
+
+class EventBulkTests(TestCase):
+    """批量接口的请求体校验"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('bulk', email='bulk@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_non_object_body(self):
+        operations = [{'op': 'create', 'data': {'title': '周会', 'start_time': '2026-11-10T10:00:00+08:00'}}]
+        for body in (operations, '周会', 1):
+            with self.subTest(body=body):
+                response = self.client.post('/api/events/bulk/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+        self.assertFalse(Event.objects.filter(user=self.user).exists())
+
+
+class ReminderSyncTests(TestCase):
+    """提醒标记 notification_sent 后，增量同步能拿到变化"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reminder_sync', email='reminder_sync@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        earlier = timezone.now() - timedelta(hours=1)
+        self.event = Event.objects.create(
+            user=self.user, title='周会', start_time=timezone.now() + timedelta(minutes=10), email_reminder=True,
+        )
+        # 把日程放到上次同步之前，排除 SYNC_OVERLAP 回看的影响
+        Event.objects.filter(pk=self.event.pk).update(updated_at=earlier)
+        self.sync_token = encode_sync_token(earlier + timedelta(minutes=30))
+
+    def synced_events(self):
+        response = self.client.get('/api/events/sync/', {'sync_token': self.sync_token})
+        self.assertEqual(response.status_code, 200)
+        return {event['id']: event for event in response.json()['events']}
+
+    def test_mark_events_notified(self):
+        self.assertEqual(self.synced_events(), {})
+        mark_events_notified([self.event])
+        self.assertTrue(self.synced_events()[self.event.pk]['notification_sent'])
+
+    def test_send_daily_digests(self):
+        ReminderPreference.objects.create(user=self.user, digest_enabled=True)
+        result = send_daily_digests(now=self.event.start_time - timedelta(days=1))
+        self.assertEqual(result['events'], 1)
+        self.assertTrue(self.synced_events()[self.event.pk]['notification_sent'])
+
+    def test_send_event_reminder_email(self):
+        self.assertTrue(send_event_reminder_email(self.event.pk))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(self.synced_events()[self.event.pk]['notification_sent'])
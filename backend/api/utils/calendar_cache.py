@@ -0,0 +1,194 @@
+"""
+公开日历订阅缓存（ICS / JSON）
+
+每个公开日历维护一个版本号（附带最后修改时间），日历成员变化、成员日程保存/删除、
+日历本身修改时更新。渲染好的订阅内容按 (日历, 格式, 查询参数, 版本号) 缓存，
+版本号一变旧缓存自然失效；同一版本号下所有订阅者共用一份渲染结果。
+
+响应带 ETag 和 Last-Modified，Google / Apple 日历和 Android 客户端轮询时
+版本未变直接返回 304，不再查询日程。
+
+日历列表（available）另有一个总版本号，任一日历变化时一并更新。
+"""
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+VERSION_KEY = 'calendars:feed_version:{calendar_id}'
+# 日历列表（available）的版本号：任一日历变化都会更新
+LIST_VERSION_KEY = 'calendars:list_version'
+LIST_KEY = 'calendars:available:{version}'
+# 日历列表缓存时间（秒）；版本号兜住了站内的修改，TTL 只是防止直接改库后长期不刷新
+LIST_CACHE_TIMEOUT = 300
+BODY_KEY = 'calendars:feed:{calendar_id}:{variant}:{version}'
+# 渲染结果缓存时间（秒）；版本号变化后旧内容不会再被读取，只是等待过期
+FEED_CACHE_TIMEOUT = 24 * 3600
+# 超过这个大小的订阅内容不缓存（仍然流式输出，ETag / 304 照常）
+FEED_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _new_version(previous=None):
+    # Last-Modified 精度只有秒：同一秒内再次变化时也要让时间前进，避免 If-Modified-Since 误判 304
+    modified = int(time.time())
+    if previous is not None:
+        modified = max(modified, previous['modified'] + 1)
+    return {'version': uuid.uuid4().hex[:16], 'modified': modified}
+
+
+def get_calendar_version(calendar_id):
+    """{'version': 版本号, 'modified': 最后修改时间（Unix 秒）}"""
+    key = VERSION_KEY.format(calendar_id=calendar_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_calendar_versions(calendar_ids):
+    """使指定日历的订阅缓存和日历列表缓存失效"""
+    keys = {VERSION_KEY.format(calendar_id=calendar_id) for calendar_id in calendar_ids if calendar_id is not None}
+    if keys:
+        previous = cache.get_many(keys)
+        versions = {key: _new_version(previous.get(key)) for key in keys}
+        versions[LIST_VERSION_KEY] = uuid.uuid4().hex[:16]
+        cache.set_many(versions, timeout=None)
+
+
+def get_calendars_version():
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        cache.add(LIST_VERSION_KEY, uuid.uuid4().hex[:16], timeout=None)
+        version = cache.get(LIST_VERSION_KEY)
+    return version
+
+
+def cached_calendar_list(build):
+    """
+    日历列表（available）缓存
+
+    Args:
+        build: () -> 可缓存的列表数据，缓存未命中时调用
+    """
+    key = LIST_KEY.format(version=get_calendars_version())
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=LIST_CACHE_TIMEOUT)
+    return data
+
+
+def bump_calendars_for_events(event_ids):
+    """日程变化时，使包含这些日程的公开日历失效"""
+    from ..models import PublicCalendar
+
+    event_ids = list(event_ids)
+    if event_ids:
+        bump_calendar_versions(
+            PublicCalendar.events.through.objects.filter(event_id__in=event_ids)
+            .values_list('publiccalendar_id', flat=True).distinct()
+        )
+
+
+class CalendarFeed:
+    """
+    一次订阅请求的缓存上下文
+
+    Args:
+        calendar: PublicCalendar
+        fmt: 'ics' / 'json' / 'events-json' 等，区分同一日历的不同输出
+        request: 查询参数不同的请求对应不同的缓存项
+    """
+
+    def __init__(self, calendar, fmt, request):
+        self.calendar = calendar
+        state = get_calendar_version(calendar.pk)
+        self.version = state['version']
+        self.last_modified = state['modified']
+        query = request.META.get('QUERY_STRING', '')
+        self.variant = hashlib.md5(f'{fmt}?{query}'.encode('utf-8')).hexdigest()[:16]
+        self.etag = quote_etag(hashlib.md5(f'{self.version}:{self.variant}'.encode('utf-8')).hexdigest())
+        self.request = request
+
+    @property
+    def cache_key(self):
+        return BODY_KEY.format(calendar_id=self.calendar.pk, variant=self.variant, version=self.version)
+
+    @property
+    def last_modified_at(self):
+        return datetime.fromtimestamp(self.last_modified, tz=dt_timezone.utc)
+
+    def not_modified(self):
+        """
+        条件请求命中时返回 304，否则返回 None
+
+        If-None-Match 优先；没有时才看 If-Modified-Since（RFC 7232）
+        """
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if '*' in etags or self.etag in etags or f'W/{self.etag}' in etags:
+                return self.set_headers(HttpResponseNotModified())
+            return None
+
+        if_modified_since = parse_http_date_safe(self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if if_modified_since is not None and self.last_modified <= if_modified_since:
+            return self.set_headers(HttpResponseNotModified())
+        return None
+
+    def set_headers(self, response):
+        """ETag、Last-Modified；公开内容，共享缓存可以保存但每次需要重新验证"""
+        response['ETag'] = self.etag
+        response['Last-Modified'] = http_date(self.last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def cached_body(self):
+        return cache.get(self.cache_key)
+
+    def respond(self, render, content_type):
+        """
+        返回完整内容的响应（JSON 等）
+
+        Args:
+            render: () -> bytes，缓存未命中时调用
+        """
+        body = self.cached_body()
+        if body is None:
+            body = render()
+            if len(body) <= FEED_CACHE_MAX_BYTES:
+                cache.set(self.cache_key, body, timeout=FEED_CACHE_TIMEOUT)
+        return self.set_headers(HttpResponse(body, content_type=content_type))
+
+    def stream(self, chunks, content_type):
+        """
+        返回流式响应（ICS）
+
+        缓存命中时直接返回缓存内容；未命中时边输出边收集，
+        完整输出后且不超过 FEED_CACHE_MAX_BYTES 时写入缓存。
+        """
+        body = self.cached_body()
+        if body is not None:
+            return self.set_headers(HttpResponse(body, content_type=content_type))
+        return self.set_headers(StreamingHttpResponse(self._tee(chunks), content_type=content_type))
+
+    def _tee(self, chunks):
+        collected = []
+        size = 0
+        for chunk in chunks:
+            data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            if collected is not None:
+                size += len(data)
+                if size > FEED_CACHE_MAX_BYTES:
+                    collected = None
+                else:
+                    collected.append(data)
+            yield data
+        if collected is not None:
+            cache.set(self.cache_key, b''.join(collected), timeout=FEED_CACHE_TIMEOUT)
@@ -0,0 +1,39 @@
+"""
+邮件模板渲染
+
+模板位于 templates/emails/，每种邮件一对 `<name>.txt`（纯文本）和 `<name>.html`。
+模板对象由 Django 的 cached loader 缓存（4.1+ 默认启用，DEBUG 下修改模板自动重新加载），
+渲染时只传入普通字典，不经过 RequestContext 和上下文处理器。
+"""
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+SITE_URL = 'https://app7626.acapp.acwing.com.cn'
+
+
+def render_email(name, context):
+    """
+    渲染一封邮件
+
+    Returns:
+        (text, html)
+    """
+    context = {'site_url': SITE_URL, **context}
+    return render_to_string(f'emails/{name}.txt', context), render_to_string(f'emails/{name}.html', context)
+
+
+def event_email_context(event, time_format='%Y年%m月%d日 %H:%M'):
+    """
+    日程在邮件模板中用到的字段
+
+    预先算好 map_url 等属性，模板里只做字典取值。
+    """
+    return {
+        'title': event.title,
+        'start_time': timezone.localtime(event.start_time).strftime(time_format),
+        'location': event.location,
+        'has_location': event.has_location,
+        'description': event.description,
+        'is_from_roamio': event.is_from_roamio,
+        'map_url': event.map_url,
+    }
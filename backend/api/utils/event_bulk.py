@@ -0,0 +1,163 @@
+"""
+日程批量变更
+一次请求内混合执行创建 / 更新 / 删除：先整体校验，再在同一事务中批量写入
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import Event
+from ..serializers import EventSerializer
+from .calendar_cache import bump_calendars_for_events
+from .event_cache import bump_events_version
+from .event_queries import event_list_queryset
+from .event_search import index_events
+from .reminders import schedule_reminder
+
+BULK_OPERATIONS = ('create', 'update', 'delete')
+MAX_BULK_OPERATIONS = 500
+
+
+class BulkOperationError(Exception):
+    """批量请求整体格式错误"""
+
+
+def validate_operations(user, operations):
+    """
+    校验全部操作（不写数据库）
+
+    Returns:
+        (validated, errors)
+        validated: [(index, op, payload)]，payload 为 serializer（create/update）或 Event（delete）
+        errors: [{'index': ..., 'op': ..., 'errors': ...}]
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BulkOperationError('operations 必须是非空数组')
+    if len(operations) > MAX_BULK_OPERATIONS:
+        raise BulkOperationError(f'单次最多 {MAX_BULK_OPERATIONS} 个操作')
+
+    # 一次查出所有要更新 / 删除的日程
+    target_ids = set()
+    for operation in operations:
+        if isinstance(operation, dict) and operation.get('op') in ('update', 'delete'):
+            try:
+                target_ids.add(int(operation.get('id')))
+            except (TypeError, ValueError):
+                pass
+    targets = event_list_queryset(user).in_bulk(target_ids)
+
+    validated = []
+    errors = []
+    seen_ids = set()
+
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op not in BULK_OPERATIONS:
+            errors.append({'index': index, 'op': op, 'errors': f"op 必须是 {'/'.join(BULK_OPERATIONS)}"})
+            continue
+
+        if op == 'create':
+            serializer = EventSerializer(data=operation.get('data') or {})
+            if serializer.is_valid():
+                validated.append((index, op, serializer))
+            else:
+                errors.append({'index': index, 'op': op, 'errors': serializer.errors})
+            continue
+
+        try:
+            event_id = int(operation.get('id'))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'op': op, 'errors': '缺少有效的 id'})
+            continue
+
+        event = targets.get(event_id)
+        if event is None:
+            errors.append({'index': index, 'op': op, 'errors': '事件不存在或无权访问'})
+            continue
+        if event_id in seen_ids:
+            errors.append({'index': index, 'op': op, 'errors': '同一事件在一次请求中只能操作一次'})
+            continue
+        seen_ids.add(event_id)
+
+        if op == 'delete':
+            validated.append((index, op, event))
+            continue
+
+        serializer = EventSerializer(event, data=operation.get('data') or {}, partial=True)
+        if serializer.is_valid():
+            validated.append((index, op, serializer))
+        else:
+            errors.append({'index': index, 'op': op, 'errors': serializer.errors})
+
+    return validated, errors
+
+
+@transaction.atomic
+def apply_operations(user, validated):
+    """
+    在同一事务中执行已校验的操作
+
+    - 创建：bulk_create（数据库不支持返回主键时逐条 save）
+    - 更新：bulk_update
+    - 删除：一次 delete()
+
+    Returns:
+        list: 按原请求顺序排列的结果
+    """
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    update_fields = set()
+    delete_ids = []
+
+    for index, op, payload in validated:
+        if op == 'create':
+            event = Event(user=user, **payload.validated_data)
+            event.refresh_derived_fields()
+            event.is_public_calendar = False
+            to_create.append(event)
+        elif op == 'update':
+            event = payload.instance
+            for field, value in payload.validated_data.items():
+                setattr(event, field, value)
+                update_fields.add(field)
+            event.refresh_derived_fields()
+            event.updated_at = now
+            to_update.append(event)
+        else:
+            delete_ids.append(payload.pk)
+
+    if to_create:
+        if connection.features.can_return_rows_from_bulk_insert:
+            Event.objects.bulk_create(to_create)
+        else:
+            # MySQL 的 bulk_create 拿不到自增主键，退化为逐条插入（仍在同一事务内）
+            for event in to_create:
+                event.save(force_insert=True)
+    if to_update:
+        derived_fields = {
+            derived for derived, sources in Event.DERIVED_FIELDS.items() if update_fields & sources
+        }
+        Event.objects.bulk_update(to_update, sorted(update_fields | derived_fields | {'updated_at'}))
+    if delete_ids:
+        Event.objects.filter(user=user, pk__in=delete_ids).delete()
+
+    # bulk_create / bulk_update 不触发信号，手动同步全文索引并更新集合版本
+    index_events(to_create + to_update)
+    transaction.on_commit(lambda: bump_events_version([user.id]))
+    updated_ids = [event.pk for event in to_update]
+    transaction.on_commit(lambda: bump_calendars_for_events(updated_ids))
+    for event in to_create + to_update:
+        transaction.on_commit(lambda event=event: schedule_reminder(event))
+
+    results = []
+    created_iter = iter(to_create)
+    for index, op, payload in validated:
+        if op == 'create':
+            results.append({'index': index, 'op': op, 'status': 'created',
+                             'event': EventSerializer(next(created_iter)).data})
+        elif op == 'update':
+            results.append({'index': index, 'op': op, 'status': 'updated',
+                             'event': EventSerializer(payload.instance).data})
+        else:
+            results.append({'index': index, 'op': op, 'status': 'deleted', 'id': payload.pk})
+    return results
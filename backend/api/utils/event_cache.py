@@ -0,0 +1,72 @@
+"""
+日程集合版本号与条件请求（ETag / 304）
+
+每个用户维护一个集合版本号，日程保存/删除或公开日历成员变化时更新。
+列表接口用版本号生成 ETag，客户端带 If-None-Match 轮询时，
+版本号未变即可直接返回 304，无需查询数据库和序列化。
+"""
+import hashlib
+import uuid
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'events:version:{user_id}'
+
+
+def _new_version() -> str:
+    # 随机值而非自增计数：缓存被清空后重新生成的版本号也不会与旧 ETag 撞上
+    return uuid.uuid4().hex[:16]
+
+
+def get_events_version(user_id) -> str:
+    """获取用户日程集合的当前版本号"""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_events_version(user_ids: Iterable) -> None:
+    """使指定用户的日程集合版本号失效"""
+    keys = {VERSION_KEY.format(user_id=user_id) for user_id in user_ids if user_id is not None}
+    if keys:
+        cache.set_many({key: _new_version() for key in keys}, timeout=None)
+
+
+def build_events_etag(request, user_id) -> str:
+    """
+    生成日程列表的 ETag
+
+    不同查询参数（窗口、游标、字段集）对应不同响应，因此把完整路径一起纳入计算。
+    """
+    version = get_events_version(user_id)
+    digest = hashlib.md5(f'{version}:{request.get_full_path()}'.encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+def not_modified_response(request, etag: str) -> Optional[Response]:
+    """If-None-Match 命中时返回 304 响应，否则返回 None"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return None
+
+    etags = parse_etags(if_none_match)
+    if '*' in etags or etag in etags or f'W/{etag}' in etags:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return set_etag_headers(response, etag)
+    return None
+
+
+def set_etag_headers(response, etag: str):
+    """设置 ETag 及相关缓存头（按用户区分，每次使用前需要重新验证）"""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
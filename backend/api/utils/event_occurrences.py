@@ -0,0 +1,208 @@
+"""
+重复日程实例展开
+把窗口内的普通日程和重复日程实例合并为一个按时间排序的列表
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from ..models import Event, EventRecurrenceException
+from ..serializers import EventFastListSerializer, format_event_datetime
+from .event_queries import event_list_queryset, filter_by_window
+from .recurrence import iter_occurrences, parse_rrule
+
+MAX_WINDOW = timedelta(days=366)
+OCCURRENCE_CACHE_TIMEOUT = 60 * 60
+OCCURRENCE_CACHE_KEY = 'events:occurrences:{event_id}:{version}:{start}:{end}'
+
+
+def get_occurrences(user, start, end):
+    """
+    返回与窗口 [start, end) 有交集的日程及重复实例
+
+    Returns:
+        list: 与 EventSerializer 字段一致的字典列表，按开始时间排序。
+              重复实例额外带有 `recurrence_id`（该次实例原本的开始时间）和 `is_occurrence: true`。
+    """
+    if start is None or end is None:
+        raise ValidationError({'detail': '必须同时提供 start 和 end'})
+    if end - start > MAX_WINDOW:
+        raise ValidationError({'end': f'时间窗口不能超过 {MAX_WINDOW.days} 天'})
+
+    fast_serializer = EventFastListSerializer()
+    value_fields = fast_serializer.value_fields + [
+        name for name in ('updated_at', 'recurrence_rule') if name not in fast_serializer.value_fields
+    ]
+    base = event_list_queryset(user)
+
+    singles = filter_by_window(base.filter(recurrence_rule=''), start, end)
+    single_rows = list(singles.values(*value_fields))
+    items = [
+        (row['start_time'], data)
+        for row, data in zip(single_rows, fast_serializer.serialize(single_rows))
+    ]
+
+    # 系列只要第一次开始早于窗口结束、最后一次结束晚于窗口开始，就可能有实例落在窗口内
+    series = base.exclude(recurrence_rule='').filter(start_time__lt=end).filter(
+        Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=start)
+    )
+    series_rows = list(series.values(*value_fields))
+    if not series_rows:
+        return [data for _, data in sorted(items, key=lambda item: item[0])]
+
+    exceptions = _load_exceptions([row['id'] for row in series_rows])
+    series_data = fast_serializer.serialize(series_rows)
+
+    for row, data in zip(series_rows, series_data):
+        key = OCCURRENCE_CACHE_KEY.format(
+            event_id=row['id'],
+            version=row['updated_at'].timestamp(),
+            start=start.timestamp(),
+            end=end.timestamp(),
+        )
+        occurrences = cache.get(key)
+        if occurrences is None:
+            occurrences = expand_series(row, data, exceptions.get(row['id'], {}), start, end)
+            cache.set(key, occurrences, OCCURRENCE_CACHE_TIMEOUT)
+        items.extend(occurrences)
+
+    return [data for _, data in sorted(items, key=lambda item: item[0])]
+
+
+def _load_exceptions(event_ids):
+    """一次查出所有系列的例外：{event_id: {original_start: exception}}"""
+    exceptions = {}
+    for exception in EventRecurrenceException.objects.filter(event_id__in=event_ids):
+        exceptions.setdefault(exception.event_id, {})[exception.original_start] = exception
+    return exceptions
+
+
+def expand_series(row, data, exceptions, start, end):
+    """
+    展开单个系列在窗口内的实例
+
+    Args:
+        row: 系列的 .values() 行（需包含 start_time / end_time / recurrence_rule）
+        data: 系列序列化后的字典，作为每个实例的模板
+        exceptions: {original_start: EventRecurrenceException}
+        start, end: 窗口
+
+    Returns:
+        list: [(开始时间, 实例字典)]
+    """
+    tz = timezone.get_current_timezone()
+    occurrences = []
+
+    for original_start, occurrence_start, occurrence_end, exception in iter_series_times(
+        row, exceptions, start, end
+    ):
+        item = dict(data)
+        if exception is not None:
+            for field in ('title', 'description', 'location'):
+                if getattr(exception, field):
+                    item[field] = getattr(exception, field)
+        item['start_time'] = format_event_datetime(occurrence_start, tz)
+        item['end_time'] = format_event_datetime(occurrence_end, tz)
+        item['recurrence_id'] = format_event_datetime(original_start, tz)
+        item['is_occurrence'] = True
+        occurrences.append((occurrence_start, item))
+
+    return occurrences
+
+
+def iter_series_times(row, exceptions, start, end):
+    """
+    生成系列在窗口内各实例的时间（已应用例外）
+
+    Yields:
+        (original_start, occurrence_start, occurrence_end, exception 或 None)
+    """
+    rule = parse_rrule(row['recurrence_rule'], max_count=None)
+    duration = row['end_time'] - row['start_time'] if row['end_time'] else timedelta(0)
+
+    def resolve(original_start, exception):
+        occurrence_start = original_start
+        occurrence_end = original_start + duration if row['end_time'] else None
+        if exception is not None:
+            if exception.start_time:
+                occurrence_start = exception.start_time
+                occurrence_end = exception.end_time or (
+                    occurrence_start + duration if row['end_time'] else None
+                )
+            elif exception.end_time:
+                occurrence_end = exception.end_time
+        if _overlaps(occurrence_start, occurrence_end, start, end):
+            return original_start, occurrence_start, occurrence_end, exception
+        return None
+
+    generated = set()
+    # 结束时间晚于窗口开始的实例都可能有交集，所以从 start - duration 开始生成
+    for original_start in iter_occurrences(row['start_time'], rule, after=start - duration, before=end):
+        generated.add(original_start)
+        exception = exceptions.get(original_start)
+        if exception is not None and exception.is_cancelled:
+            continue
+        resolved = resolve(original_start, exception)
+        if resolved:
+            yield resolved
+
+    # 被改期到窗口内、原时间在窗口外的实例
+    for original_start, exception in exceptions.items():
+        if original_start in generated or exception.is_cancelled or not exception.start_time:
+            continue
+        resolved = resolve(original_start, exception)
+        if resolved:
+            yield resolved
+
+
+def get_time_intervals(user, start, end, exclude_id=None):
+    """
+    窗口内所有日程（含重复实例）的时间段，不做序列化
+
+    Returns:
+        list: [(start, end, event_id, title)]，无结束时间的日程 end 为 None
+    """
+    fields = ('id', 'title', 'start_time', 'end_time', 'recurrence_rule')
+    base = Event.objects.filter(user=user)
+    if exclude_id is not None:
+        base = base.exclude(pk=exclude_id)
+
+    intervals = [
+        (row['start_time'], row['end_time'], row['id'], row['title'])
+        for row in filter_by_window(base.filter(recurrence_rule=''), start, end).values(*fields)
+    ]
+
+    series_rows = list(
+        base.exclude(recurrence_rule='').filter(start_time__lt=end).filter(
+            Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=start)
+        ).values(*fields)
+    )
+    if series_rows:
+        exceptions = _load_exceptions([row['id'] for row in series_rows])
+        for row in series_rows:
+            for _, occurrence_start, occurrence_end, exception in iter_series_times(
+                row, exceptions.get(row['id'], {}), start, end
+            ):
+                title = exception.title if exception is not None and exception.title else row['title']
+                intervals.append((occurrence_start, occurrence_end, row['id'], title))
+
+    return intervals
+
+
+def _overlaps(occurrence_start, occurrence_end, start, end):
+    if occurrence_end is None or occurrence_end == occurrence_start:
+        return start <= occurrence_start < end
+    return occurrence_start < end and occurrence_end > start
+
+
+def is_valid_occurrence(event, original_start):
+    """original_start 是否是该系列的一个实例"""
+    if not event.recurrence_rule:
+        return False
+    rule = parse_rrule(event.recurrence_rule, max_count=None)
+    return any(True for _ in iter_occurrences(
+        event.start_time, rule, after=original_start, before=original_start + timedelta(microseconds=1)
+    ))
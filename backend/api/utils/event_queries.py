@@ -0,0 +1,90 @@
+"""
+日程查询工具
+列表类接口共用的查询参数解析与过滤逻辑
+"""
+from datetime import datetime, time
+from typing import Optional, Tuple
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from ..models import Event, PublicCalendar
+
+
+def event_list_queryset(user=None):
+    """
+    列表接口共用的日程查询集
+
+    - 关联查询 user，避免序列化 username 时逐行查询
+    - 用 Exists 子查询注解 is_public_calendar，避免逐行执行 calendars.exists()
+    """
+    in_public_calendar = PublicCalendar.events.through.objects.filter(
+        event_id=OuterRef('pk')
+    )
+    queryset = Event.objects.select_related('user').annotate(
+        is_public_calendar=Exists(in_public_calendar)
+    )
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return queryset
+
+
+def parse_datetime_param(value: str, param_name: str) -> datetime:
+    """
+    解析查询参数中的时间
+
+    支持 ISO 8601 日期时间（`2025-11-01T00:00:00+08:00`）或纯日期（`2025-11-01`），
+    不带时区的值按服务器时区处理。
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValidationError({param_name: f'时间格式不正确: {value}'})
+        parsed = datetime.combine(parsed_date, time.min)
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_window(params) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    从查询参数中解析时间窗口 `start` / `end`
+
+    Returns:
+        (start, end)，未提供的一端为 None
+    """
+    start_str = params.get('start')
+    end_str = params.get('end')
+
+    start = parse_datetime_param(start_str, 'start') if start_str else None
+    end = parse_datetime_param(end_str, 'end') if end_str else None
+
+    if start and end and start >= end:
+        raise ValidationError({'end': 'end 必须晚于 start'})
+
+    return start, end
+
+
+def filter_by_window(queryset, start: Optional[datetime], end: Optional[datetime]):
+    """
+    只保留与时间窗口 [start, end) 有交集的日程
+
+    - 有结束时间的日程：start_time < end 且 end_time > start
+    - 没有结束时间的日程视为时间点：start <= start_time < end
+
+    `start_time < end` 走 event_user_start_idx，`end_time > start` 走 event_user_end_idx。
+    """
+    if end is not None:
+        queryset = queryset.filter(start_time__lt=end)
+
+    if start is not None:
+        queryset = queryset.filter(
+            Q(end_time__gt=start) |
+            Q(end_time__isnull=True, start_time__gte=start)
+        )
+
+    return queryset
@@ -0,0 +1,254 @@
+"""
+日程全文检索
+
+按数据库选择索引实现：
+- SQLite（开发环境）：FTS5 虚拟表 api_event_fts（trigram 分词，中文无需分词器），
+  由信号在日程保存/删除时同步，bm25 排序
+- MySQL（生产环境）：api_event 上的 FULLTEXT 索引（ngram 解析器），
+  InnoDB 自动维护，按 MATCH ... AGAINST 的相关度排序
+- 其他数据库：退化为 icontains
+
+短于分词长度的关键词（trigram 为 3 个字、ngram 为 2 个字）无法走索引，
+只对这些词做子串过滤；其余关键词仍先用索引缩小范围。
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'api_event_fts'
+SEARCH_COLUMNS = ('title', 'description', 'location')
+# bm25 / 相关度权重：标题 > 地点 > 描述
+SQLITE_BM25_WEIGHTS = (10.0, 2.0, 5.0)
+MAX_QUERY_TERMS = 8
+
+
+def split_terms(query):
+    """按空白拆分关键词，去重并限制数量"""
+    terms = []
+    for term in (query or '').split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def _min_token_length():
+    return 3 if connection.vendor == 'sqlite' else 2
+
+
+def _partition_terms(terms):
+    """(可走索引的关键词, 过短只能做子串匹配的关键词)"""
+    min_length = _min_token_length()
+    indexed = [term for term in terms if len(term) >= min_length]
+    short = [term for term in terms if len(term) < min_length]
+    return indexed, short
+
+
+def _fts5_query(terms):
+    # 每个词作为短语，内部双引号转义为两个双引号；多个短语之间为 AND
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _mysql_boolean_query(terms):
+    # +"词"：每个词都必须出现（ngram 解析器下按短语匹配）
+    return ' '.join('+"{}"'.format(term.replace('"', ' ')) for term in terms)
+
+
+def _short_term_sql(terms, prefix=''):
+    """子串匹配条件：每个词至少出现在一列中"""
+    clauses = []
+    params = []
+    for term in terms:
+        columns = ' OR '.join(
+            f"instr(lower({prefix}{column}), lower(%s)) > 0" if connection.vendor == 'sqlite'
+            else f"{prefix}{column} LIKE %s"
+            for column in SEARCH_COLUMNS
+        )
+        clauses.append(f'({columns})')
+        value = term if connection.vendor == 'sqlite' else f'%{_escape_like(term)}%'
+        params.extend([value] * len(SEARCH_COLUMNS))
+    return ' AND '.join(clauses), params
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', r'\%').replace('_', r'\_')
+
+
+def search_event_ids(query, user=None, limit=20, offset=0):
+    """
+    按相关度返回匹配的日程 ID
+
+    Args:
+        query: 关键词（空格分隔，全部命中才算匹配）
+        user: 只在该用户的日程中搜索（None 表示全部）
+
+    Returns:
+        list: 日程 ID，按相关度排序（只有短关键词时按开始时间倒序）
+    """
+    terms = split_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        sql, params = _sqlite_search_sql(terms, user)
+    elif connection.vendor == 'mysql':
+        sql, params = _mysql_search_sql(terms, user)
+    else:
+        queryset = _icontains_queryset(terms, user)
+        return list(queryset.order_by('-start_time', '-id').values_list('id', flat=True)[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} LIMIT %s OFFSET %s', params + [limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _sqlite_search_sql(terms, user, ranked=True):
+    indexed, short = _partition_terms(terms)
+    where = []
+    params = []
+
+    if indexed:
+        where.append(f'{FTS_TABLE} MATCH %s')
+        params.append(_fts5_query(indexed))
+    if short:
+        short_sql, short_params = _short_term_sql(short, prefix='f.')
+        where.append(short_sql)
+        params.extend(short_params)
+    if user is not None:
+        where.append('e.user_id = %s')
+        params.append(user.pk)
+
+    sql = (
+        f'SELECT e.id FROM {FTS_TABLE} f '
+        f'JOIN api_event e ON e.id = f.rowid '
+        f"WHERE {' AND '.join(where)}"
+    )
+    if not ranked:
+        return sql, params
+
+    if indexed:
+        weights = ', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        order_by = f'bm25({FTS_TABLE}, {weights}), e.start_time DESC'
+    else:
+        order_by = 'e.start_time DESC, e.id DESC'
+    return f'{sql} ORDER BY {order_by}', params
+
+
+def _mysql_search_sql(terms, user, ranked=True):
+    indexed, short = _partition_terms(terms)
+    columns = ', '.join(SEARCH_COLUMNS)
+    select_params = []
+    where = []
+    params = []
+
+    if indexed:
+        boolean_query = _mysql_boolean_query(indexed)
+        if ranked:
+            select = f'SELECT id, MATCH({columns}) AGAINST (%s IN BOOLEAN MODE) AS score FROM api_event'
+            select_params.append(boolean_query)
+        else:
+            select = 'SELECT id FROM api_event'
+        where.append(f'MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)')
+        params.append(boolean_query)
+        order_by = 'score DESC, start_time DESC'
+    else:
+        select = 'SELECT id FROM api_event'
+        order_by = 'start_time DESC, id DESC'
+    if short:
+        short_sql, short_params = _short_term_sql(short)
+        where.append(short_sql)
+        params.extend(short_params)
+    if user is not None:
+        where.append('user_id = %s')
+        params.append(user.pk)
+
+    sql = f"{select} WHERE {' AND '.join(where)}"
+    if ranked:
+        sql = f'{sql} ORDER BY {order_by}'
+    return sql, select_params + params
+
+
+def _icontains_queryset(terms, user):
+    from ..models import Event
+
+    queryset = Event.objects.all() if user is None else Event.objects.filter(user=user)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(location__icontains=term)
+        )
+    return queryset
+
+
+def search_filter(query):
+    """
+    返回可用于 Event 查询集的过滤条件（不排序，供后台搜索等场景使用）
+
+    Returns:
+        Q 或 None（没有关键词）
+    """
+    terms = split_terms(query)
+    if not terms:
+        return None
+
+    if connection.vendor not in ('sqlite', 'mysql'):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term) | Q(location__icontains=term)
+        return condition
+
+    build_sql = _sqlite_search_sql if connection.vendor == 'sqlite' else _mysql_search_sql
+    sql, params = build_sql(terms, None, ranked=False)
+    return Q(id__in=RawSQL(sql, params))
+
+
+# ==================== SQLite 索引同步 ====================
+
+def uses_fts_table():
+    """当前数据库是否需要手动维护 FTS 表（MySQL FULLTEXT 由 InnoDB 自动维护）"""
+    return connection.vendor == 'sqlite'
+
+
+def index_events(events):
+    """把日程写入（或更新）FTS 表"""
+    if not uses_fts_table():
+        return
+    rows = [
+        (event.pk, event.title or '', event.description or '', event.location or '')
+        for event in events if event.pk is not None
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, location) VALUES (%s, %s, %s, %s)',
+            rows
+        )
+
+
+def remove_events(event_ids):
+    """从 FTS 表删除日程"""
+    if not uses_fts_table():
+        return
+    event_ids = [(event_id,) for event_id in event_ids]
+    if event_ids:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', event_ids)
+
+
+def rebuild_index():
+    """
+    重建 FTS 表（SQLite）
+
+    Returns:
+        int: 写入的行数；MySQL 等无需重建时返回 None
+    """
+    if not uses_fts_table():
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, location) '
+            f'SELECT id, title, description, location FROM api_event'
+        )
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
@@ -0,0 +1,162 @@
+"""
+空闲/忙碌时段与日程冲突检测
+
+窗口内的日程只查询一次，按开始时间排序后用扫描线处理：
+- 合并忙碌时段、计算空闲间隙：一次排序 + 一次线性扫描
+- 找出两两重叠的日程：扫描时用小顶堆维护“仍在进行中”的日程
+
+整体 O(n log n + k)（k 为冲突对数），不做两两比较。
+"""
+import heapq
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from ..serializers import format_event_datetime
+from .event_occurrences import get_time_intervals
+
+
+class EventConflict(APIException):
+    """新建/修改的日程与已有日程时间重叠"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = '日程时间与已有日程冲突'
+    default_code = 'conflict'
+
+    def __init__(self, conflicts):
+        # 不经过 APIException 的 ErrorDetail 转换，保留 id 等字段的原始类型
+        self.detail = {'error': self.default_detail, 'conflicts': conflicts}
+
+
+def _timed(intervals):
+    """只保留占用时长的日程（无结束时间或零时长的日程视为时间点，不占用时段）"""
+    return sorted(
+        (interval for interval in intervals if interval[1] is not None and interval[1] > interval[0]),
+        key=lambda interval: (interval[0], interval[1]),
+    )
+
+
+def merge_busy(intervals, start=None, end=None):
+    """
+    合并重叠/相接的时间段
+
+    Args:
+        intervals: [(start, end, ...)]
+        start, end: 可选，把结果裁剪到窗口内
+
+    Returns:
+        list: [(busy_start, busy_end)]，按时间排序且互不重叠
+    """
+    merged = []
+    for interval_start, interval_end, *_ in _timed(intervals):
+        if start is not None:
+            interval_start = max(interval_start, start)
+        if end is not None:
+            interval_end = min(interval_end, end)
+        if interval_end <= interval_start:
+            continue
+        if merged and interval_start <= merged[-1][1]:
+            if interval_end > merged[-1][1]:
+                merged[-1][1] = interval_end
+        else:
+            merged.append([interval_start, interval_end])
+    return [tuple(block) for block in merged]
+
+
+def find_free_slots(busy, start, end, min_duration=timedelta(0)):
+    """
+    根据已合并的忙碌时段计算窗口内的空闲间隙
+
+    Args:
+        busy: merge_busy() 的结果
+        min_duration: 短于该时长的间隙不返回
+    """
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start - cursor >= min_duration and busy_start > cursor:
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= min_duration and end > cursor:
+        free.append((cursor, end))
+    return free
+
+
+def find_overlaps(intervals):
+    """
+    找出所有两两重叠的日程（扫描线 + 小顶堆）
+
+    按开始时间依次处理，堆里是结束时间晚于当前开始时间的日程；
+    弹出已结束的之后，堆中剩下的都与当前日程重叠。
+
+    Returns:
+        list: [(a, b)]，a、b 为原始区间元组，a 先开始
+    """
+    overlaps = []
+    active = []  # (end, 序号, interval)
+    for order, interval in enumerate(_timed(intervals)):
+        interval_start = interval[0]
+        while active and active[0][0] <= interval_start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            overlaps.append((other, interval))
+        heapq.heappush(active, (interval[1], order, interval))
+    return overlaps
+
+
+def find_conflicts(user, start, end, exclude_id=None):
+    """
+    与 [start, end) 重叠的已有日程（含重复实例）
+
+    Args:
+        exclude_id: 修改日程时排除其自身
+    """
+    if end is None or end <= start:
+        return []
+    return [
+        interval for interval in _timed(get_time_intervals(user, start, end, exclude_id=exclude_id))
+        if interval[0] < end and interval[1] > start
+    ]
+
+
+def serialize_interval(interval, tz=None):
+    interval_start, interval_end, event_id, title = interval
+    return {
+        'id': event_id,
+        'title': title,
+        'start_time': format_event_datetime(interval_start, tz),
+        'end_time': format_event_datetime(interval_end, tz),
+    }
+
+
+def get_free_busy(user, start, end, min_duration=timedelta(0)):
+    """
+    窗口内的忙碌时段、空闲时段和冲突日程
+
+    Returns:
+        dict: {'busy': [...], 'free': [...], 'conflicts': [...]}
+    """
+    tz = timezone.get_current_timezone()
+    intervals = get_time_intervals(user, start, end)
+    busy = merge_busy(intervals, start, end)
+    free = find_free_slots(busy, start, end, min_duration)
+    overlaps = find_overlaps(intervals)
+
+    # 同一日程可能出现在多对冲突里，只序列化一次
+    serialized = {}
+
+    def event_data(interval):
+        key = id(interval)
+        if key not in serialized:
+            serialized[key] = serialize_interval(interval, tz)
+        return serialized[key]
+
+    def period(pair):
+        return {'start': format_event_datetime(pair[0], tz), 'end': format_event_datetime(pair[1], tz)}
+
+    return {
+        'busy': [period(block) for block in busy],
+        'free': [period(slot) for slot in free],
+        'conflicts': [{'events': [event_data(a), event_data(b)]} for a, b in overlaps],
+    }
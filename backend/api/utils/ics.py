@@ -0,0 +1,160 @@
+"""
+iCalendar（RFC 5545）生成
+
+- TEXT 值转义：反斜杠、分号、逗号、换行
+- 折行：每行不超过 75 个字节（UTF-8），续行以一个空格开头，不拆开多字节字符
+- 时间统一输出 UTC（...Z），订阅端按自己的时区显示
+- 按块流式输出，内存占用与日程数量无关
+"""
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from ..models import EventRecurrenceException
+
+CRLF = '\r\n'
+MAX_LINE_OCTETS = 75
+UID_DOMAIN = 'kotlincalendar.com'
+ICS_CHUNK_SIZE = 500
+# 输出 VEVENT 用到的字段（只查这些列）
+ICS_FIELDS = (
+    'id', 'title', 'description', 'location', 'start_time', 'end_time', 'updated_at', 'recurrence_rule',
+)
+
+
+def escape_text(value):
+    """RFC 5545 3.3.11 TEXT 转义"""
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\r', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """RFC 5545 3.1 折行（按 UTF-8 字节计数），返回带 CRLF 的内容行"""
+    data = line.encode('utf-8')
+    if len(data) <= MAX_LINE_OCTETS:
+        return line + CRLF
+
+    parts = []
+    start = 0
+    # 续行开头的空格也占一个字节
+    limit = MAX_LINE_OCTETS
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # 不在多字节字符中间断开（UTF-8 续字节形如 0b10xxxxxx）
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end])
+        start = end
+        limit = MAX_LINE_OCTETS - 1
+    return b'\r\n '.join(parts).decode('utf-8') + CRLF
+
+
+def format_utc(value):
+    """DATE-TIME（UTC 形式），如 20261018T060000Z"""
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_uid(event_id):
+    return f'event-{event_id}@{UID_DOMAIN}'
+
+
+def _vevent(uid, dtstamp, start, end, title, description, location, extra=()):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{format_utc(dtstamp)}',
+        f'DTSTART:{format_utc(start)}',
+    ]
+    if end is not None and end > start:
+        lines.append(f'DTEND:{format_utc(end)}')
+    lines.extend(extra)
+    lines.append(f'SUMMARY:{escape_text(title)}')
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    if location:
+        lines.append(f'LOCATION:{escape_text(location)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def render_event(event, exceptions=()):
+    """
+    一个日程的 VEVENT 文本（重复日程附带 RRULE / EXDATE 和修改过的实例）
+
+    Args:
+        exceptions: 该日程的 EventRecurrenceException 列表
+    """
+    extra = []
+    overrides = []
+    if event.recurrence_rule:
+        extra.append(f'RRULE:{event.recurrence_rule}')
+        for exception in exceptions:
+            if exception.is_cancelled:
+                extra.append(f'EXDATE:{format_utc(exception.original_start)}')
+            else:
+                overrides.append(exception)
+
+    chunks = [_vevent(
+        event_uid(event.pk), event.updated_at, event.start_time, event.end_time,
+        event.title, event.description, event.location, extra,
+    )]
+    duration = event.end_time - event.start_time if event.end_time else None
+    for exception in overrides:
+        start = exception.start_time or exception.original_start
+        end = exception.end_time or (start + duration if duration else None)
+        chunks.append(_vevent(
+            event_uid(event.pk), exception.updated_at, start, end,
+            exception.title or event.title,
+            exception.description or event.description,
+            exception.location or event.location,
+            [f'RECURRENCE-ID:{format_utc(exception.original_start)}'],
+        ))
+    return ''.join(chunks)
+
+
+def _render_chunk(events):
+    """渲染一块日程；只为其中的重复日程查询一次例外"""
+    exceptions = defaultdict(list)
+    recurring_ids = [event.pk for event in events if event.recurrence_rule]
+    if recurring_ids:
+        for exception in EventRecurrenceException.objects.filter(
+            event_id__in=recurring_ids
+        ).order_by('original_start'):
+            exceptions[exception.event_id].append(exception)
+    return ''.join(render_event(event, exceptions.get(event.pk, ())) for event in events)
+
+
+def iter_calendar(name, events, chunk_size=ICS_CHUNK_SIZE):
+    """
+    逐段生成 VCALENDAR
+
+    Args:
+        name: 日历名称
+        events: Event 查询集；按 chunk_size 分块读取（iterator），每块输出一次
+    """
+    yield ''.join(fold_line(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//Ralendar//{escape_text(name)}//CN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+
+    events = events.order_by('start_time', 'id').only(*ICS_FIELDS)
+    chunk = []
+    for event in events.iterator(chunk_size=chunk_size):
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield _render_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield _render_chunk(chunk)
+
+    yield fold_line('END:VCALENDAR')
@@ -0,0 +1,355 @@
+"""
+iCalendar（RFC 5545）导入
+
+- iter_lines：逐行读取并展开折行（生成器，不把整个文件读进内存）
+- iter_vevents：逐个产出 VEVENT 的属性，VALARM / VTIMEZONE 等其他组件跳过
+- vevent_to_event：VEVENT → Event（未保存）
+- import_ics：按块 bulk_create，每块一个事务；以 UID 去重（source_app='ics', source_id=UID）
+
+内存占用只与块大小有关，与文件大小无关。
+"""
+import hashlib
+import re
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import Event
+from .event_cache import bump_events_version
+from .event_search import index_events
+
+SOURCE_APP = 'ics'
+IMPORT_CHUNK_SIZE = 1000
+# 结果中最多返回的错误明细条数
+MAX_REPORTED_ERRORS = 20
+
+_TEXT_UNESCAPE = re.compile(r'\\([\\;,nN])')
+_DURATION = re.compile(
+    r'^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+
+class ICSParseError(ValueError):
+    """单个 VEVENT 无法导入（缺少 DTSTART、时间格式错误等）"""
+
+
+def iter_lines(stream):
+    """
+    逐行读取内容行并展开折行（RFC 5545 3.1）
+
+    折行按字节计数，可能把一个多字节 UTF-8 字符拆在两行，所以先按字节拼接再解码。
+
+    Args:
+        stream: 可迭代的行（UTF-8 字节或文本），如打开的文件、UploadedFile
+    """
+    parts = None
+    for raw in stream:
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        line = raw.rstrip(b'\r\n')
+        if line[:1] in (b' ', b'\t'):
+            if parts is not None:
+                parts.append(line[1:])
+            continue
+        if parts is not None:
+            yield _decode(parts)
+        parts = [line] if line else None
+    if parts is not None:
+        yield _decode(parts)
+
+
+def _decode(parts):
+    return b''.join(parts).decode('utf-8', errors='replace')
+
+
+def parse_content_line(line):
+    """
+    拆分内容行
+
+    Returns:
+        (name, params, value)：name 大写，params 为 {参数名: 值}
+    """
+    colon = line.find(':')
+    quote = line.find('"')
+    if 0 <= quote < colon:
+        # 参数值带引号：引号内的冒号不算分隔符（少见，逐字符扫描）
+        in_quotes = False
+        colon = -1
+        for index, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ':' and not in_quotes:
+                colon = index
+                break
+    if colon < 0:
+        raise ICSParseError(f'内容行缺少冒号: {line[:50]}')
+
+    head, value = line[:colon], line[colon + 1:]
+    parts = head.split(';')
+    params = {}
+    for part in parts[1:]:
+        key, _, param_value = part.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return parts[0].upper(), params, value
+
+
+def unescape_text(value):
+    """TEXT 反转义（与 ics.escape_text 相反）"""
+    return _TEXT_UNESCAPE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+
+def parse_ics_datetime(value, params):
+    """
+    解析 DATE / DATE-TIME
+
+    - 20261018：全天，按服务器时区零点
+    - 20261018T060000Z：UTC
+    - TZID=Asia/Shanghai:20261018T140000：指定时区（未知时区按服务器时区）
+    - 20261018T140000：浮动时间，按服务器时区
+    """
+    value = value.strip()
+    try:
+        if params.get('VALUE') == 'DATE' or len(value) == 8:
+            parsed = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+            return timezone.make_aware(datetime.combine(parsed, datetime.min.time())), True
+        if value.endswith('Z'):
+            return datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=dt_timezone.utc), False
+        parsed = datetime.strptime(value, '%Y%m%dT%H%M%S')
+    except ValueError:
+        raise ICSParseError(f'时间格式不正确: {value}')
+
+    tzid = params.get('TZID')
+    if tzid:
+        try:
+            return parsed.replace(tzinfo=ZoneInfo(tzid)), False
+        except (ZoneInfoNotFoundError, ValueError, OSError):
+            # 未知时区、非法名称，或者名称指向时区数据库中的目录（如 'Asia'）
+            pass
+    return timezone.make_aware(parsed), False
+
+
+def parse_duration(value):
+    """DURATION（如 PT1H30M、P1D、-PT15M）"""
+    value = value.strip()
+    match = _DURATION.match(value)
+    if not match or not any(match.group(key) for key in ('weeks', 'days', 'hours', 'minutes', 'seconds')):
+        raise ICSParseError(f'时长格式不正确: {value}')
+    parts = {key: int(number or 0) for key, number in match.groupdict().items() if key != 'sign'}
+    duration = timedelta(**parts)
+    return -duration if match.group('sign') == '-' else duration
+
+
+def iter_vevents(lines):
+    """
+    逐个产出 VEVENT
+
+    Yields:
+        dict: {属性名: (params, value)}，同名属性保留第一个；
+        VALARM 的 TRIGGER 以 'ALARM-TRIGGER' 记录（只取第一个提醒）
+    """
+    vevent = None
+    nested = []
+    for line in lines:
+        if not line:
+            continue
+        upper = line.upper()
+        if upper == 'BEGIN:VEVENT':
+            vevent = {}
+            nested = []
+            continue
+        if vevent is None:
+            continue
+        if upper == 'END:VEVENT':
+            yield vevent
+            vevent = None
+            continue
+        if upper.startswith('BEGIN:'):
+            nested.append(upper[6:])
+            continue
+        if upper.startswith('END:'):
+            if nested:
+                nested.pop()
+            continue
+
+        try:
+            name, params, value = parse_content_line(line)
+        except ICSParseError:
+            continue
+        if nested:
+            if nested[-1] == 'VALARM' and name == 'TRIGGER':
+                vevent.setdefault('ALARM-TRIGGER', (params, value))
+            continue
+        vevent.setdefault(name, (params, value))
+
+
+def _text(vevent, name, max_length=None):
+    if name not in vevent:
+        return ''
+    value = unescape_text(vevent[name][1]).strip()
+    return value[:max_length] if max_length else value
+
+
+def event_source_id(vevent):
+    """
+    去重用的 source_id：UID（超出字段长度时取哈希）
+
+    没有 UID 的 VEVENT 按 DTSTART + SUMMARY 生成，同一文件重复导入时仍能去重。
+    """
+    uid = vevent['UID'][1].strip() if 'UID' in vevent else ''
+    if not uid:
+        uid = 'nouid:' + hashlib.sha1(
+            f"{vevent.get('DTSTART', ({}, ''))[1]}|{vevent.get('SUMMARY', ({}, ''))[1]}".encode('utf-8')
+        ).hexdigest()
+    max_length = Event._meta.get_field('source_id').max_length
+    if len(uid) > max_length:
+        uid = hashlib.sha1(uid.encode('utf-8')).hexdigest()
+    return uid
+
+
+def vevent_to_event(user, vevent):
+    """
+    VEVENT → 未保存的 Event（已计算派生字段）
+
+    Raises:
+        ICSParseError: 缺少 DTSTART、时间或重复规则无法解析
+    """
+    if 'DTSTART' not in vevent:
+        raise ICSParseError('缺少 DTSTART')
+    start_params, start_value = vevent['DTSTART']
+    start_time, is_date = parse_ics_datetime(start_value, start_params)
+
+    end_time = None
+    if 'DTEND' in vevent:
+        end_time, _ = parse_ics_datetime(vevent['DTEND'][1], vevent['DTEND'][0])
+    elif 'DURATION' in vevent:
+        end_time = start_time + parse_duration(vevent['DURATION'][1])
+    elif is_date:
+        # 只有 DATE 形式的 DTSTART：持续一天（RFC 5545 3.6.1）
+        end_time = start_time + timedelta(days=1)
+    if end_time is not None and end_time <= start_time:
+        end_time = None
+
+    event = Event(
+        user=user,
+        title=_text(vevent, 'SUMMARY', 200) or '(无标题)',
+        description=_text(vevent, 'DESCRIPTION'),
+        location=_text(vevent, 'LOCATION', 200),
+        start_time=start_time,
+        end_time=end_time,
+        recurrence_rule=vevent['RRULE'][1].strip() if 'RRULE' in vevent else '',
+        source_app=SOURCE_APP,
+        source_id=event_source_id(vevent),
+    )
+    if 'ALARM-TRIGGER' in vevent:
+        trigger_params, trigger = vevent['ALARM-TRIGGER']
+        if trigger_params.get('VALUE', 'DURATION') == 'DURATION':
+            try:
+                minutes = int(-parse_duration(trigger).total_seconds() // 60)
+            except ICSParseError:
+                minutes = None
+            if minutes is not None and minutes >= 0:
+                event.reminder_minutes = minutes
+
+    if len(event.recurrence_rule) > Event._meta.get_field('recurrence_rule').max_length:
+        raise ICSParseError('重复规则过长')
+    try:
+        event.refresh_derived_fields()
+    except ValueError as e:
+        raise ICSParseError(f'重复规则无法解析: {e}')
+    return event
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_ics(user, stream, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    导入 .ics 到用户日程
+
+    每 chunk_size 个 VEVENT 一个事务：先查出已导入过的 UID，其余 bulk_create。
+    修改过的单次重复（带 RECURRENCE-ID）和已取消（STATUS:CANCELLED）的 VEVENT 跳过。
+    导入的日程不开启邮件提醒，不需要投递提醒任务。
+
+    Args:
+        stream: 可迭代的行（文件对象、UploadedFile 等）
+
+    Returns:
+        dict: {'created': 新建数, 'duplicates': 已存在（按 UID）数, 'skipped': 跳过数,
+               'invalid': 无法解析数, 'errors': [{'uid': ..., 'error': ...}]（最多 MAX_REPORTED_ERRORS 条）}
+    """
+    result = {'created': 0, 'duplicates': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+
+    for chunk in _chunked(iter_vevents(iter_lines(stream)), chunk_size):
+        events = {}
+        for vevent in chunk:
+            status = vevent.get('STATUS', ({}, ''))[1].strip().upper()
+            if 'RECURRENCE-ID' in vevent or status == 'CANCELLED':
+                result['skipped'] += 1
+                continue
+            try:
+                event = vevent_to_event(user, vevent)
+            except ICSParseError as e:
+                result['invalid'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    uid = vevent['UID'][1].strip() if 'UID' in vevent else ''
+                    result['errors'].append({'uid': uid, 'error': str(e)})
+                continue
+            if event.source_id in events:
+                result['duplicates'] += 1
+                continue
+            events[event.source_id] = event
+
+        if events:
+            created = _import_chunk(user, events)
+            result['created'] += created
+            result['duplicates'] += len(events) - created
+
+    if result['created']:
+        bump_events_version([user.id])
+    return result
+
+
+@transaction.atomic
+def _import_chunk(user, events):
+    """
+    写入一块日程，跳过该用户已导入过的 UID
+
+    Args:
+        events: {source_id: Event}
+
+    Returns:
+        int: 新建数
+    """
+    # 走 event_source_idx (source_app, source_id)；前面的块已提交，跨块的重复 UID 也能查到
+    existing = set(
+        Event.objects.filter(user=user, source_app=SOURCE_APP, source_id__in=list(events))
+        .values_list('source_id', flat=True)
+    )
+    to_create = [event for source_id, event in events.items() if source_id not in existing]
+    if not to_create:
+        return 0
+
+    Event.objects.bulk_create(to_create)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # MySQL 的 bulk_create 拿不到自增主键，按 source_id 查回来（同一用户内唯一）
+        ids = dict(
+            Event.objects.filter(
+                user=user, source_app=SOURCE_APP, source_id__in=[event.source_id for event in to_create]
+            ).values_list('source_id', 'pk')
+        )
+        for event in to_create:
+            event.pk = ids.get(event.source_id)
+
+    # bulk_create 不触发信号，手动同步全文索引
+    index_events(to_create)
+    return len(to_create)
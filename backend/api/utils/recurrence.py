@@ -0,0 +1,259 @@
+"""
+重复日程展开引擎
+支持 RFC 5545 RRULE 的常用子集：
+
+    FREQ=DAILY|WEEKLY|MONTHLY|YEARLY
+    INTERVAL=n
+    COUNT=n（不超过 MAX_COUNT）/ UNTIL=20251231T235959Z（二选一）
+    BYDAY=MO,WE,FR（仅 WEEKLY）
+
+展开是惰性的：直接算出窗口内第一个实例的位置再向后生成，
+“永远每周一次”的系列在窗口外不产生任何计算。
+"""
+import calendar as calendar_module
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+# COUNT 上限：保存时 compute_recurrence_end 要逐个走到最后一个实例
+MAX_COUNT = 1000
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+@dataclass
+class RecurrenceRule:
+    """解析后的重复规则"""
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    byday: List[int] = field(default_factory=list)  # 0=周一 ... 6=周日
+
+
+def parse_rrule(value: str, max_count: Optional[int] = MAX_COUNT) -> RecurrenceRule:
+    """
+    解析 RRULE 字符串（可带 `RRULE:` 前缀）
+
+    Args:
+        max_count: COUNT 上限；展开已保存的规则时传 None（上限之前保存的系列仍能显示）
+
+    Raises:
+        ValueError: 规则不合法或使用了不支持的部分
+    """
+    value = (value or '').strip()
+    if value.upper().startswith('RRULE:'):
+        value = value[6:]
+    if not value:
+        raise ValueError('重复规则不能为空')
+
+    parts = {}
+    for item in value.split(';'):
+        if not item:
+            continue
+        key, sep, val = item.partition('=')
+        if not sep:
+            raise ValueError(f'无法解析的规则片段: {item}')
+        parts[key.strip().upper()] = val.strip()
+
+    freq = parts.pop('FREQ', '').upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ 必须是 {'/'.join(FREQUENCIES)}")
+    rule = RecurrenceRule(freq=freq)
+
+    if 'INTERVAL' in parts:
+        rule.interval = _positive_int(parts.pop('INTERVAL'), 'INTERVAL')
+    if 'COUNT' in parts:
+        rule.count = _positive_int(parts.pop('COUNT'), 'COUNT')
+        if max_count is not None and rule.count > max_count:
+            raise ValueError(f'COUNT 不能超过 {max_count}，更长的系列请使用 UNTIL 或不设结束')
+    if 'UNTIL' in parts:
+        rule.until = _parse_until(parts.pop('UNTIL'))
+    if rule.count is not None and rule.until is not None:
+        raise ValueError('COUNT 和 UNTIL 不能同时使用')
+
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY 仅支持 FREQ=WEEKLY')
+        days = []
+        for day in parts.pop('BYDAY').upper().split(','):
+            if day not in WEEKDAYS:
+                raise ValueError(f'无法识别的 BYDAY: {day}')
+            days.append(WEEKDAYS.index(day))
+        rule.byday = sorted(set(days))
+
+    parts.pop('WKST', None)  # 周起始日固定为周一
+    if parts:
+        raise ValueError(f"不支持的规则参数: {', '.join(sorted(parts))}")
+
+    return rule
+
+
+def validate_rrule(value: str) -> None:
+    """
+    校验重复规则（模型 clean() 和序列化器共用），空值视为不重复
+
+    Raises:
+        ValidationError: 规则无法解析
+    """
+    if not value:
+        return
+    try:
+        parse_rrule(value)
+    except ValueError as e:
+        raise ValidationError(str(e), code='invalid')
+
+
+def _positive_int(value, name):
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f'{name} 必须是正整数')
+    if number < 1:
+        raise ValueError(f'{name} 必须是正整数')
+    return number
+
+
+def _parse_until(value):
+    formats = ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S', '%Y%m%d')
+    for fmt in formats:
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if value.endswith('Z'):
+            return parsed.replace(tzinfo=timezone.utc)
+        if fmt == '%Y%m%d':
+            # 只有日期的 UNTIL 包含当天全天
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        return timezone.make_aware(parsed)
+    raise ValueError(f'无法解析的 UNTIL: {value}')
+
+
+def iter_occurrences(dtstart: datetime, rule: RecurrenceRule,
+                     after: Optional[datetime] = None,
+                     before: Optional[datetime] = None) -> Iterator[datetime]:
+    """
+    按时间顺序惰性生成实例的开始时间
+
+    Args:
+        dtstart: 系列第一个实例的开始时间
+        rule: 重复规则
+        after: 只生成 >= after 的实例
+        before: 只生成 < before 的实例（不传则一直生成，直到 COUNT/UNTIL 结束）
+
+    计算在服务器本地时区进行，保证“每天 9 点”跨越夏令时依然是 9 点。
+    """
+    tz = timezone.get_current_timezone()
+    local_start = timezone.localtime(dtstart, tz).replace(tzinfo=None)
+    local_after = timezone.localtime(after, tz).replace(tzinfo=None) if after else None
+
+    if rule.freq in ('MONTHLY', 'YEARLY'):
+        naive_iter = _iter_monthly(local_start, rule, local_after)
+    elif rule.freq == 'WEEKLY' and rule.byday:
+        naive_iter = _iter_weekly_byday(local_start, rule, local_after)
+    else:
+        days = rule.interval * (7 if rule.freq == 'WEEKLY' else 1)
+        naive_iter = _iter_fixed_step(local_start, timedelta(days=days), rule, local_after)
+
+    for naive in naive_iter:
+        occurrence = timezone.make_aware(naive, tz)
+        if rule.until is not None and occurrence > rule.until:
+            return
+        if before is not None and occurrence >= before:
+            return
+        if after is not None and occurrence < after:
+            continue
+        yield occurrence
+
+
+def _iter_fixed_step(start, step, rule, after):
+    """固定步长（DAILY / 不带 BYDAY 的 WEEKLY）：第 k 个实例 = start + k * step"""
+    index = 0
+    if after is not None and after > start:
+        index = -((start - after) // step)  # 向上取整
+    while rule.count is None or index < rule.count:
+        yield start + index * step
+        index += 1
+
+
+def _iter_weekly_byday(start, rule, after):
+    """
+    带 BYDAY 的 WEEKLY
+
+    以 start 所在周的周一为第 0 周，每 interval 周生成一次 BYDAY 对应的各天；
+    第 0 周中早于 start 的日子不计入。
+    """
+    week0 = (start - timedelta(days=start.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    time_of_day = start - start.replace(hour=0, minute=0, second=0, microsecond=0)
+    per_week = len(rule.byday)
+    first_week_count = sum(1 for day in rule.byday if day >= start.weekday())
+
+    week = 0
+    if after is not None and after > start:
+        weeks_passed = (after - week0).days // 7
+        week = weeks_passed - weeks_passed % rule.interval
+
+    # 第 week 周之前已经产生的实例数（用于 COUNT）
+    if week == 0:
+        index = 0
+    else:
+        index = first_week_count + (week // rule.interval - 1) * per_week
+
+    while True:
+        week_start = week0 + timedelta(weeks=week)
+        for day in rule.byday:
+            occurrence = week_start + timedelta(days=day) + time_of_day
+            if occurrence < start:
+                continue
+            if rule.count is not None and index >= rule.count:
+                return
+            yield occurrence
+            index += 1
+        week += rule.interval
+
+
+def _iter_monthly(start, rule, after):
+    """
+    MONTHLY / YEARLY：每隔 interval 个月（年）的同一天
+
+    该月没有这一天（如 31 号、2 月 29 号）时跳过，与 RFC 5545 一致。
+    带 COUNT 时实例数本身有限，从头计数；否则直接跳到窗口附近。
+    """
+    step = rule.interval * (12 if rule.freq == 'YEARLY' else 1)
+    base = start.year * 12 + (start.month - 1)
+
+    months = 0
+    if rule.count is None and after is not None and after > start:
+        months_passed = (after.year * 12 + after.month - 1) - base
+        months = max(0, months_passed - months_passed % step - step)
+
+    index = 0
+    while rule.count is None or index < rule.count:
+        year, month = divmod(base + months, 12)
+        month += 1
+        if start.day <= calendar_module.monthrange(year, month)[1]:
+            yield start.replace(year=year, month=month)
+            index += 1
+        months += step
+
+
+def compute_recurrence_end(dtstart: datetime, duration: timedelta,
+                           rule: RecurrenceRule) -> Optional[datetime]:
+    """
+    计算系列最后一个实例的结束时间，无限重复时返回 None
+
+    UNTIL 规则直接用 UNTIL + 时长作为上界（用于窗口过滤已足够）。
+    """
+    if rule.until is not None:
+        return rule.until + duration
+    if rule.count is None:
+        return None
+
+    last = None
+    for last in iter_occurrences(dtstart, rule):
+        pass
+    return (last or dtstart) + duration
@@ -0,0 +1,120 @@
+"""
+每日提醒汇总
+
+开启汇总的用户，每天晚上收到一封邮件，列出第二天的全部待提醒日程，
+汇总过的日程标记 notification_sent，不再单独发送提醒。
+
+每个分片一次执行：
+1. 一条 UPDATE 认领分片内今天还没汇总过的用户（写入令牌和汇总日期）
+2. 一条查询取出这些用户第二天的全部日程（按用户、开始时间排序）
+3. 按用户分组，每人一封邮件，整批复用 SMTP 连接
+"""
+import uuid
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from django.core.mail import EmailMultiAlternatives
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import Event, ReminderPreference
+from .email_templates import event_email_context, render_email
+from .reminder_mail import deliver_messages, mark_events_notified
+from .reminders import shard_filter
+
+
+def digest_window(day):
+    """某一天（本地时区）的 [00:00, 次日 00:00)"""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def next_digest_day(now=None):
+    """汇总的是第二天（本地日期）的日程"""
+    return timezone.localdate(now) + timedelta(days=1)
+
+
+def claim_digest_users(day, shard=None, shards=1):
+    """
+    原子认领待汇总的用户
+
+    UPDATE ... WHERE digest_enabled AND (last_digest_date IS NULL OR last_digest_date < day)，
+    同时写入 last_digest_date，重复执行或并发执行都只会有一个任务认领到。
+
+    Returns:
+        str: 认领令牌
+    """
+    token = uuid.uuid4().hex
+    preferences = ReminderPreference.objects.filter(digest_enabled__in=[True]).exclude(last_digest_date__gte=day)
+    # last_digest_date 在偏好接口中输出，update() 不会自动更新 auto_now 字段，手动写 updated_at
+    shard_filter(preferences, shard, shards).update(
+        last_digest_date=day, digest_claim_token=token, updated_at=timezone.now()
+    )
+    return token
+
+
+def digest_events(token, day):
+    """认领到的用户第二天的待提醒日程（一条查询，按用户分组排序）"""
+    start, end = digest_window(day)
+    return Event.objects.filter(
+        user__reminder_preference__digest_claim_token=token,
+        email_reminder__in=[True],
+        notification_sent__in=[False],
+        start_time__gte=start,
+        start_time__lt=end,
+        user__email__gt='',
+    ).select_related('user').order_by('user_id', 'start_time', 'id')
+
+
+def build_digest_message(user, events, day, connection=None):
+    """一个用户的汇总邮件"""
+    text, html = render_email('event_digest', {
+        'username': user.username,
+        'date': day.strftime('%Y年%m月%d日'),
+        'events': [event_email_context(event, time_format='%H:%M') for event in events],
+    })
+    message = EmailMultiAlternatives(
+        subject=f'📅 明日日程汇总（{len(events)} 个）',
+        body=text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
+    message.attach_alternative(html, 'text/html')
+    return message
+
+
+def send_daily_digests(shard=None, shards=1, now=None):
+    """
+    发送一个分片的每日汇总
+
+    Returns:
+        dict: {'users': 成功发送的用户数, 'events': 汇总的日程数, 'failed': 失败的用户数}
+    """
+    day = next_digest_day(now)
+    token = claim_digest_users(day, shard, shards)
+
+    digests = []
+    for _, events in groupby(digest_events(token, day), key=lambda event: event.user_id):
+        events = list(events)
+        digests.append((events[0].user, events))
+    sent, failed = deliver_messages(
+        digests,
+        lambda digest, connection: build_digest_message(digest[0], digest[1], day, connection=connection),
+    )
+
+    # 与逐条提醒共用标记逻辑（同时更新 updated_at 和集合版本）
+    mark_events_notified([event for _, events in sent for event in events])
+    # 发送失败的用户清除汇总日期，下次执行时重试；没有日程的用户保持已汇总
+    if failed:
+        ReminderPreference.objects.filter(
+            digest_claim_token=token, user__in=[user for user, _ in failed]
+        ).update(last_digest_date=None, updated_at=timezone.now())
+    ReminderPreference.objects.filter(digest_claim_token=token).update(digest_claim_token='')
+
+    return {
+        'users': len(sent),
+        'events': sum(len(events) for _, events in sent),
+        'failed': len(failed),
+    }
@@ -0,0 +1,181 @@
+"""
+日程提醒邮件
+
+- build_reminder_message：构建单封提醒邮件（模板 templates/emails/event_reminder.*）
+- iter_deliveries / deliver_messages：分批发送，每批复用一个 SMTP 连接，单封失败退避重试
+- send_reminder_batch：批量发送提醒，发送成功的日程一次性批量标记 notification_sent
+"""
+import logging
+import smtplib
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from ..models import Event
+from .email_templates import event_email_context, render_email
+from .event_cache import bump_events_version
+from .reminder_metrics import record_deliveries
+
+logger = logging.getLogger(__name__)
+
+
+def build_reminder_message(event, connection=None):
+    """
+    构建提醒邮件（纯文本 + HTML）
+
+    Args:
+        event: 需预先 select_related('user')
+        connection: 邮件连接，批量发送时复用
+    """
+    subject = f"📅 日程提醒：{event.title}"
+    message, html_message = render_email('event_reminder', {
+        'username': event.user.username,
+        'event': event_email_context(event),
+    })
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[event.user.email],
+        connection=connection,
+    )
+    email.attach_alternative(html_message, 'text/html')
+    return email
+
+
+# 建立连接失败（smtplib.SMTPException 也是 OSError 的子类）
+CONNECTION_ERRORS = (OSError,)
+# 收件人被拒绝等永久错误：不重试
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def _chunks(items, size):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class Delivery(namedtuple('Delivery', 'item ok smtp_seconds attempts batch_size finished_at')):
+    """单封邮件的发送结果：是否成功、SMTP 耗时（含重试）、尝试次数、所在批次大小、完成时间"""
+    __slots__ = ()
+
+
+def iter_deliveries(items, build_message, batch_size=None, max_retries=None, backoff=None):
+    """
+    分批复用 SMTP 连接发送邮件，逐封产出 Delivery
+
+    每 batch_size 封共用一个 SMTP 连接（一次 TLS 握手 + 登录）；
+    单封失败按 backoff * 2^n 秒退避重试，失败后重建连接。
+
+    Args:
+        items: 待发送的对象列表
+        build_message: (item, connection) -> EmailMessage
+    """
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    max_retries = settings.REMINDER_SEND_RETRIES if max_retries is None else max_retries
+    backoff = settings.REMINDER_RETRY_BACKOFF_SECONDS if backoff is None else backoff
+
+    for chunk in _chunks(list(items), batch_size):
+        connection = get_connection(fail_silently=False)
+        done = 0
+        try:
+            connection.open()
+            for item in chunk:
+                started = time.perf_counter()
+                ok, attempts = _send_with_retry(connection, item, build_message, max_retries, backoff)
+                done += 1
+                yield Delivery(item, ok, time.perf_counter() - started, attempts, len(chunk), timezone.now())
+        except CONNECTION_ERRORS as e:
+            # 连接都建立不了：本批剩余的全部记为失败，留给下一轮
+            logger.error(f"❌ SMTP 连接失败: {e}")
+            for item in chunk[done:]:
+                yield Delivery(item, False, 0.0, 0, len(chunk), timezone.now())
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+def deliver_messages(items, build_message, batch_size=None, max_retries=None, backoff=None):
+    """
+    分批发送邮件（提醒、每日汇总等共用），参数同 iter_deliveries
+
+    Returns:
+        (sent, failed)：发送成功 / 失败的 item 列表
+    """
+    sent = []
+    failed = []
+    for delivery in iter_deliveries(items, build_message, batch_size, max_retries, backoff):
+        (sent if delivery.ok else failed).append(delivery.item)
+    return sent, failed
+
+
+def send_reminder_batch(events, batch_size=None, max_retries=None, backoff=None, queue_wait=None, mode='poll'):
+    """
+    批量发送提醒邮件，发送成功的日程最后用一条 UPDATE 标记 notification_sent
+
+    每封的提醒延迟、SMTP 耗时等写入投递日志（reminder_metrics）。
+
+    Args:
+        events: 日程列表（需预先 select_related('user')，且用户有邮箱）
+        queue_wait: 任务在队列中等待的秒数
+        mode: 投递日志中的来源（见 ReminderDeliveryLog.MODES）
+
+    Returns:
+        dict: {'sent': [event_id], 'failed': [event_id]}
+    """
+    deliveries = list(iter_deliveries(
+        events,
+        lambda event, connection: build_reminder_message(event, connection=connection),
+        batch_size=batch_size, max_retries=max_retries, backoff=backoff,
+    ))
+    sent = [delivery.item for delivery in deliveries if delivery.ok]
+    mark_events_notified(sent)
+    record_deliveries(deliveries, queue_wait=queue_wait, mode=mode)
+
+    return {
+        'sent': [event.pk for event in sent],
+        'failed': [delivery.item.pk for delivery in deliveries if not delivery.ok],
+    }
+
+
+def mark_events_notified(events):
+    """一条 UPDATE 标记已发送并清除认领（提醒、每日汇总共用）"""
+    if not events:
+        return
+    # update() 不会自动更新 auto_now 字段，手动写 updated_at，增量同步才能拿到 notification_sent 的变化
+    Event.objects.filter(pk__in=[event.pk for event in events]).update(
+        notification_sent=True, reminder_claimed_at=None, reminder_claim_token='', updated_at=timezone.now()
+    )
+    # update() 不触发信号，手动更新集合版本（notification_sent 在列表输出中）
+    bump_events_version({event.user_id for event in events})
+
+
+def _send_with_retry(connection, item, build_message, max_retries, backoff):
+    """发送单封邮件，失败时退避重试；返回 (是否成功, 尝试次数)"""
+    for attempt in range(max_retries + 1):
+        try:
+            message = build_message(item, connection)
+            if connection.send_messages([message]):
+                return True, attempt + 1
+            raise smtplib.SMTPException('邮件未被接收')
+        except PERMANENT_ERRORS as e:
+            logger.warning(f"⚠️ 邮件被拒收，不再重试：{item}: {e}")
+            return False, attempt + 1
+        except Exception as e:
+            if attempt >= max_retries:
+                logger.error(f"❌ 邮件发送失败（已重试 {max_retries} 次）：{item}: {e}")
+                return False, attempt + 1
+            logger.warning(f"⚠️ 邮件发送失败，{backoff * 2 ** attempt:.1f} 秒后重试：{item}: {e}")
+            time.sleep(backoff * 2 ** attempt)
+            # 失败后连接状态不确定（可能已断开），重建后再试
+            try:
+                connection.close()
+            except Exception:
+                pass
+            connection.open()
+    return False, max_retries + 1
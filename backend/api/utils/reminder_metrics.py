@@ -0,0 +1,157 @@
+"""
+提醒投递指标
+
+每封提醒发送后记录：
+- 提醒延迟：实际发送时间 - remind_at（直方图）
+- 排队时间：任务从投递到开始执行的等待
+- SMTP 耗时（含重试）、尝试次数、批次大小
+
+同时写入 ReminderDeliveryLog（供 reminder_stats 命令汇总）
+和 api.reminders.metrics 日志（每封一行 JSON，可接入日志采集）。
+"""
+import json
+import logging
+import math
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import ReminderDeliveryLog
+
+logger = logging.getLogger('api.reminders.metrics')
+
+# 延迟直方图的桶上界（秒），最后一个桶为 +inf
+DELAY_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def seconds_between(later, earlier):
+    if later is None or earlier is None:
+        return None
+    return (later - earlier).total_seconds()
+
+
+def record_deliveries(deliveries, queue_wait=None, mode='poll'):
+    """
+    记录一批提醒的投递结果
+
+    Args:
+        deliveries: reminder_mail.Delivery 列表（item 为 Event）
+        queue_wait: 任务排队秒数（同一批共用）
+        mode: 'poll' / 'eta' 等，见 ReminderDeliveryLog.MODES
+    """
+    logs = [
+        ReminderDeliveryLog(
+            event_id=delivery.item.pk,
+            mode=mode,
+            success=delivery.ok,
+            remind_at=delivery.item.remind_at,
+            sent_at=delivery.finished_at,
+            delay_seconds=seconds_between(delivery.finished_at, delivery.item.remind_at),
+            queue_wait_seconds=queue_wait,
+            smtp_seconds=delivery.smtp_seconds,
+            attempts=delivery.attempts,
+            batch_size=delivery.batch_size,
+        )
+        for delivery in deliveries
+    ]
+    if not logs:
+        return []
+
+    ReminderDeliveryLog.objects.bulk_create(logs)
+    if logger.isEnabledFor(logging.INFO):
+        for log in logs:
+            logger.info(json.dumps({
+                'metric': 'reminder_delivery',
+                'event_id': log.event_id,
+                'mode': log.mode,
+                'success': log.success,
+                'delay_seconds': _round(log.delay_seconds),
+                'queue_wait_seconds': _round(log.queue_wait_seconds),
+                'smtp_seconds': _round(log.smtp_seconds),
+                'attempts': log.attempts,
+                'batch_size': log.batch_size,
+            }))
+    return logs
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+def percentile(sorted_values, fraction):
+    """最近秩百分位数（sorted_values 须已排序）"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def distribution(values):
+    """{'count', 'avg', 'p50', 'p95', 'p99', 'max'}"""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {'count': 0, 'avg': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'count': len(values),
+        'avg': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': values[-1],
+    }
+
+
+def delay_histogram(values):
+    """[(桶上界, 数量)]，上界为 None 表示 +inf；负延迟（提前发送）计入第一个桶"""
+    counts = [0] * (len(DELAY_BUCKETS) + 1)
+    for value in values:
+        if value is None:
+            continue
+        for index, bound in enumerate(DELAY_BUCKETS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return list(zip(DELAY_BUCKETS + (None,), counts))
+
+
+def summarize(hours=24, now=None):
+    """
+    汇总最近 hours 小时的投递指标（一次查询）
+
+    Returns:
+        dict: 发送量、失败数、峰值每分钟发送量，以及延迟 / 排队 / SMTP / 批次大小的分布
+    """
+    now = now or timezone.now()
+    since = now - timedelta(hours=hours)
+    rows = list(ReminderDeliveryLog.objects.filter(sent_at__gte=since).values_list(
+        'success', 'sent_at', 'delay_seconds', 'queue_wait_seconds', 'smtp_seconds', 'attempts', 'batch_size'
+    ))
+    sent = [row for row in rows if row[0]]
+    per_minute = Counter(row[1].replace(second=0, microsecond=0) for row in sent)
+
+    return {
+        'since': since,
+        'total': len(rows),
+        'sent': len(sent),
+        'failed': len(rows) - len(sent),
+        'retried': sum(1 for row in rows if row[5] > 1),
+        'per_minute_avg': len(sent) / (hours * 60) if hours else None,
+        'per_minute_peak': max(per_minute.values(), default=0),
+        'delay': distribution(row[2] for row in sent),
+        'delay_histogram': delay_histogram(row[2] for row in sent),
+        'queue_wait': distribution(row[3] for row in rows),
+        'smtp': distribution(row[4] for row in rows if row[5]),
+        'batch_size': distribution(row[6] for row in rows),
+    }
+
+
+def purge_delivery_logs(now=None):
+    """删除超过保留期的投递日志，返回删除条数"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.REMINDER_METRICS_RETENTION_DAYS)
+    deleted, _ = ReminderDeliveryLog.objects.filter(sent_at__lt=cutoff).delete()
+    return deleted
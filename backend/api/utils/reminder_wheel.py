@@ -0,0 +1,236 @@
+"""
+时间轮提醒调度（REMINDER_SCHEDULING_MODE = 'wheel'）
+
+由常驻进程 run_reminder_scheduler 执行：
+- 启动时及每 REMINDER_WHEEL_RELOAD_MINUTES 分钟，把未来 REMINDER_WHEEL_HORIZON_MINUTES 内的
+  remind_at 装入分层时间轮
+- 日程保存/删除时 schedule_reminder / cancel_reminder 把 (id, remind_at) 发布到变更通道
+  （Redis pub/sub，或同一进程内的本地队列），调度进程实时更新时间轮
+- 每秒推进时间轮，到期的提醒立即投递 send_reminder_batch_task，不再等每分钟的扫描
+
+调度进程每次循环写入心跳；心跳过期时每分钟扫描自动接管（见 check_and_send_reminders），
+调度进程挂掉或变更消息丢失时，提醒最多退化为轮询模式的延迟，不会丢失。
+"""
+import json
+import logging
+import queue
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .reminders import DUE_WINDOW, due_reminders, format_remind_at
+from .timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_KEY = 'reminders:wheel:heartbeat'
+# 心跳超过这么久没有更新，视为调度进程已停止
+HEARTBEAT_TIMEOUT = 30
+
+
+def wheel_mode_enabled():
+    return settings.REMINDER_SCHEDULING_MODE == 'wheel'
+
+
+def scheduler_alive():
+    """调度进程是否在运行（心跳未过期）"""
+    return cache.get(HEARTBEAT_KEY) is not None
+
+
+# ==================== 变更通道 ====================
+
+class RedisChangeFeed:
+    """Redis pub/sub 变更通道（跨进程）"""
+
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._pubsub = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def publish(self, message):
+        self.client.publish(self.channel, json.dumps(message))
+
+    def get(self, timeout):
+        """等待下一条消息，超时返回 None"""
+        if self._pubsub is None:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.channel)
+        raw = self._pubsub.get_message(timeout=timeout)
+        if raw is None:
+            return None
+        return json.loads(raw['data'])
+
+
+class LocalChangeFeed:
+    """进程内队列（开发、测试，或调度循环与 Web 进程在同一进程时）"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def publish(self, message):
+        self.queue.put(message)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+_local_feed = LocalChangeFeed()
+_redis_feed = None
+
+
+def get_change_feed():
+    global _redis_feed
+
+    if settings.REMINDER_WHEEL_CHANGE_FEED == 'local':
+        return _local_feed
+    if _redis_feed is None:
+        _redis_feed = RedisChangeFeed(settings.REMINDER_WHEEL_REDIS_URL, settings.REMINDER_WHEEL_CHANNEL)
+    return _redis_feed
+
+
+def publish_change(event_id, remind_at):
+    """
+    发布提醒变化（remind_at 为 None 表示取消）
+
+    发布失败只记日志：调度进程定期重新装载，最终仍会与数据库一致。
+    """
+    try:
+        get_change_feed().publish({'id': event_id, 'remind_at': format_remind_at(remind_at)})
+    except Exception as e:
+        logger.warning(f"发布提醒变更失败（事件 {event_id}）: {e}")
+
+
+# ==================== 调度器 ====================
+
+class ReminderWheelScheduler:
+    """
+    时间轮调度循环
+
+    Args:
+        feed: 变更通道（get(timeout) -> message | None）
+        dispatch: (event_ids, now) -> None，默认投递 send_reminder_batch_task
+        clock: 返回当前时间戳（秒），测试时可替换
+    """
+
+    def __init__(self, feed=None, dispatch=None, horizon_minutes=None, reload_minutes=None, clock=time.time):
+        self.feed = feed or get_change_feed()
+        self.dispatch = dispatch or dispatch_batch
+        self.horizon = timedelta(minutes=horizon_minutes or settings.REMINDER_WHEEL_HORIZON_MINUTES)
+        self.reload_interval = (reload_minutes or settings.REMINDER_WHEEL_RELOAD_MINUTES) * 60
+        self.clock = clock
+        self.wheel = TimingWheel(start=clock())
+        self.next_reload = 0
+        self.fired = 0
+
+    def now(self):
+        return datetime.fromtimestamp(self.clock(), tz=timezone.utc)
+
+    def load(self):
+        """
+        从数据库装载投递窗口内的提醒（走 remind_at 索引），并移除已不在窗口内的
+
+        Returns:
+            int: 时间轮中的提醒数
+        """
+        now = self.now()
+        rows = due_reminders(now - DUE_WINDOW, now + self.horizon).filter(
+            start_time__gte=now,
+            user__email__gt='',
+        ).values_list('id', 'remind_at')
+
+        loaded = set()
+        for event_id, remind_at in rows:
+            loaded.add(event_id)
+            current = self.wheel.get(event_id)
+            if current is None or current[1] != format_remind_at(remind_at):
+                self.wheel.add(event_id, remind_at.timestamp(), format_remind_at(remind_at))
+        for event_id in list(self.wheel.entries):
+            if event_id not in loaded:
+                self.wheel.remove(event_id)
+
+        self.next_reload = self.clock() + self.reload_interval
+        return len(self.wheel)
+
+    def apply(self, message):
+        """应用一条变更消息"""
+        event_id = message['id']
+        remind_at = message.get('remind_at')
+        if not remind_at:
+            self.wheel.remove(event_id)
+            return
+        deadline = datetime.fromisoformat(remind_at).timestamp()
+        if deadline <= self.clock() + self.horizon.total_seconds():
+            self.wheel.add(event_id, deadline, remind_at)
+        else:
+            # 超出投递窗口（例如改期到几天后），由之后的重新装载放回
+            self.wheel.remove(event_id)
+
+    def tick(self):
+        """推进时间轮并投递到期提醒，返回投递的提醒数"""
+        due = self.wheel.advance(self.clock())
+        if not due:
+            return 0
+        event_ids = [event_id for event_id, _, _ in due]
+        batch_size = settings.REMINDER_BATCH_SIZE
+        now = self.now()
+        for index in range(0, len(event_ids), batch_size):
+            self.dispatch(event_ids[index:index + batch_size], now)
+        self.fired += len(event_ids)
+        return len(event_ids)
+
+    def run_once(self):
+        """
+        一次循环：接收变更直到下一秒、推进时间轮、写心跳，必要时重新装载
+        """
+        if self.clock() >= self.next_reload:
+            self.load()
+
+        deadline = int(self.clock()) + 1
+        while True:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            message = self.feed.get(timeout=remaining)
+            if message is not None:
+                self.apply(message)
+
+        fired = self.tick()
+        cache.set(HEARTBEAT_KEY, int(self.clock()), timeout=HEARTBEAT_TIMEOUT)
+        return fired
+
+    def run(self, should_stop=lambda: False):
+        self.load()
+        while not should_stop():
+            self.run_once()
+        self.stop()
+
+    def stop(self):
+        """清除心跳，每分钟扫描立即接管"""
+        cache.delete(HEARTBEAT_KEY)
+
+
+def dispatch_batch(event_ids, now):
+    """投递一批到期提醒；remind_until 防止已改期到更晚的日程被提前发送"""
+    from ..tasks import send_reminder_batch_task
+
+    send_reminder_batch_task.delay(
+        event_ids,
+        enqueued_at=now.isoformat(),
+        mode='wheel',
+        remind_until=format_remind_at(now),
+    )
@@ -0,0 +1,226 @@
+"""
+日程提醒查询与调度
+
+三种调度模式（settings.REMINDER_SCHEDULING_MODE）：
+- poll：Beat 每分钟按 remind_at 索引扫描到期提醒（默认）
+- eta：日程保存时直接按提醒时间投递带 eta 的 Celery 任务；
+       日程改期/删除时撤销旧任务，任务执行时再核对 remind_at，旧任务即使没撤销成功也只会空跑。
+       只投递 REMINDER_ETA_HORIZON_MINUTES 以内的提醒，更远的由对账任务在进入窗口后补投。
+- wheel：常驻调度进程用时间轮按秒触发，日程变化通过变更通道通知（见 reminder_wheel）
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from ..models import Event
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_KEY = 'reminders:eta:{event_id}'
+
+
+def due_reminders(remind_from, remind_until):
+    """
+    提醒时间在 (remind_from, remind_until] 内、启用邮件提醒且尚未发送的日程
+
+    走 (notification_sent, email_reminder, remind_at) 复合索引，按 remind_at 排序。
+    布尔条件写成 __in=[...]：Django 会把 `=False/True` 渲染成 `NOT col` / `col`，
+    这种写法数据库无法用作索引前缀，只能全索引扫描。
+    """
+    return Event.objects.filter(
+        notification_sent__in=[False],
+        email_reminder__in=[True],
+        remind_at__gt=remind_from,
+        remind_at__lte=remind_until,
+    ).order_by('remind_at', 'id')
+
+
+# 常规扫描的容差：提醒时间在最近这段时间内的由每分钟扫描发送，更早的由补发处理
+DUE_WINDOW = timedelta(minutes=2)
+
+
+def overdue_reminders(now=None):
+    """
+    停机期间错过的提醒：提醒时间在 (now - 补发宽限期, now - DUE_WINDOW]、日程尚未开始
+
+    与 due_reminders 一样走 remind_at 索引的范围扫描；超过宽限期的不再补发。
+    """
+    now = now or timezone.now()
+    grace = timedelta(minutes=settings.REMINDER_CATCHUP_GRACE_MINUTES)
+    return due_reminders(now - grace, now - DUE_WINDOW).filter(
+        start_time__gte=now,
+        user__email__gt='',
+    )
+
+
+# ==================== 认领 ====================
+
+def claim_lease():
+    return timedelta(seconds=settings.REMINDER_CLAIM_LEASE_SECONDS)
+
+
+def unclaimed(queryset, now=None):
+    """过滤掉已被认领且租期未过的日程"""
+    now = now or timezone.now()
+    return queryset.filter(
+        Q(reminder_claimed_at__isnull=True) | Q(reminder_claimed_at__lt=now - claim_lease())
+    )
+
+
+def claim_reminders(event_ids):
+    """
+    原子认领待发送的提醒
+
+    一条 UPDATE ... WHERE notification_sent=0 AND (未认领 OR 租期已过)，
+    并发的 worker 中只有一个能把某行改成自己的令牌；再按令牌查出认领到的行。
+    崩溃的 worker 认领的行在租期过后可被重新认领。
+
+    Returns:
+        (token, QuerySet)：认领到的日程
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    # 认领字段不在接口输出中，不需要更新 updated_at（否则每次认领都会让客户端重新同步）
+    unclaimed(
+        Event.objects.filter(pk__in=list(event_ids), notification_sent=False, email_reminder=True),
+        now,
+    ).update(reminder_claimed_at=now, reminder_claim_token=token)
+    return token, Event.objects.filter(reminder_claim_token=token)
+
+
+def release_reminders(event_ids, token):
+    """发送失败时释放认领，下一轮扫描可以重新认领"""
+    if event_ids:
+        Event.objects.filter(pk__in=list(event_ids), reminder_claim_token=token).update(
+            reminder_claimed_at=None, reminder_claim_token=''
+        )
+
+
+def shard_filter(queryset, shard, shards):
+    """按 user_id % shards 取一个分片（同一用户的提醒总在同一分片）"""
+    if shards <= 1 or shard is None:
+        return queryset
+    return queryset.alias(user_shard=Mod('user_id', shards)).filter(user_shard=shard)
+
+
+# ==================== ETA 调度 ====================
+
+def eta_mode_enabled():
+    return settings.REMINDER_SCHEDULING_MODE == 'eta'
+
+
+def eta_horizon():
+    return timedelta(minutes=settings.REMINDER_ETA_HORIZON_MINUTES)
+
+
+def format_remind_at(value):
+    """任务参数里的 remind_at（与任务执行时核对用，统一为 UTC 避免时区写法不同）"""
+    return value.astimezone(timezone.utc).isoformat() if value else None
+
+
+def schedule_reminder(event):
+    """
+    按日程当前状态投递、替换或取消 ETA 提醒任务（幂等）
+
+    已投递且提醒时间未变时不重复投递。
+    wheel 模式下改为把当前提醒时间发布给调度进程。
+    """
+    if settings.REMINDER_SCHEDULING_MODE == 'wheel':
+        from .reminder_wheel import publish_change
+
+        wanted = event.email_reminder and not event.notification_sent and event.start_time >= timezone.now()
+        publish_change(event.pk, event.remind_at if wanted else None)
+        return
+    if not eta_mode_enabled():
+        return
+
+    key = SCHEDULE_KEY.format(event_id=event.pk)
+    scheduled = cache.get(key)
+    now = timezone.now()
+
+    wanted = (
+        event.email_reminder
+        and not event.notification_sent
+        and event.remind_at is not None
+        and event.remind_at <= now + eta_horizon()
+        and event.start_time >= now
+    )
+    if not wanted:
+        if scheduled:
+            # 已发送说明就是这个任务本身执行完了，不需要撤销
+            if not event.notification_sent:
+                _revoke(scheduled['task_id'])
+            cache.delete(key)
+        return
+
+    remind_at = format_remind_at(event.remind_at)
+    if scheduled and scheduled['remind_at'] == remind_at:
+        return
+    if scheduled:
+        _revoke(scheduled['task_id'])
+
+    from ..tasks import send_event_reminder_email
+
+    result = send_event_reminder_email.apply_async(
+        args=[event.pk],
+        kwargs={'expected_remind_at': remind_at},
+        eta=max(event.remind_at, now),
+    )
+    # 过期时间略长于投递窗口，任务执行前标记不会消失
+    timeout = int((event.remind_at - now).total_seconds()) + 3600
+    cache.set(key, {'task_id': result.id, 'remind_at': remind_at}, timeout=max(timeout, 3600))
+
+
+def cancel_reminder(event_id):
+    """日程删除时撤销已投递的提醒任务"""
+    if settings.REMINDER_SCHEDULING_MODE == 'wheel':
+        from .reminder_wheel import publish_change
+
+        publish_change(event_id, None)
+        return
+    if not eta_mode_enabled():
+        return
+    key = SCHEDULE_KEY.format(event_id=event_id)
+    scheduled = cache.get(key)
+    if scheduled:
+        _revoke(scheduled['task_id'])
+        cache.delete(key)
+
+
+def _revoke(task_id):
+    """
+    撤销任务（尽力而为）
+
+    撤销记录只保存在 worker 内存中，重启后会丢失；
+    任务执行时会再核对 remind_at，所以撤销失败也不会误发。
+    """
+    from celery import current_app
+
+    try:
+        current_app.control.revoke(task_id)
+    except Exception as e:
+        logger.warning(f"撤销提醒任务 {task_id} 失败: {e}")
+
+
+def reconcile_schedule():
+    """
+    对账：为投递窗口内尚未投递的提醒补投任务
+
+    Returns:
+        int: 检查的日程数
+    """
+    if not eta_mode_enabled():
+        return 0
+    now = timezone.now()
+    checked = 0
+    # 2 分钟容差与轮询模式一致，覆盖刚好到期但还没来得及投递的提醒
+    for event in due_reminders(now - DUE_WINDOW, now + eta_horizon()).filter(start_time__gte=now):
+        schedule_reminder(event)
+        checked += 1
+    return checked
@@ -0,0 +1,125 @@
+"""
+分层时间轮
+
+按秒 / 分 / 时三层（默认 60 × 60 × 24 个槽）组织定时项：
+- 添加、删除：O(1)
+- 每走一格只处理当前槽；高层槽在低层转完一圈时整体下沉（cascade）到低层
+- 超出最高层范围的定时项放在溢出表，最高层每转一格检查一次
+
+时间用浮点秒（time.time() 或 datetime.timestamp()）表示，精度为 tick 秒；
+定时项在 deadline 之后的第一个 tick 到期，最多晚一个 tick，不会提前。
+"""
+import math
+
+
+class TimingWheel:
+    """
+    分层时间轮
+
+    用法：
+        wheel = TimingWheel(start=time.time())
+        wheel.add('event:1', deadline, payload)
+        for key, deadline, payload in wheel.advance(time.time()):
+            ...
+    """
+
+    def __init__(self, start, tick=1.0, wheel_sizes=(60, 60, 24)):
+        self.tick = tick
+        self.sizes = tuple(wheel_sizes)
+        # 每层一个槽跨越的 tick 数：1, 60, 3600
+        self.units = []
+        unit = 1
+        for size in self.sizes:
+            self.units.append(unit)
+            unit *= size
+        # 各层能覆盖的 tick 数：60, 3600, 86400
+        self.spans = [unit * size for unit, size in zip(self.units, self.sizes)]
+        self.levels = [[{} for _ in range(size)] for size in self.sizes]
+        self.overflow = {}
+        self.ready = {}
+        # key -> (deadline, payload, 所在容器)
+        self.entries = {}
+        self.current = self._to_tick(start)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def _to_tick(self, timestamp):
+        """时钟所在的 tick（向下取整）"""
+        return int(timestamp // self.tick)
+
+    def _deadline_tick(self, deadline):
+        """到期时间所在的 tick（向上取整，定时项只会晚于 deadline 到期，不会提前）"""
+        return math.ceil(deadline / self.tick)
+
+    def get(self, key):
+        """(deadline, payload) 或 None"""
+        entry = self.entries.get(key)
+        return entry[:2] if entry else None
+
+    def add(self, key, deadline, payload=None):
+        """添加或替换定时项（同一 key 只保留最新的 deadline）"""
+        self.remove(key)
+        bucket = self._bucket_for(self._deadline_tick(deadline))
+        bucket[key] = (deadline, payload)
+        self.entries[key] = (deadline, payload, bucket)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            entry[2].pop(key, None)
+        return entry is not None
+
+    def _bucket_for(self, tick):
+        delta = tick - self.current
+        if delta <= 0:
+            return self.ready
+        for level, span in enumerate(self.spans):
+            if delta < span:
+                unit = self.units[level]
+                return self.levels[level][(tick // unit) % self.sizes[level]]
+        return self.overflow
+
+    def advance(self, now):
+        """
+        走到 now，返回到期的定时项 [(key, deadline, payload)]，按 deadline 排序
+        """
+        target = self._to_tick(now)
+        due = self._drain(self.ready)
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            level0 = self.levels[0][self.current % self.sizes[0]]
+            due.extend(self._drain(level0))
+            # 下沉时可能直接落入 ready（deadline 恰好是当前 tick）
+            due.extend(self._drain(self.ready))
+        due.sort(key=lambda item: item[1])
+        return due
+
+    def _cascade(self):
+        """高层槽到点时整体下沉；从高到低处理，保证逐层细分"""
+        top = len(self.sizes) - 1
+        if self.current % self.spans[top] == 0 and self.overflow:
+            self._reinsert(self.overflow)
+        for level in range(top, 0, -1):
+            unit = self.units[level]
+            if self.current % unit == 0:
+                self._reinsert(self.levels[level][(self.current // unit) % self.sizes[level]])
+
+    def _reinsert(self, bucket):
+        items = list(bucket.items())
+        bucket.clear()
+        for key, (deadline, payload) in items:
+            target = self._bucket_for(self._deadline_tick(deadline))
+            target[key] = (deadline, payload)
+            self.entries[key] = (deadline, payload, target)
+
+    def _drain(self, bucket):
+        items = [(key, deadline, payload) for key, (deadline, payload) in bucket.items()]
+        bucket.clear()
+        for key, _, _ in items:
+            self.entries.pop(key, None)
+        return items
@@ -20,7 +20,9 @@ from .calendar.calendars import PublicCalendarViewSet
 from .auth.auth import get_current_user, acwing_login, qq_login, get_acwing_login_url, get_qq_login_url
 
 # User Profile
-from .auth.user import get_user_stats, get_bindings, update_profile, change_password, unbind_acwing, unbind_qq
+from .auth.user import (
+    get_user_stats, get_bindings, update_profile, reminder_preference, change_password, unbind_acwing, unbind_qq,
+)
 
 # OAuth Callback
 from .auth.oauth_callback import acwing_oauth_callback
@@ -65,6 +67,7 @@ __all__ = [
     'get_user_stats',
     'get_bindings',
     'update_profile',
+    'reminder_preference',
     'change_password',
     'unbind_acwing',
     'unbind_qq',
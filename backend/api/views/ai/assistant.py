@@ -8,8 +8,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.conf import settings
+from django.utils import timezone
 import requests
 
+from ...utils.free_busy import find_overlaps
+from ...utils.event_occurrences import get_time_intervals
+
 logger = logging.getLogger(__name__)
 
 
@@ -266,10 +270,16 @@ def chat_with_assistant(request):
             for e in context.get('events', [])[:10]  # 最多10条
         ])
     
+    # 已登录用户：由后端检测未来 7 天的真实冲突，而不是让模型自己猜
+    conflicts_summary = ""
+    if request.user.is_authenticated:
+        conflicts_summary = _describe_upcoming_conflicts(request.user)
+    
     system_prompt = f"""你是一个智能日程助手，帮助用户管理日程。
 
 当前日期: {context.get('current_date', datetime.now().strftime('%Y-%m-%d'))}
 {events_summary}
+{conflicts_summary}
 
 你的职责：
 1. 回答用户关于日程的问题
@@ -295,3 +305,17 @@ def chat_with_assistant(request):
         logger.error(f"AI对话失败: {e}")
         return Response({'error': f'处理失败: {str(e)}'}, status=500)
 
+
+def _describe_upcoming_conflicts(user, days=7, limit=10):
+    """未来若干天内时间重叠的日程，转成提示词文本"""
+    start = timezone.now()
+    overlaps = find_overlaps(get_time_intervals(user, start, start + timedelta(days=days)))
+    if not overlaps:
+        return ""
+    
+    def describe(interval):
+        return f"{interval[3]} ({timezone.localtime(interval[0]).strftime('%m-%d %H:%M')})"
+    
+    return "\n检测到的日程冲突：\n" + "\n".join(
+        f"- {describe(a)} 与 {describe(b)}" for a, b in overlaps[:limit]
+    )
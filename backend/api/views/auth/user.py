@@ -9,8 +9,8 @@ from django.contrib.auth import authenticate
 from django.utils import timezone
 from datetime import datetime, timedelta
 
-from ...models import Event, AcWingUser, QQUser
-from ...serializers import UserSerializer
+from ...models import Event, AcWingUser, QQUser, ReminderPreference
+from ...serializers import ReminderPreferenceSerializer, UserSerializer
 
 
 @api_view(['GET'])
@@ -94,6 +94,25 @@ def update_profile(request):
     return Response(serializer.data)
 
 
+@api_view(['GET', 'PUT', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def reminder_preference(request):
+    """
+    获取/更新提醒偏好
+    
+    digest_enabled=true：每天 20:00 把第二天的日程合并成一封邮件，
+    汇总过的日程不再单独发送提醒
+    """
+    preference, _ = ReminderPreference.objects.get_or_create(user=request.user)
+    if request.method == 'GET':
+        return Response(ReminderPreferenceSerializer(preference).data)
+    
+    serializer = ReminderPreferenceSerializer(preference, data=request.data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response(serializer.data)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def change_password(request):
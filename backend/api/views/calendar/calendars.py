@@ -1,12 +1,51 @@
 """
 Public Calendars API - 公开日历管理
 """
+from django.db.models import Count
+from django.utils import timezone
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from ...models import PublicCalendar, Event
-from ...serializers import PublicCalendarSerializer, EventSerializer
+from ...models import PublicCalendar
+from ...serializers import PublicCalendarSerializer
+from ...utils.calendar_cache import CalendarFeed, cached_calendar_list
+from ...utils.event_queries import filter_by_window, parse_datetime_param, parse_window
+from ...utils.event_sync import SYNC_OVERLAP
+from ...utils.ics import iter_calendar
+
+
+# 日历元数据（颜色和图标）
+CALENDAR_METADATA = {
+    'china-holidays': {
+        'color': '#FF6B6B',
+        'icon': '🏮'
+    },
+    'lunar-festivals': {
+        'color': '#4ECDC4',
+        'icon': '🎊'
+    },
+    'world-days': {
+        'color': '#95E1D3',
+        'icon': '🌍'
+    }
+}
+DEFAULT_CALENDAR_METADATA = {
+    'color': '#667eea',
+    'icon': '📅'
+}
+
+
+class ICalendarRenderer(BaseRenderer):
+    """text/calendar（只用于内容协商，响应体由 CalendarFeed 直接输出）"""
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
 
 
 class PublicCalendarViewSet(viewsets.ReadOnlyModelViewSet):
@@ -15,33 +54,35 @@ class PublicCalendarViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PublicCalendarSerializer
     lookup_field = 'url_slug'
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # 日程数随日历一起查出（serializer 的 events_count）
+            queryset = queryset.annotate(events_count=Count('events')).order_by('id')
+        return queryset
+    
     @action(detail=False, methods=['get'], url_path='available')
     def available_calendars(self, request):
-        """获取所有可订阅的日历列表（Android使用）"""
-        calendars = PublicCalendar.objects.filter(is_public=True)
+        """
+        获取所有可订阅的日历列表（Android使用）
         
-        # 日历元数据（颜色和图标）
-        calendar_metadata = {
-            'china-holidays': {
-                'color': '#FF6B6B',
-                'icon': '🏮'
-            },
-            'lunar-festivals': {
-                'color': '#4ECDC4',
-                'icon': '🎊'
-            },
-            'world-days': {
-                'color': '#95E1D3',
-                'icon': '🌍'
-            }
-        }
+        一条 annotate 查询取出全部日历及日程数，结果按日历列表版本缓存
+        """
+        return Response({
+            'success': True,
+            'calendars': cached_calendar_list(self.available_calendars_data)
+        })
+    
+    def available_calendars_data(self):
+        calendars = (
+            PublicCalendar.objects.filter(is_public=True)
+            .annotate(event_count=Count('events'))
+            .order_by('id')
+        )
         
         calendars_data = []
         for calendar in calendars:
-            metadata = calendar_metadata.get(calendar.url_slug, {
-                'color': '#667eea',
-                'icon': '📅'
-            })
+            metadata = CALENDAR_METADATA.get(calendar.url_slug, DEFAULT_CALENDAR_METADATA)
             
             calendars_data.append({
                 'id': calendar.id,
@@ -50,81 +91,111 @@ class PublicCalendarViewSet(viewsets.ReadOnlyModelViewSet):
                 'description': calendar.description,
                 'color': metadata['color'],
                 'icon': metadata['icon'],
-                'event_count': calendar.events.count(),
+                'event_count': calendar.event_count,
                 'is_public': calendar.is_public
             })
-        
-        return Response({
-            'success': True,
-            'calendars': calendars_data
-        })
+        return calendars_data
     
-    @action(detail=True, methods=['get'])
-    def feed(self, request, url_slug=None):
-        """返回 iCalendar 格式的日历订阅"""
+    @action(
+        detail=True,
+        methods=['get'],
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, ICalendarRenderer],
+    )
+    def feed(self, request, url_slug=None, format=None):
+        """
+        iCalendar 日历订阅
+        
+        - 默认：JSON 包装 {'ics': ..., 'events_count': ...}
+        - feed.ics / ?format=ics / Accept: text/calendar：text/calendar 订阅源，
+          日历应用可直接订阅；按块流式输出 VEVENT，内存占用与日历大小无关
+        
+        渲染结果按日历版本缓存，所有订阅者共用；带 ETag / Last-Modified，
+        未变化时返回 304（calendar_cache）
+        """
         calendar = self.get_object()
-        ics_content = self.generate_ics(calendar)
-        return Response(
-            {'ics': ics_content, 'events_count': calendar.events.count()},
-            content_type='application/json'
+        is_ics = request.accepted_renderer.format == ICalendarRenderer.format
+        feed = CalendarFeed(calendar, 'feed.ics' if is_ics else 'feed.json', request)
+        not_modified = feed.not_modified()
+        if not_modified is not None:
+            return not_modified
+        
+        if is_ics:
+            response = feed.stream(
+                iter_calendar(calendar.name, calendar.events.all()),
+                content_type='text/calendar; charset=utf-8',
+            )
+            response['Content-Disposition'] = f'inline; filename="{calendar.url_slug}.ics"'
+            return response
+        
+        return feed.respond(
+            lambda: JSONRenderer().render({
+                'ics': self.generate_ics(calendar),
+                'events_count': calendar.events.count(),
+            }),
+            content_type='application/json',
         )
     
     @action(detail=True, methods=['get'], url_path='events-json')
     def events_json(self, request, url_slug=None):
-        """返回 JSON 格式的日历事件列表（Android 订阅使用）"""
+        """
+        返回 JSON 格式的日历事件列表（Android 订阅使用；缓存与 304 同 feed）
+        
+        查询参数（均可选）：
+        - start / end：只返回与时间窗口有交集的日程
+        - since：只返回该时刻之后新建或修改过的日程，客户端按 id 合并；
+          下次请求可使用响应中的 synced_at。从日历移除的日程不会出现在增量结果中，
+          需要定期不带 since 全量刷新
+        """
         calendar = self.get_object()
-        events = calendar.events.all().order_by('start_time')
+        start, end = parse_window(request.query_params)
+        since_str = request.query_params.get('since')
+        since = parse_datetime_param(since_str, 'since') if since_str else None
         
-        # 序列化事件数据
-        events_data = []
-        for event in events:
-            # 判断是否为全天事件（开始和结束时间都是整点且相差24小时）
-            is_all_day = False
-            if event.end_time:
-                time_diff = event.end_time - event.start_time
-                is_all_day = (time_diff.days >= 1 and 
-                             event.start_time.hour == 0 and 
-                             event.start_time.minute == 0)
-            
-            events_data.append({
-                'title': event.title,
-                'description': event.description or '',
-                'location': event.location or '',
-                'start_time': event.start_time.isoformat(),
-                'end_time': event.end_time.isoformat() if event.end_time else event.start_time.isoformat(),
-                'all_day': is_all_day,
-                'reminder_minutes': event.reminder_minutes,
-            })
+        feed = CalendarFeed(calendar, 'events.json', request)
+        not_modified = feed.not_modified()
+        if not_modified is not None:
+            return not_modified
+        return feed.respond(
+            lambda: JSONRenderer().render(self.events_json_data(calendar, start, end, since)),
+            content_type='application/json',
+        )
+    
+    def events_json_data(self, calendar, start=None, end=None, since=None):
+        """events-json 的响应内容（all_day 为保存时计算好的字段）"""
+        synced_at = timezone.now()
+        events = filter_by_window(calendar.events.all(), start, end)
+        if since is not None:
+            # 与 since 时刻并发提交的修改可能带着稍早的 updated_at，回看一小段时间
+            events = events.filter(updated_at__gte=since - SYNC_OVERLAP)
+        events = events.order_by('start_time', 'id').values(
+            'id', 'title', 'description', 'location', 'start_time', 'end_time',
+            'all_day', 'reminder_minutes', 'updated_at',
+        )
         
-        return Response({
+        events_data = [
+            {
+                'id': event['id'],
+                'title': event['title'],
+                'description': event['description'] or '',
+                'location': event['location'] or '',
+                'start_time': event['start_time'].isoformat(),
+                'end_time': (event['end_time'] or event['start_time']).isoformat(),
+                'all_day': event['all_day'],
+                'reminder_minutes': event['reminder_minutes'],
+                'updated_at': event['updated_at'].isoformat(),
+            }
+            for event in events.iterator(chunk_size=2000)
+        ]
+        
+        return {
             'calendar_name': calendar.name,
             'calendar_description': calendar.description,
             'events_count': len(events_data),
+            'incremental': since is not None,
+            'synced_at': synced_at.isoformat(),
             'events': events_data
-        })
+        }
     
     def generate_ics(self, calendar):
-        """生成 iCalendar 格式"""
-        events = calendar.events.all()
-        ics_lines = [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            f"PRODID:-//Ralendar//{calendar.name}//CN",
-            f"X-WR-CALNAME:{calendar.name}",
-        ]
-        
-        for event in events:
-            ics_lines.extend([
-                "BEGIN:VEVENT",
-                f"UID:event-{event.id}@kotlincalendar.com",
-                f"DTSTART:{event.start_time.strftime('%Y%m%dT%H%M%S')}",
-                f"DTEND:{event.end_time.strftime('%Y%m%dT%H%M%S')}",
-                f"SUMMARY:{event.title}",
-                f"DESCRIPTION:{event.description}",
-                f"LOCATION:{event.location}",
-                "END:VEVENT",
-            ])
-        
-        ics_lines.append("END:VCALENDAR")
-        return "\n".join(ics_lines)
-
+        """生成 iCalendar 格式（完整字符串）"""
+        return ''.join(iter_calendar(calendar.name, calendar.events.all()))
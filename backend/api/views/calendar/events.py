@@ -1,33 +1,413 @@
 """
 Events API - 日程事件管理
 """
-from rest_framework import viewsets
-from rest_framework.permissions import AllowAny
+from datetime import timedelta
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 from django.contrib.auth.models import User
 
-from ...models import Event
-from ...serializers import EventSerializer
+from ...models import Event, EventRecurrenceException
+from ...pagination import EventCursorPagination
+from ...serializers import (
+    EventSerializer,
+    EventFastListSerializer,
+    EventRecurrenceExceptionSerializer,
+    parse_event_fields,
+)
+from ...utils.event_queries import event_list_queryset, parse_window, filter_by_window
+from ...utils.event_sync import get_event_changes
+from ...utils.event_cache import build_events_etag, not_modified_response, set_etag_headers
+from ...utils.event_bulk import BulkOperationError, apply_operations, validate_operations
+from ...utils.event_occurrences import MAX_WINDOW, get_occurrences, is_valid_occurrence
+from ...utils.event_search import search_event_ids
+from ...utils.free_busy import EventConflict, find_conflicts, get_free_busy, serialize_interval
+from ...utils.ics_import import import_ics
 
 
 class EventViewSet(viewsets.ModelViewSet):
     """日程 CRUD API"""
     serializer_class = EventSerializer
     permission_classes = [AllowAny]  # 允许访问API，但只返回已登录用户的数据
+    pagination_class = EventCursorPagination  # 按 (start_time, id) 游标分页
     
     def get_queryset(self):
-        """只返回当前用户的日程"""
-        if self.request.user.is_authenticated:
-            return Event.objects.filter(user=self.request.user)
-        # 未登录：返回空列表（保护隐私）
-        return Event.objects.none()
+        """
+        只返回当前用户的日程
+        
+        列表接口支持时间窗口参数（只返回与窗口有交集的日程）：
+        - `start`: 窗口开始时间（ISO 8601 或 YYYY-MM-DD）
+        - `end`: 窗口结束时间（不含）
+        
+        分页使用游标（`cursor` / `page_size`），见 EventCursorPagination。
+        `fields` 参数（逗号分隔）可只返回部分字段，如 `fields=id,title,start_time`。
+        """
+        if not self.request.user.is_authenticated:
+            # 未登录：返回空列表（保护隐私）
+            return Event.objects.none()
+        
+        queryset = event_list_queryset(self.request.user)
+        if self.action == 'list':
+            start, end = parse_window(self.request.query_params)
+            queryset = filter_by_window(queryset, start, end)
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """
+        日程列表（只读快速序列化，输出与 EventSerializer 一致）
+        
+        支持条件请求：带 If-None-Match 且集合版本未变时直接返回 304。
+        """
+        etag = None
+        if request.user.is_authenticated:
+            etag = build_events_etag(request, request.user.id)
+            not_modified = not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+        
+        fast_serializer = EventFastListSerializer(
+            fields=parse_event_fields(request.query_params.get('fields'))
+        )
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*fast_serializer.value_fields)
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(fast_serializer.serialize(page))
+        else:
+            response = Response(fast_serializer.serialize(rows))
+        
+        if etag is not None:
+            set_etag_headers(response, etag)
+        return response
     
     def perform_create(self, serializer):
-        """创建日程时关联用户"""
+        """
+        创建日程时关联用户
+        
+        带 `?check_conflicts=true` 时，若与已有日程时间重叠则返回 409 和冲突列表，不保存。
+        """
         if self.request.user.is_authenticated:
             # 用户已登录，关联当前用户
+            self._check_conflicts(serializer)
             serializer.save(user=self.request.user)
         else:
             # 开发环境：使用默认用户或创建匿名用户
             default_user, _ = User.objects.get_or_create(username='anonymous')
             serializer.save(user=default_user)
-
+    
+    def perform_update(self, serializer):
+        """修改日程（同样支持 `?check_conflicts=true`）"""
+        self._check_conflicts(serializer)
+        serializer.save()
+    
+    def _check_conflicts(self, serializer):
+        """
+        按请求参数检查时间冲突
+        
+        只检查本次保存的这一段时间（重复日程即第一次实例）。
+        """
+        if self.request.query_params.get('check_conflicts', '').lower() not in ('1', 'true', 'yes'):
+            return
+        
+        instance = serializer.instance
+        data = serializer.validated_data
+        start_time = data.get('start_time', instance.start_time if instance else None)
+        end_time = data.get('end_time', instance.end_time if instance else None)
+        if start_time is None:
+            return
+        
+        conflicts = find_conflicts(
+            self.request.user, start_time, end_time,
+            exclude_id=instance.pk if instance else None
+        )
+        if conflicts:
+            raise EventConflict([serialize_interval(interval) for interval in conflicts])
+    
+    @action(detail=False, methods=['get'], url_path='free-busy')
+    def free_busy(self, request):
+        """
+        空闲 / 忙碌时段与冲突检测
+        
+        **GET** `/api/events/free-busy/?start=2025-11-10&end=2025-11-17&min_duration=30`
+        
+        - `busy`: 合并后的忙碌时段（含重复日程实例）
+        - `free`: 窗口内的空闲时段，`min_duration`（分钟）过滤过短的间隙
+        - `conflicts`: 时间重叠的日程对
+        
+        无结束时间的日程视为时间点，不占用时段。窗口最长 366 天。
+        
+        ### 响应示例
+        ```json
+        {
+            "start": "2025-11-10T00:00:00+08:00",
+            "end": "2025-11-17T00:00:00+08:00",
+            "busy": [{"start": "...", "end": "..."}],
+            "free": [{"start": "...", "end": "..."}],
+            "conflicts": [{"events": [{"id": 1, "title": "周会", ...}, {"id": 2, ...}]}]
+        }
+        ```
+        """
+        if not request.user.is_authenticated:
+            return Response({'error': '请先登录'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        start, end = parse_window(request.query_params)
+        if start is None or end is None:
+            return Response({'error': '必须同时提供 start 和 end'}, status=status.HTTP_400_BAD_REQUEST)
+        if end - start > MAX_WINDOW:
+            return Response(
+                {'error': f'时间窗口不能超过 {MAX_WINDOW.days} 天'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            min_duration = timedelta(minutes=int(request.query_params.get('min_duration', 0)))
+        except ValueError:
+            return Response({'error': 'min_duration 必须是整数（分钟）'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = get_free_busy(request.user, start, end, min_duration)
+        return Response({'start': start.isoformat(), 'end': end.isoformat(), **result})
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        全文搜索日程（标题 / 描述 / 地点）
+        
+        **GET** `/api/events/search/?q=项目 评审&page=1&page_size=20`
+        
+        多个关键词用空格分隔，需全部命中；结果按相关度排序（标题权重最高）。
+        支持 `fields` 参数，与列表接口一致。
+        
+        ### 响应示例
+        ```json
+        {
+            "query": "项目 评审",
+            "page": 1,
+            "page_size": 20,
+            "has_more": false,
+            "results": [...]
+        }
+        ```
+        """
+        if not request.user.is_authenticated:
+            return Response({'error': '请先登录'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': '请提供搜索关键词 q'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'page 和 page_size 必须是整数'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 多取一条用于判断是否还有下一页，不做 COUNT(*)
+        ids = search_event_ids(query, user=request.user, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_more = len(ids) > page_size
+        ids = ids[:page_size]
+        
+        fast_serializer = EventFastListSerializer(
+            fields=parse_event_fields(request.query_params.get('fields'))
+        )
+        rows = {
+            row['id']: row
+            for row in event_list_queryset(request.user).filter(pk__in=ids).values(*fast_serializer.value_fields)
+        }
+        ranked_rows = [rows[event_id] for event_id in ids if event_id in rows]
+        
+        return Response({
+            'query': query,
+            'page': page,
+            'page_size': page_size,
+            'has_more': has_more,
+            'results': fast_serializer.serialize(ranked_rows),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        增量同步：返回自上次同步以来新建、修改和删除的日程
+        
+        **GET** `/api/events/sync/?sync_token=<上次返回的令牌>`
+        
+        不带 sync_token（或令牌过期）时返回全量数据，`full_sync` 为 true，
+        客户端应替换本地列表；否则先按 `deleted` 删除，再按 id 覆盖 `events`。
+        
+        ### 响应示例
+        ```json
+        {
+            "full_sync": false,
+            "sync_token": "MjAyNS0xMS0wNVQxMDowMDowMCswMDowMA",
+            "events": [...],
+            "deleted": [12, 15]
+        }
+        ```
+        """
+        if not request.user.is_authenticated:
+            return Response({'error': '请先登录'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        changes = get_event_changes(request.user, request.query_params.get('sync_token'))
+        serializer = self.get_serializer(changes['events'], many=True)
+        
+        return Response({
+            'full_sync': changes['full_sync'],
+            'sync_token': changes['sync_token'],
+            'events': serializer.data,
+            'deleted': changes['deleted'],
+        })
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        批量创建 / 更新 / 删除日程（单个事务，全部成功或全部不生效）
+        
+        **POST** `/api/events/bulk/`
+        
+        ### 请求体示例
+        ```json
+        {
+            "operations": [
+                {"op": "create", "data": {"title": "周会", "start_time": "2025-11-10T10:00:00+08:00"}},
+                {"op": "update", "id": 12, "data": {"start_time": "2025-11-11T10:00:00+08:00"}},
+                {"op": "delete", "id": 13}
+            ]
+        }
+        ```
+        
+        ### 响应示例
+        ```json
+        {
+            "success": true,
+            "results": [
+                {"index": 0, "op": "create", "status": "created", "event": {...}},
+                {"index": 1, "op": "update", "status": "updated", "event": {...}},
+                {"index": 2, "op": "delete", "status": "deleted", "id": 13}
+            ]
+        }
+        ```
+        
+        任一操作校验失败时返回 400 和逐项错误，不会写入任何数据。
+        """
+        # 请求体可能是数组等非对象 JSON，交给 validate_operations 统一报格式错误
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        try:
+            validated, errors = validate_operations(request.user, operations)
+        except BulkOperationError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if errors:
+            return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = apply_operations(request.user, validated)
+        return Response({'success': True, 'results': results})
+    
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        permission_classes=[IsAuthenticated],
+        parser_classes=[MultiPartParser],
+    )
+    def import_ics(self, request):
+        """
+        导入 iCalendar（.ics）文件
+        
+        **POST** `/api/events/import/`（multipart/form-data，字段 `file`）
+        
+        逐行流式解析，每 1000 个日程一个事务批量写入；按 VEVENT 的 UID 去重，
+        同一文件重复导入不会产生重复日程。
+        
+        ### 响应示例
+        ```json
+        {
+            "success": true,
+            "created": 1200,
+            "duplicates": 3,
+            "skipped": 2,
+            "invalid": 1,
+            "errors": [{"uid": "abc@example.com", "error": "缺少 DTSTART"}]
+        }
+        ```
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'success': False, 'error': '请上传 .ics 文件（字段 file）'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        result = import_ics(request.user, upload)
+        return Response({'success': True, **result})
+    
+    @action(detail=False, methods=['get'])
+    def occurrences(self, request):
+        """
+        按时间窗口展开日程（含重复日程实例）
+        
+        **GET** `/api/events/occurrences/?start=2025-11-01&end=2025-12-01`
+        
+        只展开窗口内的实例，窗口最长 366 天。重复实例的 `id` 是所属系列的 id，
+        并带有 `recurrence_id`（该次实例原本的开始时间）和 `is_occurrence: true`。
+        
+        ### 响应示例
+        ```json
+        {
+            "start": "2025-11-01T00:00:00+08:00",
+            "end": "2025-12-01T00:00:00+08:00",
+            "events": [...]
+        }
+        ```
+        """
+        if not request.user.is_authenticated:
+            return Response({'error': '请先登录'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        start, end = parse_window(request.query_params)
+        events = get_occurrences(request.user, start, end)
+        
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'events': events,
+        })
+    
+    @action(detail=True, methods=['get', 'post'], url_path='exceptions')
+    def recurrence_exceptions(self, request, pk=None):
+        """
+        重复日程的单次例外
+        
+        **GET**  `/api/events/{id}/exceptions/` - 例外列表
+        **POST** `/api/events/{id}/exceptions/` - 取消或修改某一次（按 original_start 覆盖已有例外）
+        
+        ### 请求体示例
+        ```json
+        {"original_start": "2025-11-10T10:00:00+08:00", "is_cancelled": true}
+        ```
+        """
+        event = self.get_object()
+        if not event.is_recurring:
+            return Response({'error': '该日程不是重复日程'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.method == 'GET':
+            serializer = EventRecurrenceExceptionSerializer(event.recurrence_exceptions.all(), many=True)
+            return Response(serializer.data)
+        
+        serializer = EventRecurrenceExceptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        original_start = data.pop('original_start')
+        
+        if not is_valid_occurrence(event, original_start):
+            return Response(
+                {'original_start': ['不是该重复日程的实例时间']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        exception, created = EventRecurrenceException.objects.update_or_create(
+            event=event, original_start=original_start, defaults=data
+        )
+        return Response(
+            EventRecurrenceExceptionSerializer(exception).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
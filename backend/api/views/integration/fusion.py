@@ -13,7 +13,10 @@ from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 
 from ...models import Event, QQUser, AcWingUser
-from ...serializers import EventSerializer
+from ...pagination import EventCursorPagination
+from ...serializers import EventSerializer, EventFastListSerializer, parse_event_fields
+from ...utils.event_queries import event_list_queryset
+from ...utils.event_cache import build_events_etag, not_modified_response, set_etag_headers
 
 # 初始化 logger
 logger = logging.getLogger('django')
@@ -234,11 +237,17 @@ def get_user_events(request):
     ### 请求头
     ```
     Authorization: Bearer <roamio_token>
+    If-None-Match: <上次响应的 ETag>   # 可选，数据未变化时返回 304
     ```
     
     ### 可选参数
     - unionid: QQ UnionID（推荐）
     - openid: QQ OpenID（备选）
+    - cursor: 分页游标（取自上一页响应的 next / previous 链接）
+    - page_size: 每页数量（默认 100，最大 500）
+    
+    events_count 只在第一页（不带 cursor）返回总数，翻页时为 null。
+    - fields: 只返回指定字段（逗号分隔），如 `id,title,start_time`
     
     ### 响应示例
     ```json
@@ -246,6 +255,8 @@ def get_user_events(request):
         "user_id": 2,
         "username": "W ૧ H",
         "events_count": 10,
+        "next": "https://.../api/v1/fusion/events/?cursor=eyJ0Ijoi...",
+        "previous": null,
         "events": [...]
     }
     ```
@@ -305,16 +316,26 @@ def get_user_events(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # 3. 获取用户的所有事件
-    events = Event.objects.filter(user=ralendar_user).order_by('-start_time')
-    serializer = EventSerializer(events, many=True)
+    # 3. 条件请求：集合版本未变时直接返回 304
+    etag = build_events_etag(request, ralendar_user.id)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
     
-    return Response({
+    # 4. 获取用户的事件（游标分页，按开始时间倒序）
+    events = event_list_queryset(ralendar_user)
+    fast_serializer = EventFastListSerializer(fields=parse_event_fields(request.GET.get('fields')))
+    paginator = EventCursorPagination(ordering=('-start_time', '-id'))
+    page = paginator.paginate_queryset(events.values(*fast_serializer.value_fields), request)
+    
+    response = Response({
         'user_id': ralendar_user.id,
         'username': ralendar_user.username,
-        'events_count': events.count(),
-        'events': serializer.data
+        'events_count': paginator.get_total_count(events),
+        **paginator.get_page_links(),
+        'events': fast_serializer.serialize(page)
     })
+    return set_etag_headers(response, etag)
 
 
 @api_view(['GET', 'PUT', 'DELETE'])  # One function handles all methods!
@@ -434,25 +455,31 @@ def get_trip_events(request, trip_slug):
     
     **GET** `/api/events/by-trip/{trip_slug}/`
     
+    游标分页（`cursor` / `page_size`），events_count 只在第一页返回总数，翻页时为 null。
+    
     ### 响应示例
     ```json
     {
         "trip_slug": "yunnan-trip-2025",
         "events_count": 5,
+        "next": null,
+        "previous": null,
         "events": [...]
     }
     ```
     """
-    events = Event.objects.filter(
-        user=request.user,
+    events = event_list_queryset(request.user).filter(
         related_trip_slug=trip_slug
-    ).order_by('start_time')
+    )
     
-    serializer = EventSerializer(events, many=True)
+    paginator = EventCursorPagination(ordering=('start_time', 'id'))
+    page = paginator.paginate_queryset(events, request)
+    serializer = EventSerializer(page, many=True)
     
     return Response({
         'trip_slug': trip_slug,
-        'events_count': events.count(),
+        'events_count': paginator.get_total_count(events),
+        **paginator.get_page_links(),
         'events': serializer.data
     })
 
@@ -531,30 +558,35 @@ def get_events_with_location(request):
     
     ### 查询参数
     - `map_provider`: 可选，筛选地图服务商 (baidu/amap/tencent)
+    - `cursor` / `page_size`: 可选，游标分页（count 只在第一页返回总数，翻页时为 null）
     
     ### 响应示例
     ```json
     {
         "count": 10,
+        "next": null,
+        "previous": null,
         "events": [...]
     }
     ```
     """
-    events = Event.objects.filter(
-        user=request.user,
+    events = event_list_queryset(request.user).filter(
         latitude__isnull=False,
         longitude__isnull=False
-    ).order_by('-start_time')
+    )
     
     # 可选：按地图服务商筛选
     map_provider = request.query_params.get('map_provider')
     if map_provider:
         events = events.filter(map_provider=map_provider)
     
-    serializer = EventSerializer(events, many=True)
+    paginator = EventCursorPagination(ordering=('-start_time', '-id'))
+    page = paginator.paginate_queryset(events, request)
+    serializer = EventSerializer(page, many=True)
     
     return Response({
-        'count': events.count(),
+        'count': paginator.get_total_count(events),
+        **paginator.get_page_links(),
         'events': serializer.data
     })
 
@@ -567,23 +599,30 @@ def get_roamio_events(request):
     
     **GET** `/api/events/from-roamio/`
     
+    ### 查询参数
+    - `cursor` / `page_size`: 可选，游标分页（count 只在第一页返回总数，翻页时为 null）
+    
     ### 响应示例
     ```json
     {
         "count": 5,
+        "next": null,
+        "previous": null,
         "events": [...]
     }
     ```
     """
-    events = Event.objects.filter(
-        user=request.user,
+    events = event_list_queryset(request.user).filter(
         source_app='roamio'
-    ).order_by('-start_time')
+    )
     
-    serializer = EventSerializer(events, many=True)
+    paginator = EventCursorPagination(ordering=('-start_time', '-id'))
+    page = paginator.paginate_queryset(events, request)
+    serializer = EventSerializer(page, many=True)
     
     return Response({
-        'count': events.count(),
+        'count': paginator.get_total_count(events),
+        **paginator.get_page_links(),
         'events': serializer.data
     })
 
@@ -5,6 +5,7 @@ Celery 配置文件
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_ready
 
 # 设置 Django 环境变量
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'calendar_backend.settings')
@@ -18,18 +19,45 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # 自动发现所有 app 中的 tasks.py
 app.autodiscover_tasks()
 
+
+@worker_ready.connect
+def catch_up_reminders_on_startup(sender, **kwargs):
+    """Worker 启动后补发停机期间错过的提醒（多个 worker 同时启动时由认领去重）"""
+    sender.app.send_task('api.tasks.catch_up_reminders')
+
+
 # 配置定时任务
 app.conf.beat_schedule = {
-    # 每分钟检查一次即将到来的提醒
+    # 每分钟检查一次即将到来的提醒（同时补发宽限期内错过的提醒）
     'check-upcoming-reminders': {
         'task': 'api.tasks.check_and_send_reminders',
         'schedule': crontab(minute='*/1'),  # 每分钟执行一次
     },
+    # 每 10 分钟对账一次 ETA 提醒（仅 eta 模式生效，补投遗漏或进入投递窗口的提醒）
+    'reconcile-reminder-schedule': {
+        'task': 'api.tasks.reconcile_reminder_schedule',
+        'schedule': crontab(minute='*/10'),
+    },
+    # 每天晚上8点发送第二天的日程汇总（开启了每日汇总的用户）
+    'send-daily-digests': {
+        'task': 'api.tasks.send_daily_digests',
+        'schedule': crontab(hour=20, minute=0),  # 每天 20:00
+    },
     # 每月1号凌晨3点同步节假日数据
     'sync-holiday-data': {
         'task': 'api.tasks.sync_holiday_data',
         'schedule': crontab(hour=3, minute=0, day_of_month=1),  # 每月1号 03:00
     },
+    # 每天凌晨4点清理过期的日程删除记录（增量同步墓碑）
+    'purge-event-tombstones': {
+        'task': 'api.tasks.purge_event_tombstones',
+        'schedule': crontab(hour=4, minute=0),  # 每天 04:00
+    },
+    # 每天凌晨4点10分清理过期的提醒投递日志（指标）
+    'purge-reminder-delivery-logs': {
+        'task': 'api.tasks.purge_reminder_delivery_logs',
+        'schedule': crontab(hour=4, minute=10),  # 每天 04:10
+    },
 }
 
 # 时区配置
@@ -123,6 +123,23 @@ else:
     }
 
 
+# ==================== 缓存配置 ====================
+# 生产环境多进程部署，必须使用共享缓存（Redis）；开发环境使用进程内缓存
+if ENVIRONMENT == 'production':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_URL', 'redis://localhost:6379/1'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -240,8 +257,63 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 # 发件人显示名称：默认为 "Ralendar <邮箱地址>"
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', f'Ralendar <{EMAIL_HOST_USER}>')
 
+# 增量同步：删除记录保留天数（更早的同步令牌需要全量同步）
+EVENT_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('EVENT_TOMBSTONE_RETENTION_DAYS', 30))
+
 # 提醒设置
 REMINDER_ADVANCE_MINUTES = int(os.environ.get('REMINDER_ADVANCE_MINUTES', 15))  # 提前 15 分钟提醒
+# 提醒调度模式：poll = Beat 每分钟扫描；eta = 日程保存时按提醒时间投递 Celery 定时任务；
+# wheel = 常驻进程（python manage.py run_reminder_scheduler）用时间轮按秒触发
+REMINDER_SCHEDULING_MODE = os.environ.get('REMINDER_SCHEDULING_MODE', 'poll')
+# eta 模式只提前投递这么久以内的提醒：Redis broker 会把超过 visibility_timeout（默认 1 小时）
+# 仍未确认的 ETA 任务重新投递，更远的提醒交给对账任务在进入窗口后再投递
+REMINDER_ETA_HORIZON_MINUTES = int(os.environ.get('REMINDER_ETA_HORIZON_MINUTES', 45))
+# 批量发送：每批复用一个 SMTP 连接的邮件数、单封失败重试次数及退避基数（秒）
+REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE', 50))
+REMINDER_SEND_RETRIES = int(os.environ.get('REMINDER_SEND_RETRIES', 2))
+REMINDER_RETRY_BACKOFF_SECONDS = float(os.environ.get('REMINDER_RETRY_BACKOFF_SECONDS', 1))
+# 认领租期（秒）：worker 认领后超过该时间仍未发送，其他 worker 可以重新认领
+REMINDER_CLAIM_LEASE_SECONDS = int(os.environ.get('REMINDER_CLAIM_LEASE_SECONDS', 600))
+# 提醒扫描分片数：按 user_id % N 拆成 N 个任务，可由多个 worker 并行处理
+REMINDER_SHARDS = int(os.environ.get('REMINDER_SHARDS', 1))
+# 补发：Worker 重启、Redis 中断等导致错过的提醒，在宽限期（分钟）内补发；
+# 每分钟最多补发的数量（分摊到一分钟内的多个批次，避免长时间停机后集中冲击 SMTP）
+REMINDER_CATCHUP_GRACE_MINUTES = int(os.environ.get('REMINDER_CATCHUP_GRACE_MINUTES', 120))
+REMINDER_CATCHUP_RATE_PER_MINUTE = int(os.environ.get('REMINDER_CATCHUP_RATE_PER_MINUTE', 300))
+# wheel 模式：时间轮装载多久以内的提醒（分钟）、多久从数据库重新装载一次（分钟）、
+# 变更通道（redis = Redis pub/sub，跨进程；local = 进程内队列，仅开发测试）
+REMINDER_WHEEL_HORIZON_MINUTES = int(os.environ.get('REMINDER_WHEEL_HORIZON_MINUTES', 180))
+REMINDER_WHEEL_RELOAD_MINUTES = int(os.environ.get('REMINDER_WHEEL_RELOAD_MINUTES', 10))
+REMINDER_WHEEL_CHANGE_FEED = os.environ.get('REMINDER_WHEEL_CHANGE_FEED', 'redis')
+REMINDER_WHEEL_REDIS_URL = os.environ.get('REMINDER_WHEEL_REDIS_URL', CELERY_BROKER_URL)
+REMINDER_WHEEL_CHANNEL = 'reminders:changes'
+# 提醒投递日志（延迟、排队、SMTP 耗时等指标）保留天数
+REMINDER_METRICS_RETENTION_DAYS = int(os.environ.get('REMINDER_METRICS_RETENTION_DAYS', 14))
+
+# ==================== 日志配置 ====================
+# 提醒投递指标（api.reminders.metrics，每封一行 JSON）固定以 INFO 输出到 stderr（由 uwsgi / 进程管理器收集），
+# 不依赖根日志级别（uwsgi 下根日志为 WARNING，只有 celery worker --loglevel=info 时才会输出）
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'reminder_metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json_line',
+        },
+    },
+    'loggers': {
+        'api.reminders.metrics': {
+            'handlers': ['reminder_metrics'],
+            'level': os.environ.get('REMINDER_METRICS_LOG_LEVEL', 'INFO'),
+            # 不再传给根日志，避免 worker 中重复输出
+            'propagate': False,
+        },
+    },
+}
 
 # ==================== 百度地图配置 ====================
 BAIDU_MAP_AK = os.environ.get('BAIDU_MAP_AK', '')  # 百度地图 API Key